@@ -3,197 +3,33 @@
 Embeddings-based Query Classifier
 
 This module uses semantic embeddings to classify agricultural queries without hardcoded rules.
+
+The classifier lives in the farmlore app (api/inference_engine/embeddings_classifier.py),
+where it encodes through the app's shared embedding service and cache. This script
+re-exports it, for embeddings_classifier_api.py and the comparison scripts.
 """
 
-import numpy as np
+import os
+import sys
 import logging
-from enum import Enum
-from sentence_transformers import SentenceTransformer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("embeddings_classifier")
 
-# Define the prompt types enum to match the one in prompt_templates.py
-class PromptType(str, Enum):
-    PEST_MANAGEMENT = "pest_management"
-    PEST_IDENTIFICATION = "pest_identification"
-    SOIL_ANALYSIS = "soil_analysis" 
-    INDIGENOUS_KNOWLEDGE = "indigenous_knowledge"
-    GENERAL = "general_query"
-
-class EmbeddingsClassifier:
-    """
-    Classifies agricultural queries using vector embeddings and semantic similarity.
-    """
-    
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
-        """
-        Initialize the classifier with a pre-trained sentence transformer model.
-        
-        Args:
-            model_name: The name of the pre-trained model to use
-        """
-        logger.info(f"Initializing EmbeddingsClassifier with model: {model_name}")
-        try:
-            self.model = SentenceTransformer(model_name)
-            logger.info("Model loaded successfully")
-            
-            # Define example queries for each category
-            self.category_examples = {
-                PromptType.PEST_MANAGEMENT: [
-                    "how to control aphids on my tomatoes",
-                    "what's the best way to get rid of beetles",
-                    "natural ways to manage whiteflies",
-                    "organic pesticides for vegetable garden",
-                    "how to prevent pests in my garden",
-                    "controlling spider mites on cucumber plants",
-                    "best spray for tomato hornworm",
-                    "how to kill garden pests without chemicals",
-                    "beneficial insects to control aphids",
-                    "how do ladybugs help with pest control",
-                ],
-                PromptType.PEST_IDENTIFICATION: [
-                    "what are these black spots on my tomato leaves",
-                    "my plants have yellow leaves what could it be",
-                    "what pest causes holes in cucumber leaves",
-                    "white powdery coating on my zucchini plants",
-                    "why are my plant's leaves curling",
-                    "what's eating my tomato fruit",
-                    "small white insects on the underside of leaves",
-                    "my plants are wilting despite watering",
-                    "brown patches on my crops",
-                    "what disease causes purple stems on tomatoes",
-                ],
-                PromptType.SOIL_ANALYSIS: [
-                    "what nutrients do tomatoes need",
-                    "best soil pH for growing peppers",
-                    "how to improve clay soil for gardening",
-                    "signs of nitrogen deficiency in plants",
-                    "how to test soil fertility at home",
-                    "best fertilizer for vegetable gardens",
-                    "organic soil amendments for tomatoes",
-                    "why is my soil compacted",
-                    "how much compost to add to garden soil",
-                    "fixing phosphorus deficiency in plants",
-                ],
-                PromptType.INDIGENOUS_KNOWLEDGE: [
-                    "traditional farming methods for corn",
-                    "ancient techniques for pest control",
-                    "indigenous crop rotation practices",
-                    "how did ancestors predict weather for farming",
-                    "cultural farming practices for sustainability",
-                    "native american three sisters planting",
-                    "traditional ways to preserve seeds",
-                    "old farming wisdom about pest management",
-                    "indigenous plant companion planting",
-                    "historical farming methods without chemicals",
-                ],
-                PromptType.GENERAL: [
-                    "when to plant tomatoes",
-                    "how much water do peppers need",
-                    "best time to harvest carrots",
-                    "how to increase tomato yield",
-                    "growing vegetables in containers",
-                    "starting seeds indoors guide",
-                    "vegetable garden layout ideas",
-                    "how to grow organic vegetables",
-                    "winter gardening tips",
-                    "crop rotation basics",
-                ]
-            }
-            
-            # Generate and store embeddings for each category
-            self.category_embeddings = self._generate_category_embeddings()
-            logger.info("Category embeddings generated successfully")
-            
-        except Exception as e:
-            logger.error(f"Error initializing embeddings classifier: {str(e)}")
-            raise
-    
-    def _generate_category_embeddings(self):
-        """
-        Generate embeddings for each category from the example queries.
-        
-        Returns:
-            Dictionary mapping categories to their embedding vectors
-        """
-        category_embeddings = {}
-        
-        for category, examples in self.category_examples.items():
-            # Generate embeddings for all examples
-            embeddings = self.model.encode(examples)
-            
-            # Average the embeddings to get a representative vector for the category
-            category_embeddings[category] = np.mean(embeddings, axis=0)
-            
-            logger.info(f"Generated embedding for category: {category}")
-        
-        return category_embeddings
-    
-    def classify(self, query):
-        """
-        Classify a query into one of the predefined categories.
-        
-        Args:
-            query: The user query string to classify
-            
-        Returns:
-            The classified prompt type
-        """
-        try:
-            # Generate embedding for the query
-            query_embedding = self.model.encode([query])[0]
-            
-            # Calculate similarity with each category
-            similarities = {}
-            for category, embedding in self.category_embeddings.items():
-                # Calculate cosine similarity
-                similarity = np.dot(query_embedding, embedding) / (np.linalg.norm(query_embedding) * np.linalg.norm(embedding))
-                similarities[category] = similarity
-                logger.debug(f"Similarity with {category}: {similarity:.4f}")
-            
-            # Find the category with the highest similarity
-            best_category = max(similarities.items(), key=lambda x: x[1])
-            category, similarity = best_category
-            
-            logger.info(f"Classified '{query}' as {category} with confidence {similarity:.4f}")
-            
-            # Define a confidence threshold
-            if similarity < 0.5:
-                logger.info(f"Confidence too low ({similarity:.4f}), falling back to GENERAL")
-                return PromptType.GENERAL
-                
-            return category
-            
-        except Exception as e:
-            logger.error(f"Error classifying query: {str(e)}")
-            # In case of error, return GENERAL as a safe fallback
-            return PromptType.GENERAL
+# Inside the app container this directory is the farmlore project. In a checkout the
+# project is pest-management-chatbot/farmlore-project: its api package takes precedence
+# over this directory's api/ (a namespace package without the embedding modules) once
+# it is on the path.
+FARMLORE_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pest-management-chatbot', 'farmlore-project')
+if os.path.isdir(FARMLORE_PROJECT) and FARMLORE_PROJECT not in sys.path:
+    sys.path.append(FARMLORE_PROJECT)
 
-# Function to match the interface in prompt_templates.py
-def detect_prompt_type_embeddings(query):
-    """
-    Detect the appropriate prompt type using embeddings-based classification.
-    
-    Args:
-        query: The user's query
-        
-    Returns:
-        The detected prompt type
-    """
-    global classifier_instance
-    
-    # Lazy-load the classifier instance
-    if 'classifier_instance' not in globals() or classifier_instance is None:
-        try:
-            classifier_instance = EmbeddingsClassifier()
-        except Exception as e:
-            logger.error(f"Failed to initialize EmbeddingsClassifier: {str(e)}")
-            # Return GENERAL as fallback if classifier initialization fails
-            return PromptType.GENERAL
-    
-    return classifier_instance.classify(query)
+from api.inference_engine.embeddings_classifier import (
+    EmbeddingsClassifier,
+    PromptType,
+    detect_prompt_type_embeddings,
+)
 
 if __name__ == "__main__":
     # Test the classifier with some example queries
@@ -5,12 +5,30 @@ from django.http import HttpResponse, JsonResponse
 
 from api.monitoring import monitor
 from api.inference_engine.hybrid_engine import HybridEngine
+from prolog_integration.connector import PrologConnector
+from prolog_integration.profiler import load_report
 from datetime import datetime
 import time
 
 # Initialize a hybrid engine if needed for health checks
 hybrid_engine = HybridEngine()
 
+def get_prolog_profile():
+    """
+    Predicate-level profile and limit counters of the running Prolog connector, if
+    any, and the report saved by the last ``manage.py profile_prolog`` run
+    """
+    report = load_report()
+    connector = PrologConnector._instance
+    if connector is None or not hasattr(connector, 'profiler'):
+        return {'enabled': False, 'predicates': [], 'limits': {}, 'report': report}
+    return {
+        'enabled': connector.profiler.enabled,
+        'predicates': connector.get_profile(),
+        'limits': connector.get_limit_stats(),
+        'report': report,
+    }
+
 @staff_member_required
 def performance_dashboard(request):
     """
@@ -36,6 +54,7 @@ def performance_dashboard(request):
         'start_time': start_time,
         'ollama_available': ollama_available,
         'ollama_models': ollama_models,
+        'prolog_profile': get_prolog_profile(),
         'current_time': now().strftime('%Y-%m-%d %H:%M:%S'),
     })
 
@@ -48,6 +67,7 @@ def performance_json(request):
     metrics = monitor.get_metrics()
     return JsonResponse({
         'metrics': metrics,
+        'prolog_profile': get_prolog_profile(),
         'timestamp': now().isoformat(),
     })
 
@@ -74,7 +94,8 @@ def reset_metrics(request):
             },
             "cache": {
                 "hits": 0,
-                "misses": 0
+                "misses": 0,
+                "by_cache": {}
             },
             "llm": {
                 "calls": 0,
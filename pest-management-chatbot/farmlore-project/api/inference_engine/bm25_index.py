@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+BM25 Keyword Index
+
+A small in-memory inverted index with Okapi BM25 scoring, used by the
+keyword-based RAG modules (standalone_rag, direct_rag_integration) instead of
+re-tokenizing and fuzzy-matching every document on every query.
+
+Documents are tokenized once when the index is built, with the caller's own
+tokenizer so stop-word handling stays identical to its get_keywords(); plural
+forms are folded so "hornworm" matches "hornworms".
+Scores are computed per field (title, content) and combined with field
+weights; only documents sharing at least one term with the query are scored,
+and the top k are selected with a heap.
+
+BM25 scores grow with the number of query terms and shift with the corpus, so
+they make a poor no-match cut-off. Each result therefore also carries a
+"relevance" in [0, 1]: the IDF-weighted share of the query's terms that the
+document contains, where a term found in no document weighs as much as the
+rarest possible term. A query about carrots that only shares "plant" with a
+document scores near 0 however the corpus grows.
+"""
+import heapq
+import math
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Set, Tuple
+
+# Title matches count more than content matches, as in the previous scoring
+DEFAULT_FIELDS = (("title", 2.0), ("content", 1.0))
+
+# Relevance below which the best match is not worth adding to a response:
+# on benchmarks/rag_queries.json the correct top hits cover 0.3 to 0.65 of
+# their query, wrong top hits mostly under 0.25 and off-topic queries ("When
+# should I plant carrots?") under 0.05, whatever the size of the corpus
+MIN_RELEVANCE = 0.25
+
+
+def singular(term: str) -> str:
+    """Fold common English plural endings (aphids -> aphid, tomatoes -> tomato, flies -> fly)"""
+    if len(term) <= 3:
+        return term
+    if term.endswith("ies"):
+        return term[:-3] + "y"
+    if term.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return term[:-2]
+    if term.endswith("s") and not term.endswith(("ss", "us", "is")):
+        return term[:-1]
+    return term
+
+
+class BM25Index:
+    """Inverted index over a list of document dicts with BM25 field scoring"""
+
+    def __init__(self, documents: Sequence[Dict[str, Any]], tokenizer: Callable[[str], List[str]],
+                 fields: Iterable[Tuple[str, float]] = DEFAULT_FIELDS, k1: float = 1.2, b: float = 0.75,
+                 stem: Callable[[str], str] = singular):
+        self.documents = list(documents)
+        self.tokenizer = tokenizer
+        self.stem = stem
+        self.fields = tuple(fields)
+        self.k1 = k1
+        self.b = b
+        # field -> term -> [(doc_id, term frequency)]
+        self.postings: Dict[str, Dict[str, List[Tuple[int, int]]]] = {}
+        # field -> per-document length normalisation factor k1 * (1 - b + b * len / avg_len)
+        self.length_norms: Dict[str, List[float]] = {}
+        self.idf: Dict[str, Dict[str, float]] = {}
+        # Distinct terms of each document over all fields
+        self.document_terms: List[Set[str]] = [set() for _ in self.documents]
+        self._build()
+
+    def _build(self) -> None:
+        doc_count = len(self.documents)
+        for field, _ in self.fields:
+            postings: Dict[str, List[Tuple[int, int]]] = {}
+            lengths = []
+            for doc_id, document in enumerate(self.documents):
+                terms = self.analyze(document.get(field, "") or "")
+                lengths.append(len(terms))
+                self.document_terms[doc_id].update(terms)
+                for term, frequency in Counter(terms).items():
+                    postings.setdefault(term, []).append((doc_id, frequency))
+            avg_length = (sum(lengths) / doc_count) if doc_count else 0.0
+            self.postings[field] = postings
+            self.length_norms[field] = [
+                self.k1 * (1 - self.b + self.b * (length / avg_length if avg_length else 0.0))
+                for length in lengths
+            ]
+            self.idf[field] = {
+                term: math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for term, docs in postings.items()
+            }
+
+    def analyze(self, text: str) -> List[str]:
+        """Tokenize text into index terms"""
+        terms = self.tokenizer(text)
+        return [self.stem(term) for term in terms] if self.stem else terms
+
+    def score(self, query: str) -> Dict[int, float]:
+        """Return BM25 scores of every document matching at least one query term"""
+        query_terms = set(self.analyze(query))
+        scores: Dict[int, float] = {}
+        for field, weight in self.fields:
+            postings = self.postings[field]
+            idf = self.idf[field]
+            norms = self.length_norms[field]
+            for term in query_terms:
+                docs = postings.get(term)
+                if not docs:
+                    continue
+                term_weight = weight * idf[term] * (self.k1 + 1)
+                for doc_id, frequency in docs:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + term_weight * frequency / (frequency + norms[doc_id])
+        return scores
+
+    def term_weights(self, query: str) -> Dict[str, float]:
+        """IDF of each query term (highest over the fields), unknown terms at the maximum IDF"""
+        unseen = math.log(1 + (len(self.documents) + 0.5) / 0.5)
+        return {
+            term: max([self.idf[field][term] for field, _ in self.fields if term in self.idf[field]] or [unseen])
+            for term in set(self.analyze(query))
+        }
+
+    def relevance(self, weights: Dict[str, float], doc_id: int) -> float:
+        """IDF-weighted share of the query terms (from term_weights) found in a document"""
+        total = sum(weights.values())
+        if not total:
+            return 0.0
+        terms = self.document_terms[doc_id]
+        return sum(weight for term, weight in weights.items() if term in terms) / total
+
+    def search(self, query: str, top_n: int = 2) -> List[Dict[str, Any]]:
+        """
+        Return the top_n matching documents, best first.
+        
+        Each result is a copy of the document dict with "score" (BM25) and
+        "relevance" (query coverage in [0, 1]) keys added.
+        """
+        scores = self.score(query)
+        best = heapq.nlargest(top_n, scores.items(), key=lambda item: (item[1], -item[0]))
+        weights = self.term_weights(query) if best else {}
+        return [dict(self.documents[doc_id], score=score, relevance=self.relevance(weights, doc_id))
+                for doc_id, score in best]
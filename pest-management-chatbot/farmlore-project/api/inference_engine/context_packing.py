@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Context Packing
+
+Chooses which retrieved chunks go into the LLM prompt. The knowledge bases
+describe the same pest more than once (aphids in knowledgebase.pl and again in
+pea_updates.pl), so the plain top-k often spends half the context on
+restatements. On CPU, evaluating the prompt is the dominant cost of a
+response, so every context token should add new information.
+
+pack_context() orders the candidates by maximal marginal relevance (MMR):
+
+    score(d) = lambda * sim(query, d) - (1 - lambda) * max(sim(d, s) for s already selected)
+
+Chunks that are near-duplicates of a selected one (similarity at or above
+DUPLICATE_THRESHOLD) are dropped outright. Selected chunks are then packed in
+MMR order into a token budget (RAG_CONTEXT_TOKENS, default 512). A chunk that
+does not fit is skipped in favour of a shorter one further down. The most
+relevant chunk is never dropped: if it alone exceeds the budget, it is cut at
+a line boundary.
+
+Similarities are cosines between embeddings when an embeddings object is
+given. Indexed chunks are already in the embedding cache, so this usually
+costs no model calls. Without embeddings, or if embedding fails, cosines
+between bag-of-words vectors are used instead, which is enough to catch
+restated frames.
+
+Token counts are estimated at four characters per token, the usual ratio for
+English text with Llama-family tokenizers; the budget is a bound on prompt
+size, not an exact count.
+"""
+import logging
+import os
+from collections import Counter
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .hybrid_retriever import tokenize
+except ImportError:
+    from hybrid_retriever import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_TOKENS = 512
+DEFAULT_MMR_LAMBDA = 0.7
+DUPLICATE_THRESHOLD = 0.95
+# Candidates retrieved per chunk that may end up in the context
+FETCH_FACTOR = 3
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count of ``text``"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to about ``max_tokens``, at the last line break that fits if there is one"""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit + 1)
+    return text[:cut if cut > 0 else limit].rstrip()
+
+
+def _normalized(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _bag_of_words(query: str, texts: Sequence[str]):
+    """Term-count vectors of the query and texts over the texts' vocabulary"""
+    counts = [Counter(tokenize(text)) for text in texts]
+    vocabulary = {term: i for i, term in enumerate(sorted(set().union(*counts)))}
+    matrix = np.zeros((len(texts), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, text_counts in enumerate(counts):
+        for term, count in text_counts.items():
+            matrix[row, vocabulary[term]] = count
+    query_vector = np.zeros(matrix.shape[1], dtype=np.float32)
+    for term in tokenize(query):
+        if term in vocabulary:
+            query_vector[vocabulary[term]] += 1
+    return query_vector, matrix
+
+
+def _vectors(query: str, texts: Sequence[str], embeddings):
+    if embeddings is not None:
+        try:
+            return np.asarray(embeddings.embed_query(query)), np.asarray(embeddings.embed_documents(list(texts)))
+        except Exception as e:
+            logger.warning(f"Could not embed context candidates, using word overlap for MMR: {str(e)}")
+    return _bag_of_words(query, texts)
+
+
+def mmr_order(query_vector, vectors, lambda_mult: float = DEFAULT_MMR_LAMBDA,
+              duplicate_threshold: float = DUPLICATE_THRESHOLD) -> List[int]:
+    """Indices of ``vectors`` in maximal-marginal-relevance order, near-duplicates left out"""
+    matrix = _normalized(vectors)
+    if not len(matrix):
+        return []
+    relevance = matrix @ _normalized(query_vector)
+    similarity = matrix @ matrix.T
+    redundancy = np.zeros(len(matrix), dtype=np.float32)
+    remaining = np.ones(len(matrix), dtype=bool)
+    order = []
+    while remaining.any():
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        best = int(np.argmax(np.where(remaining, scores, -np.inf)))
+        order.append(best)
+        remaining[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+        remaining &= redundancy < duplicate_threshold
+    return order
+
+
+def pack_context(query: str, texts: Sequence[str], embeddings=None, max_tokens: Optional[int] = None,
+                 max_chunks: Optional[int] = None, lambda_mult: Optional[float] = None) -> List[str]:
+    """
+    Select the retrieved chunks to put in the prompt
+
+    Args:
+        query: The user's question
+        texts: Retrieved chunks, best first
+        embeddings: Object with embed_query/embed_documents; word overlap is used if None
+        max_tokens: Token budget for the selected chunks together (default: RAG_CONTEXT_TOKENS)
+        max_chunks: Upper bound on the number of chunks (default: no bound)
+        lambda_mult: Relevance/diversity trade-off, 1.0 for relevance only (default: RAG_MMR_LAMBDA)
+
+    Returns:
+        Selected chunks in MMR order
+    """
+    texts = list(dict.fromkeys(text for text in texts if text and text.strip()))
+    if not texts:
+        return []
+    if max_tokens is None:
+        max_tokens = int(os.environ.get('RAG_CONTEXT_TOKENS', DEFAULT_CONTEXT_TOKENS))
+    if lambda_mult is None:
+        lambda_mult = float(os.environ.get('RAG_MMR_LAMBDA', DEFAULT_MMR_LAMBDA))
+
+    query_vector, vectors = _vectors(query, texts, embeddings)
+    selected, used = [], 0
+    for index in mmr_order(query_vector, vectors, lambda_mult):
+        if max_chunks is not None and len(selected) >= max_chunks:
+            break
+        text = texts[index]
+        if not selected:
+            text = truncate_to_tokens(text, max_tokens)
+        tokens = estimate_tokens(text)
+        if used + tokens > max_tokens:
+            continue
+        selected.append(text)
+        used += tokens
+    logger.debug(f"Packed {len(selected)} of {len(texts)} retrieved chunks into ~{used} tokens")
+    return selected
@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+"""
+Corpus Ingestion
+
+Chunks long reference texts (e.g. The-Organic-Gardeners-Handbook-of-Natural-Insect.txt),
+embeds the chunks in batches and upserts them into the persisted Chroma
+collection that RAGQuery searches. Each ingested file is recorded (hash and
+chunk count) in the corpus manifest next to the frame manifest: frame syncs
+leave these chunks alone, and the store's content version changes, so result
+caches and the BM25 index pick up the new text.
+
+Ingestion streams: files are read in blocks of READ_SIZE characters, chunks
+are cut with overlap as the text arrives, and a bounded window of chunks
+(WINDOW_BATCHES batches per worker) is embedded and upserted before the next
+one is read. Memory use therefore does not grow with the size of the file, so
+multi-hundred-MB texts index in constant memory.
+
+Embedding is the expensive step, so it is spread over a process pool: each
+worker encodes whole batches through its process's shared embedding service
+(which loads the model once, on the first batch), with torch or the ONNX
+session limited to its share of the cores so the workers don't oversubscribe
+the CPU. Chunks already in the embedding cache are not sent to the workers at
+all. Progress (chunks done, chunks/s) is logged after every batch and can also
+be received through a callback.
+
+Configuration (overridable per call and on the command line):
+    INGEST_BATCH_SIZE  chunks per encode call (default 64)
+    INGEST_WORKERS     embedding processes (default: number of CPUs, 1 = in-process)
+
+Usage:
+    python -m api.inference_engine.corpus_ingestion FILE [FILE ...] [--batch-size N] [--workers N]
+"""
+import argparse
+import hashlib
+import io
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+try:
+    from .embedding_cache import get_embedding_cache
+    from .embedding_service import get_embedding_service
+    from .frame_index import CorpusManifest
+except ImportError:
+    from embedding_cache import get_embedding_cache
+    from embedding_service import get_embedding_service
+    from frame_index import CorpusManifest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 64
+# Collection name langchain's Chroma wrapper uses, so RAGQuery sees the chunks
+DEFAULT_COLLECTION = "langchain"
+# Characters read from a file at a time
+READ_SIZE = 1 << 16
+# Batches per worker embedded and upserted together while streaming a file
+WINDOW_BATCHES = 4
+
+# progress(done, total, elapsed_seconds)
+ProgressCallback = Callable[[int, int, float], None]
+
+
+def default_batch_size() -> int:
+    return int(os.environ.get("INGEST_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+
+
+def default_workers() -> int:
+    return int(os.environ.get("INGEST_WORKERS", os.cpu_count() or 1))
+
+
+def iter_text_chunks(stream: TextIO, chunk_size: int = 500, overlap: int = 50,
+                     read_size: int = READ_SIZE) -> Iterator[str]:
+    """Yield chunks of at most ``chunk_size`` characters, overlapping by ``overlap``, from a text stream.
+
+    Chunks end at the last sentence or line break inside the window when there
+    is one past the overlap, so sentences are not cut in half needlessly. Only
+    about ``chunk_size + read_size`` characters are held at a time.
+    """
+    buffer = ""
+    position = 0
+    eof = False
+
+    while True:
+        # Keep more than a full window buffered, so "is this the end of the text" is known
+        while not eof and len(buffer) - position <= chunk_size:
+            data = stream.read(read_size)
+            if data:
+                buffer = buffer[position:] + data
+                position = 0
+            else:
+                eof = True
+        remaining = len(buffer) - position
+        if not remaining:
+            return
+
+        end = min(chunk_size, remaining)
+        if end < remaining:
+            break_point = max(buffer.rfind('.', position, position + end),
+                              buffer.rfind('\n', position, position + end)) - position
+            if break_point > overlap:
+                end = break_point + 1
+
+        chunk = buffer[position:position + end].strip()
+        if chunk:
+            yield chunk
+        if end >= remaining:
+            return
+        position += end - overlap
+
+
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    """Split text into chunks of at most ``chunk_size`` characters, overlapping by ``overlap``"""
+    return list(iter_text_chunks(io.StringIO(text), chunk_size, overlap))
+
+
+def iter_file_chunks(path: str, chunk_size: int = 500, overlap: int = 50) -> Iterator[str]:
+    """Stream the chunks of a text file"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        yield from iter_text_chunks(f, chunk_size, overlap)
+
+
+def iter_batches(items: Sequence, batch_size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def iter_windows(items: Iterable, size: int) -> Iterator[list]:
+    """Lists of up to ``size`` consecutive items from any iterable"""
+    iterator = iter(items)
+    while True:
+        window = list(itertools.islice(iterator, size))
+        if not window:
+            return
+        yield window
+
+
+# Model of the pool worker (or of this process with one worker), served by its embedding service
+_worker_model_name = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    global _worker_model_name
+    if _worker_model_name == model_name:
+        return
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    service = get_embedding_service()
+    if hasattr(service, 'threads'):
+        service.threads = threads
+    _worker_model_name = model_name
+
+
+def _encode_batch(texts: List[str]):
+    return get_embedding_service().encode(texts, _worker_model_name)
+
+
+@contextmanager
+def batch_encoder(model_name: str, workers: int):
+    """
+    Context giving ``encode(batches)``, which yields (batch, vectors) pairs as batches finish.
+
+    With one worker the model runs in this process; otherwise one pool (and one
+    model load per worker) serves every call made inside the context.
+    """
+    if workers == 1:
+        def encode(batches):
+            for batch in batches:
+                _init_worker(model_name, os.cpu_count() or 1)
+                yield batch, _encode_batch(list(batch))
+        yield encode
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_name, threads)) as pool:
+        def encode(batches):
+            futures = {pool.submit(_encode_batch, list(batch)): batch for batch in batches}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        yield encode
+
+
+def _embed_with(encode, chunks: Sequence[str], model_name: str, batch_size: int, cache,
+                on_batch: Callable[[int], None]) -> List[List[float]]:
+    """Vectors for ``chunks``, encoding only those missing from the cache through ``encode``"""
+    vectors = cache.get_many(model_name, chunks)
+    missing = list(dict.fromkeys(chunk for chunk, vector in zip(chunks, vectors) if vector is None))
+    for batch, encoded in encode(iter_batches(missing, batch_size)):
+        cache.put_many(model_name, batch, encoded)
+        on_batch(len(batch))
+    if missing:
+        vectors = cache.get_many(model_name, chunks)
+    return vectors
+
+
+def embed_chunks(chunks: Sequence[str], model_name: str = DEFAULT_MODEL, batch_size: Optional[int] = None,
+                 workers: Optional[int] = None, progress: Optional[ProgressCallback] = None,
+                 cache=None) -> List[List[float]]:
+    """
+    Embed ``chunks`` in batches, in parallel over ``workers`` processes.
+
+    Args:
+        chunks: Texts to embed
+        model_name: Sentence-transformer model name
+        batch_size: Chunks per encode call (INGEST_BATCH_SIZE)
+        workers: Embedding processes; 1 encodes in this process (INGEST_WORKERS)
+        progress: Optional callback receiving (done, total, elapsed seconds)
+        cache: EmbeddingCache to read and fill (the shared cache by default)
+
+    Returns:
+        One vector per chunk, in input order
+    """
+    batch_size = batch_size or default_batch_size()
+    workers = max(1, workers or default_workers())
+    cache = cache or get_embedding_cache()
+
+    cached = cache.get_many(model_name, chunks)
+    total = len({chunk for chunk, vector in zip(chunks, cached) if vector is None})
+    batches = -(-total // batch_size)
+    workers = min(workers, max(1, batches))
+    logger.info(f"Embedding {total} chunks ({len(chunks) - total} cached) with {model_name}: "
+                f"batch size {batch_size}, {workers} worker(s)")
+
+    started = time.perf_counter()
+    done = 0
+
+    def report(count):
+        nonlocal done
+        done += count
+        elapsed = time.perf_counter() - started
+        logger.info(f"Embedded {done}/{total} chunks ({done / elapsed if elapsed else 0:.1f} chunks/s)")
+        if progress:
+            progress(done, total, elapsed)
+
+    with batch_encoder(model_name, workers) as encode:
+        return _embed_with(encode, chunks, model_name, batch_size, cache, report)
+
+
+def ingest_files(paths: Sequence[str], persist_dir: Optional[str] = None, collection_name: str = DEFAULT_COLLECTION,
+                 model_name: str = DEFAULT_MODEL, batch_size: Optional[int] = None, workers: Optional[int] = None,
+                 progress: Optional[ProgressCallback] = None, cache=None) -> int:
+    """
+    Stream text files through chunking and embedding into the persisted Chroma collection.
+
+    Each file is read incrementally and processed one window of chunks at a
+    time, so memory stays bounded however large the files are. Chunk IDs are
+    ``<file name>:<n>``, so re-ingesting a file replaces its chunks (and drops
+    chunks beyond its new length). Every file is recorded in the corpus
+    manifest of ``persist_dir``, which bumps the store's content version.
+    ``progress`` receives the chunks embedded so far, the chunks read so far
+    and the elapsed seconds.
+
+    Returns:
+        Number of chunks written
+    """
+    import chromadb
+
+    persist_dir = persist_dir or os.environ.get('RAG_PERSIST_DIR', './data/chromadb_improved')
+    batch_size = batch_size or default_batch_size()
+    workers = max(1, workers or default_workers())
+    cache = cache or get_embedding_cache()
+    window_size = batch_size * workers * WINDOW_BATCHES
+
+    client = chromadb.PersistentClient(path=persist_dir)
+    collection = client.get_or_create_collection(collection_name)
+    logger.info(f"Streaming {len(paths)} file(s) into collection '{collection_name}' at {persist_dir}: "
+                f"batch size {batch_size}, {workers} worker(s), {window_size} chunks per window")
+
+    started = time.perf_counter()
+    read = embedded = written = 0
+
+    def report(count):
+        nonlocal embedded
+        embedded += count
+        elapsed = time.perf_counter() - started
+        logger.info(f"Embedded {embedded} chunks, {read} read ({embedded / elapsed if elapsed else 0:.1f} chunks/s)")
+        if progress:
+            progress(embedded, read, elapsed)
+
+    with batch_encoder(model_name, workers) as encode:
+        for path in paths:
+            source = os.path.basename(path)
+            count = 0
+            digest = hashlib.sha256()
+            for window in iter_windows(iter_file_chunks(path), window_size):
+                read += len(window)
+                for chunk in window:
+                    digest.update(chunk.encode("utf-8"))
+                    digest.update(b"\0")
+                vectors = _embed_with(encode, window, model_name, batch_size, cache, report)
+                numbers = range(count, count + len(window))
+                ids = [f"{source}:{n}" for n in numbers]
+                metadatas = [{"source": source, "chunk_idx": n} for n in numbers]
+                for start in range(0, len(window), batch_size):
+                    end = start + batch_size
+                    collection.upsert(ids=ids[start:end], embeddings=vectors[start:end],
+                                      documents=window[start:end], metadatas=metadatas[start:end])
+                count += len(window)
+
+            stale = [chunk_id for chunk_id in collection.get(where={"source": source}, include=[])["ids"]
+                     if int(chunk_id.rsplit(':', 1)[1]) >= count]
+            if stale:
+                collection.delete(ids=stale)
+            # Recorded once the file's chunks are all in, so the version only moves on complete texts
+            corpus = CorpusManifest.load(persist_dir)
+            corpus.record(source, digest.hexdigest(), count)
+            corpus.save()
+            logger.info(f"Indexed {count} chunks from {path}" + (f", removed {len(stale)} stale" if stale else ""))
+            written += count
+
+    if not written:
+        logger.warning("No text to ingest")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk, embed and index text files for RAG")
+    parser.add_argument('paths', nargs='+', help='text files to ingest')
+    parser.add_argument('--persist-dir', help='Chroma directory (default: RAG_PERSIST_DIR)')
+    parser.add_argument('--collection', default=DEFAULT_COLLECTION)
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--batch-size', type=int, help=f'chunks per encode call (default {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--workers', type=int, help='embedding processes (default: number of CPUs)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    ingest_files(args.paths, args.persist_dir, args.collection, args.model, args.batch_size, args.workers)
+
+
+if __name__ == "__main__":
+    main()
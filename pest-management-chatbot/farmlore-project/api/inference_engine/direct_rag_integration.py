@@ -11,6 +11,12 @@ import logging
 from difflib import SequenceMatcher
 from typing import List, Dict, Any, Optional, Tuple
 
+try:
+    from .bm25_index import MIN_RELEVANCE, BM25Index
+except ImportError:
+    # Imported as a top-level module (e.g. by hybrid_engine_integrator)
+    from bm25_index import MIN_RELEVANCE, BM25Index
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -170,54 +176,23 @@ def get_keywords(text: str) -> List[str]:
     words = [word for word in text.split() if word not in stop_words]
     return words
 
+# Keyword index over PEST_DATA, tokenized with get_keywords so stop words match
+_search_index = BM25Index(PEST_DATA, get_keywords)
+
+def rebuild_index() -> None:
+    """Rebuild the keyword index after PEST_DATA has changed"""
+    global _search_index
+    _search_index = BM25Index(PEST_DATA, get_keywords)
+
 def simple_similarity(text1: str, text2: str) -> float:
     """Calculate simple text similarity using SequenceMatcher"""
     return SequenceMatcher(None, clean_text(text1), clean_text(text2)).ratio()
 
 def search_pest_data(query: str, top_n: int = 2) -> List[Dict[str, Any]]:
-    """Search the pest data directly using keyword matching and text similarity"""
-    query_keywords = set(get_keywords(query))
-    results = []
-    
-    logger.info(f"Searching for: '{query}' with keywords: {query_keywords}")
-    
-    for item in PEST_DATA:
-        title = item["title"]
-        content = item["content"]
-        
-        # Calculate keyword matching score
-        content_keywords = set(get_keywords(content))
-        title_keywords = set(get_keywords(title))
-        
-        # Count matching keywords
-        content_match_count = len(query_keywords.intersection(content_keywords))
-        title_match_count = len(query_keywords.intersection(title_keywords))
-        
-        # Calculate similarity scores
-        title_sim = simple_similarity(query, title)
-        content_sim = simple_similarity(query, content)
-        
-        # Combined score (weight title matches more heavily)
-        score = (
-            (content_match_count * 0.5) + 
-            (title_match_count * 2.0) + 
-            (title_sim * 3.0) + 
-            (content_sim * 1.0)
-        )
-        
-        logger.debug(f"Item: {title}, Score: {score} (title_sim={title_sim}, content_sim={content_sim})")
-        
-        results.append({
-            "title": title,
-            "content": content,
-            "score": score
-        })
-    
-    # Sort by score descending
-    results.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Return top_n results
-    return results[:top_n]
+    """Search the pest data with the BM25 keyword index (title matches weighted higher)"""
+    results = _search_index.search(query, top_n)
+    logger.info(f"Searching for: '{query}' found {len(results)} matching items")
+    return results
 
 def enhance_response(query: str, original_response: str) -> Tuple[str, List[Dict[str, Any]]]:
     """Enhance a response using the RAG approach with direct text search"""
@@ -233,8 +208,8 @@ def enhance_response(query: str, original_response: str) -> Tuple[str, List[Dict
     logger.info(f"Found relevant information: {top_result['title']}")
     
     # Check if result is highly relevant
-    if top_result["score"] < 1.0:
-        logger.info(f"Top result score ({top_result['score']}) below threshold, not enhancing")
+    if top_result["relevance"] < MIN_RELEVANCE:
+        logger.info(f"Top result relevance ({top_result['relevance']:.2f}) below threshold, not enhancing")
         return original_response, search_results
     
     # Extract useful information from the top result
@@ -32,13 +32,13 @@ class RAGQueryIntegration:
         """Initialize the RAG system"""
         try:
             from langchain_community.vectorstores import Chroma
-            from langchain_community.embeddings import HuggingFaceEmbeddings
+            from api.inference_engine.embedding_service import ServiceEmbeddings
             
             # Create the persist directory if it doesn't exist
             os.makedirs(self.persist_directory, exist_ok=True)
             
-            # Initialize embeddings
-            embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+            # Embeddings come from the process-wide model shared with the classifier
+            embeddings = ServiceEmbeddings("all-MiniLM-L6-v2")
             
             # Load vector store if it exists
             if os.path.exists(self.persist_directory):
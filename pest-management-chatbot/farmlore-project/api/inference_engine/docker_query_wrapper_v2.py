@@ -32,13 +32,15 @@ class RAGQueryIntegration:
         """Initialize the RAG system"""
         try:
             from langchain_community.vectorstores import Chroma
-            from langchain_community.embeddings import HuggingFaceEmbeddings
+            from api.inference_engine.embedding_cache import CachedEmbeddings
+            from api.inference_engine.embedding_service import ServiceEmbeddings
             
             # Create the persist directory if it doesn't exist
             os.makedirs(self.persist_directory, exist_ok=True)
             
-            # Initialize embeddings
-            embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+            # Embeddings come from the process-wide model shared with the classifier;
+            # cached, so context packing re-embeds retrieved chunks without model calls
+            embeddings = CachedEmbeddings(ServiceEmbeddings("all-MiniLM-L6-v2"), "all-MiniLM-L6-v2")
             
             # Load vector store if it exists
             if os.path.exists(self.persist_directory):
@@ -82,6 +84,26 @@ class RAGQueryIntegration:
         except Exception as e:
             logger.error(f"Error querying RAG system: {str(e)}")
             return []
+    
+    def query_context(self, query_text: str, k: int = 3, max_tokens: Optional[int] = None) -> str:
+        """
+        Retrieved knowledge for an LLM prompt: up to k distinct chunks within a token budget
+        
+        Args:
+            query_text: Natural language query
+            k: Maximum number of chunks in the context
+            max_tokens: Token budget for the context (default: RAG_CONTEXT_TOKENS)
+            
+        Returns:
+            The selected chunks joined by blank lines ('' if nothing was found)
+        """
+        from api.inference_engine.context_packing import FETCH_FACTOR, pack_context
+        
+        candidates = self.query(query_text, k=k * FETCH_FACTOR)
+        if not candidates:
+            return ""
+        embeddings = getattr(self.vector_store, 'embeddings', None)
+        return "\n\n".join(pack_context(query_text, candidates, embeddings, max_tokens=max_tokens, max_chunks=k))
 
 def apply_rag_direct():
     """Apply the RAG enhancement directly to HybridEngine class"""
@@ -119,10 +141,9 @@ def apply_rag_direct():
             rag_context = None
             if user_query:
                 logger.info(f"Querying RAG system with: {user_query}")
-                rag_results = rag_integration.query(user_query)
+                rag_context = rag_integration.query_context(user_query) or None
                 
-                if rag_results:
-                    rag_context = "\n\n".join(rag_results)
+                if rag_context:
                     logger.info(f"RAG context found, {len(rag_context)} characters")
                 else:
                     logger.info("No RAG context found")
@@ -220,10 +241,9 @@ def apply_direct_monkey_patch():
                         rag_context = None
                         if user_query:
                             logger.info(f"Querying RAG system with: {user_query}")
-                            rag_results = rag_integration.query(user_query)
+                            rag_context = rag_integration.query_context(user_query) or None
                             
-                            if rag_results:
-                                rag_context = "\n\n".join(rag_results)
+                            if rag_context:
                                 logger.info(f"RAG context found, {len(rag_context)} characters")
                             else:
                                 logger.info("No RAG context found")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Embedding Cache
+
+Persistent cache of sentence-transformer embeddings keyed by model name and a
+SHA-256 hash of the text, so rebuilding a vector store (PrologToRAGConverter,
+rag_database_creator, simple_rag_db_creator) or starting the
+EmbeddingsClassifier does not recompute embeddings for text that was already
+embedded by the same model.
+
+Vectors are stored as float32 blobs in a SQLite file (EMBEDDING_CACHE_PATH,
+default ./data/embedding_cache.sqlite3), which is safe to share between
+processes. Query embeddings are kept only in a small in-memory LRU
+(EMBEDDING_QUERY_CACHE_SIZE entries) of packed float32 arrays, since the same
+questions recur often; writing them to SQLite would put a commit on the
+request path and grow the file with every distinct question. Query-cache hits
+and misses are reported to the performance monitor as "query_embeddings".
+
+The cache has no dependency on numpy or langchain: ``encode`` callables may
+return numpy arrays or plain lists, and vectors come back as lists of floats.
+CachedEmbeddings wraps a langchain embeddings object with the same
+embed_documents/embed_query interface, so it can be passed to Chroma directly.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    from .retrieval_cache import report_cache_event
+except ImportError:
+    from retrieval_cache import report_cache_event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "./data/embedding_cache.sqlite3"
+DEFAULT_QUERY_CACHE_SIZE = 1024
+
+Vector = List[float]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector) -> bytes:
+    if hasattr(vector, "astype"):
+        return vector.astype("float32").tobytes()
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> Vector:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """SQLite-backed (model, text hash) -> float32 vector cache, with an in-memory LRU for queries"""
+
+    def __init__(self, path: Optional[str] = None, query_cache_size: Optional[int] = None):
+        self.path = path or os.environ.get("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        if query_cache_size is None:
+            query_cache_size = int(os.environ.get("EMBEDDING_QUERY_CACHE_SIZE", DEFAULT_QUERY_CACHE_SIZE))
+        self.query_cache_size = query_cache_size
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        # Query vectors are held as packed float32 arrays (4 bytes per value instead of a
+        # Python float object each), converted back to lists on a hit
+        self._queries: "OrderedDict[tuple, array]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.query_hits = 0
+        self.query_misses = 0
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[Vector]]:
+        """Cached vectors for ``texts`` (None where the text was not embedded before)"""
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, Vector] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                )
+                found.update((digest, _from_blob(blob)) for digest, blob in rows)
+        return [found.get(digest) for digest in hashes]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence) -> None:
+        rows = [(model, text_hash(text), _to_blob(vector)) for text, vector in zip(texts, vectors)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def embed(self, model: str, texts: Sequence[str], encode: Callable[[List[str]], Sequence]) -> List[Vector]:
+        """Embed ``texts``, calling ``encode`` once with only the texts missing from the cache"""
+        vectors = self.get_many(model, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        self.hits += len(texts) - sum(vector is None for vector in vectors)
+        self.misses += len(missing)
+
+        if missing:
+            encoded = encode(missing)
+            self.put_many(model, missing, encoded)
+            fresh = {text: _from_blob(_to_blob(vector)) for text, vector in zip(missing, encoded)}
+            vectors = [vector if vector is not None else fresh[text] for text, vector in zip(texts, vectors)]
+            logger.info(f"Embedded {len(missing)} new texts with {model}; {len(texts) - len(missing)} served from cache")
+        return vectors
+
+    def embed_query(self, model: str, text: str, encode: Callable[[List[str]], Sequence]) -> Vector:
+        """Embed a single query through the in-memory LRU; queries never touch the on-disk cache"""
+        key = (model, text)
+        with self._lock:
+            vector = self._queries.get(key)
+            if vector is not None:
+                self._queries.move_to_end(key)
+                self.query_hits += 1
+            else:
+                self.query_misses += 1
+        report_cache_event("query_embeddings", vector is not None)
+        if vector is not None:
+            return vector.tolist()
+
+        packed = array("f", encode([text])[0])
+
+        with self._lock:
+            self._queries[key] = packed
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+        return packed.tolist()
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            query_total = self.query_hits + self.query_misses
+            total = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "query_cache_size": len(self._queries),
+                "query_hits": self.query_hits,
+                "query_misses": self.query_misses,
+                "query_hit_rate": self.query_hits / query_total if query_total else 0.0,
+            }
+
+
+class CachedEmbeddings:
+    """Langchain-compatible embeddings wrapper that reads and fills an EmbeddingCache"""
+
+    def __init__(self, embeddings, model_name: str, cache: Optional[EmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or get_embedding_cache()
+
+    def embed_documents(self, texts: List[str]) -> List[Vector]:
+        return self.cache.embed(self.model_name, list(texts), self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> Vector:
+        return self.cache.embed_query(self.model_name, text, lambda texts: [self.embeddings.embed_query(texts[0])])
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache"""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = EmbeddingCache()
+            logger.info(f"Embedding cache at {_cache_instance.path}")
+        return _cache_instance
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+"""
+Embedding Service
+
+A single provider of sentence-transformer embeddings for every consumer in a
+process: the EmbeddingsClassifier, PrologToRAGConverter and RAGQuery (both
+vector backends), the Docker RAG wrappers and the database creator scripts.
+Each model is loaded once per process, on the first encode rather than at
+startup, and shared, so a worker holds one copy of the weights instead of one
+per consumer.
+
+encode() embeds in batches of EMBEDDING_BATCH_SIZE texts (default 32) and
+returns a float32 matrix. Calls are serialized per model: torch already uses
+every core for one batch, so concurrent calls would only compete. The service
+counts calls, texts, batches and the time spent loading and encoding
+(get_stats()).
+
+Backends: EMBEDDING_BACKEND selects how sentence-transformers runs the model:
+'torch' (default), 'onnx' (ONNX Runtime, via optimum) or 'openvino'. The
+exported graphs compute the same pooled, normalized embeddings as torch, to
+within float32 rounding (python -m benchmarks.embedding_backends compares
+them and times single-query and batch encodes). EMBEDDING_MODEL_FILE picks a
+specific export from the model repository, e.g. onnx/model_qint8_avx2.onnx for
+the int8-quantized graph (faster, but only close to torch, not identical).
+These backends need sentence-transformers >= 3.2 and
+``pip install optimum[onnxruntime]`` (or ``optimum[openvino]``); if they cannot
+be loaded, the service logs a warning and uses torch.
+
+Sidecar mode: with EMBEDDING_SERVICE_SOCKET set, get_embedding_service()
+returns a client that sends encode requests over that Unix socket to one
+sidecar process holding the models, so all gunicorn workers on a host share a
+single copy. Start the sidecar with
+
+    python -m api.inference_engine.embedding_service --socket /tmp/farmlore-embeddings.sock
+
+If the sidecar is not running (no socket file, or the connection is refused),
+the client logs a warning and encodes in-process instead. A sidecar that
+accepts the request but does not reply within the client timeout raises
+TimeoutError: it is busy, and loading a private copy of the model in every
+worker would defeat the sidecar.
+
+Wire format (both directions): a 4-byte big-endian length, then that many
+bytes of JSON. Requests are {"model": ..., "texts": [...]}; a reply is
+{"shape": [rows, dim]} followed by rows * dim little-endian float32 values, or
+{"error": message}.
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 32
+BACKENDS = ("torch", "onnx", "openvino")
+DEFAULT_BACKEND = "torch"
+
+_LENGTH = struct.Struct("!I")
+
+
+def load_model(model_name: str, backend: str = DEFAULT_BACKEND, model_file: Optional[str] = None,
+               threads: Optional[int] = None):
+    """Load a SentenceTransformer running on ``backend``"""
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    model_kwargs = {}
+    if model_file:
+        model_kwargs["file_name"] = model_file
+    if backend == "onnx":
+        model_kwargs["provider"] = "CPUExecutionProvider"
+        if threads:
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = threads
+            model_kwargs["session_options"] = session_options
+    return SentenceTransformer(model_name, backend=backend, model_kwargs=model_kwargs or None)
+
+
+class EmbeddingService:
+    """Process-local, lazily loaded sentence-transformer models with batched, instrumented encode"""
+
+    def __init__(self, batch_size: Optional[int] = None, backend: Optional[str] = None,
+                 model_file: Optional[str] = None):
+        self.batch_size = batch_size or int(os.environ.get("EMBEDDING_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        self.backend = (backend or os.environ.get("EMBEDDING_BACKEND", DEFAULT_BACKEND)).lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{self.backend}', expected one of {BACKENDS}")
+        self.model_file = model_file or os.environ.get("EMBEDDING_MODEL_FILE") or None
+        # Inference threads for the ONNX session (ingestion workers split the cores); None: all cores
+        self.threads: Optional[int] = None
+        self._models: Dict[str, object] = {}
+        self._backends: Dict[str, str] = {}
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+        self.batches = 0
+        self.encode_seconds = 0.0
+        self.load_seconds = 0.0
+
+    def _model_lock(self, model_name: str) -> threading.Lock:
+        with self._lock:
+            return self._model_locks.setdefault(model_name, threading.Lock())
+
+    def _load(self, model_name: str):
+        """Load the model on first use. Caller holds the model's lock."""
+        model = self._models.get(model_name)
+        if model is None:
+            started = time.perf_counter()
+            backend = self.backend
+            try:
+                model = load_model(model_name, backend, self.model_file, self.threads)
+            except (ImportError, TypeError, ValueError, OSError) as e:
+                if backend == "torch":
+                    raise
+                logger.warning(f"Could not load {model_name} with the {backend} backend ({e}); using torch")
+                backend = "torch"
+                model = load_model(model_name)
+            elapsed = time.perf_counter() - started
+            self._models[model_name] = model
+            self._backends[model_name] = backend
+            with self._stats_lock:
+                self.load_seconds += elapsed
+            logger.info(f"Loaded sentence transformer {model_name} ({backend}) in {elapsed:.1f}s")
+        return model
+
+    def encode(self, texts: Sequence[str], model_name: str = DEFAULT_MODEL) -> np.ndarray:
+        """Embed ``texts`` with ``model_name``; one float32 row per text"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        with self._model_lock(model_name):
+            model = self._load(model_name)
+            started = time.perf_counter()
+            vectors = model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
+            elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.calls += 1
+            self.texts += len(texts)
+            self.batches += -(-len(texts) // self.batch_size)
+            self.encode_seconds += elapsed
+        logger.debug(f"Encoded {len(texts)} texts with {model_name} in {elapsed * 1000:.1f} ms")
+        return np.asarray(vectors, dtype=np.float32)
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            return {
+                "mode": "local",
+                "backend": self.backend,
+                "models": sorted(self._models),
+                "model_backends": dict(self._backends),
+                "batch_size": self.batch_size,
+                "calls": self.calls,
+                "texts": self.texts,
+                "batches": self.batches,
+                "encode_seconds": self.encode_seconds,
+                "load_seconds": self.load_seconds,
+                "texts_per_second": self.texts / self.encode_seconds if self.encode_seconds else 0.0,
+            }
+
+
+def _send(sock: socket.socket, payload: Dict, data: bytes = b"") -> None:
+    body = json.dumps(payload).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(body)) + body + data)
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("embedding service connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _receive(sock: socket.socket) -> Dict:
+    size, = _LENGTH.unpack(_receive_exactly(sock, _LENGTH.size))
+    return json.loads(_receive_exactly(sock, size).decode("utf-8"))
+
+
+class RemoteEmbeddingService:
+    """Client for the embedding sidecar; falls back to a local service when it is not running"""
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local: Optional[EmbeddingService] = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+        self.fallbacks = 0
+        self.request_seconds = 0.0
+
+    def _request(self, texts: List[str], model_name: str) -> np.ndarray:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            _send(sock, {"model": model_name, "texts": texts})
+            reply = _receive(sock)
+            if "error" in reply:
+                raise RuntimeError(f"embedding service error: {reply['error']}")
+            rows, dim = reply["shape"]
+            data = _receive_exactly(sock, rows * dim * 4)
+        return np.frombuffer(data, dtype="<f4").reshape(rows, dim)
+
+    def encode(self, texts: Sequence[str], model_name: str = DEFAULT_MODEL) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        started = time.perf_counter()
+        try:
+            vectors = self._request(texts, model_name)
+        except socket.timeout as e:
+            raise TimeoutError(f"embedding service at {self.socket_path} did not reply within {self.timeout}s") from e
+        except (ConnectionRefusedError, FileNotFoundError) as e:
+            with self._lock:
+                self.fallbacks += 1
+                if self._local is None:
+                    logger.warning(f"Embedding service at {self.socket_path} unavailable ({e}); encoding in-process")
+                    self._local = EmbeddingService()
+            return self._local.encode(texts, model_name)
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+            self.request_seconds += time.perf_counter() - started
+        return vectors
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = {
+                "mode": "sidecar",
+                "socket": self.socket_path,
+                "calls": self.calls,
+                "texts": self.texts,
+                "request_seconds": self.request_seconds,
+                "fallbacks": self.fallbacks,
+            }
+        if self._local is not None:
+            stats["local"] = self._local.get_stats()
+        return stats
+
+
+class ServiceEmbeddings:
+    """Langchain-compatible embed_documents/embed_query over the shared embedding service"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, service=None):
+        self.model_name = model_name
+        self._service = service
+
+    @property
+    def service(self):
+        return self._service or get_embedding_service()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.service.encode(texts, self.model_name).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.service.encode([text], self.model_name)[0].tolist()
+
+
+_service_instance = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service():
+    """Get the process-wide embedding service (a sidecar client if EMBEDDING_SERVICE_SOCKET is set)"""
+    global _service_instance
+    with _service_lock:
+        if _service_instance is None:
+            socket_path = os.environ.get("EMBEDDING_SERVICE_SOCKET")
+            if socket_path:
+                _service_instance = RemoteEmbeddingService(socket_path)
+                logger.info(f"Using embedding service at {socket_path}")
+            else:
+                _service_instance = EmbeddingService()
+        return _service_instance
+
+
+class _EncodeHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            request = _receive(self.request)
+            vectors = self.server.service.encode(request["texts"], request.get("model", DEFAULT_MODEL))
+        except ConnectionError:
+            return
+        except Exception as e:
+            logger.error(f"Embedding request failed: {str(e)}")
+            _send(self.request, {"error": str(e)})
+            return
+        _send(self.request, {"shape": list(vectors.shape)}, vectors.astype("<f4").tobytes())
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    """Unix-socket sidecar serving encode requests from one shared EmbeddingService"""
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: Optional[EmbeddingService] = None):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.service = service or EmbeddingService()
+        super().__init__(socket_path, _EncodeHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sentence-transformer embeddings over a Unix socket")
+    parser.add_argument('--socket', default=os.environ.get("EMBEDDING_SERVICE_SOCKET", "/tmp/farmlore-embeddings.sock"))
+    parser.add_argument('--preload', default=DEFAULT_MODEL, help='model to load before accepting requests ("" for none)')
+    parser.add_argument('--backend', choices=BACKENDS, help='inference backend (default: EMBEDDING_BACKEND or torch)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = EmbeddingServer(args.socket, EmbeddingService(backend=args.backend))
+    if args.preload:
+        server.service.encode(["warm up"], args.preload)
+    logger.info(f"Embedding service listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Embedding service stats: {server.service.get_stats()}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+Embeddings-based Query Classifier
+
+Classifies agricultural queries by semantic similarity instead of keyword
+lists: each prompt type is represented by the mean embedding of a handful of
+example queries, and a query gets the type whose mean is closest by cosine
+similarity (GENERAL below MIN_SIMILARITY).
+
+Embeddings come from the process-wide embedding service, so the classifier
+shares its model with the RAG system rather than loading a copy of its own,
+and go through the shared embedding cache: the example embeddings are read
+from disk after the first start, query embeddings from the in-memory LRU.
+"""
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .embedding_cache import get_embedding_cache
+    from .embedding_service import DEFAULT_MODEL, get_embedding_service
+    from .prompt_templates import PromptType
+except ImportError:
+    from embedding_cache import get_embedding_cache
+    from embedding_service import DEFAULT_MODEL, get_embedding_service
+    from prompt_templates import PromptType
+
+logger = logging.getLogger(__name__)
+
+# Cosine similarity below which a query is classified as GENERAL
+MIN_SIMILARITY = 0.5
+
+CATEGORY_EXAMPLES: Dict[PromptType, List[str]] = {
+    PromptType.PEST_MANAGEMENT: [
+        "how to control aphids on my tomatoes",
+        "what's the best way to get rid of beetles",
+        "natural ways to manage whiteflies",
+        "organic pesticides for vegetable garden",
+        "how to prevent pests in my garden",
+        "controlling spider mites on cucumber plants",
+        "best spray for tomato hornworm",
+        "how to kill garden pests without chemicals",
+        "beneficial insects to control aphids",
+        "how do ladybugs help with pest control",
+    ],
+    PromptType.PEST_IDENTIFICATION: [
+        "what are these black spots on my tomato leaves",
+        "my plants have yellow leaves what could it be",
+        "what pest causes holes in cucumber leaves",
+        "white powdery coating on my zucchini plants",
+        "why are my plant's leaves curling",
+        "what's eating my tomato fruit",
+        "small white insects on the underside of leaves",
+        "my plants are wilting despite watering",
+        "brown patches on my crops",
+        "what disease causes purple stems on tomatoes",
+    ],
+    PromptType.SOIL_ANALYSIS: [
+        "what nutrients do tomatoes need",
+        "best soil pH for growing peppers",
+        "how to improve clay soil for gardening",
+        "signs of nitrogen deficiency in plants",
+        "how to test soil fertility at home",
+        "best fertilizer for vegetable gardens",
+        "organic soil amendments for tomatoes",
+        "why is my soil compacted",
+        "how much compost to add to garden soil",
+        "fixing phosphorus deficiency in plants",
+    ],
+    PromptType.INDIGENOUS_KNOWLEDGE: [
+        "traditional farming methods for corn",
+        "ancient techniques for pest control",
+        "indigenous crop rotation practices",
+        "how did ancestors predict weather for farming",
+        "cultural farming practices for sustainability",
+        "native american three sisters planting",
+        "traditional ways to preserve seeds",
+        "old farming wisdom about pest management",
+        "indigenous plant companion planting",
+        "historical farming methods without chemicals",
+    ],
+    PromptType.GENERAL: [
+        "when to plant tomatoes",
+        "how much water do peppers need",
+        "best time to harvest carrots",
+        "how to increase tomato yield",
+        "growing vegetables in containers",
+        "starting seeds indoors guide",
+        "vegetable garden layout ideas",
+        "how to grow organic vegetables",
+        "winter gardening tips",
+        "crop rotation basics",
+    ],
+}
+
+
+class EmbeddingsClassifier:
+    """Classifies queries by cosine similarity to the mean embedding of each category's examples"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, service=None, cache=None):
+        """
+        Args:
+            model_name: Sentence-transformer model name
+            service: EmbeddingService to encode with (the process-wide one by default)
+            cache: EmbeddingCache to read and fill (the shared cache by default)
+        """
+        self.model_name = model_name
+        self.service = service or get_embedding_service()
+        self.cache = cache or get_embedding_cache()
+        self.category_examples = CATEGORY_EXAMPLES
+        self.category_embeddings = {
+            category: np.mean(self._encode(examples), axis=0)
+            for category, examples in self.category_examples.items()
+        }
+        logger.info(f"EmbeddingsClassifier ready with {len(self.category_embeddings)} categories ({model_name})")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.service.encode(texts, self.model_name)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.cache.embed(self.model_name, texts, self.encode), dtype=np.float32)
+
+    def similarities(self, query: str) -> Dict[PromptType, float]:
+        """Cosine similarity of ``query`` to every category"""
+        query_embedding = np.asarray(self.cache.embed_query(self.model_name, query, self.encode), dtype=np.float32)
+        query_norm = np.linalg.norm(query_embedding)
+        return {
+            category: float(np.dot(query_embedding, embedding) / (query_norm * np.linalg.norm(embedding)))
+            for category, embedding in self.category_embeddings.items()
+        }
+
+    def classify(self, query: str) -> PromptType:
+        """The most similar category, or GENERAL if nothing is similar enough"""
+        try:
+            category, similarity = max(self.similarities(query).items(), key=lambda item: item[1])
+        except Exception as e:
+            logger.error(f"Error classifying query: {str(e)}")
+            return PromptType.GENERAL
+        logger.debug(f"Classified '{query}' as {category.name} with similarity {similarity:.4f}")
+        if similarity < MIN_SIMILARITY:
+            return PromptType.GENERAL
+        return category
+
+
+_classifier_instance: Optional[EmbeddingsClassifier] = None
+
+
+def detect_prompt_type_embeddings(query: str) -> PromptType:
+    """
+    Detect the prompt type with the embeddings classifier, created on first use.
+
+    Same interface as prompt_templates.detect_prompt_type; GENERAL if the
+    classifier cannot be created.
+    """
+    global _classifier_instance
+    if _classifier_instance is None:
+        try:
+            _classifier_instance = EmbeddingsClassifier()
+        except Exception as e:
+            logger.error(f"Failed to initialize EmbeddingsClassifier: {str(e)}")
+            return PromptType.GENERAL
+    return _classifier_instance.classify(query)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""
+Frame Index Manifest
+
+Bookkeeping for incremental vector-store indexing of Prolog frames
+(PrologToRAGConverter). Every frame gets a stable ID built from its source
+file, frame type and name, plus a hash of the text snippets generated from it.
+The manifest, persisted as JSON next to the vector store, records the hash and
+snippet count of each indexed frame, so a re-index only embeds frames that are
+new or whose content changed, and deletes the documents of frames that changed
+or disappeared.
+
+Document IDs are derived from the frame ID (``<frame_id>#<n>``), so the
+documents of a frame can be deleted without querying the vector store.
+
+Reference texts ingested into the same store (corpus_ingestion) are recorded in
+a second manifest, source file -> {hash, chunks}. The content version of the
+store combines both, so result caches and the keyword index see ingestion as
+well as frame changes.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "frame_manifest.json"
+CORPUS_MANIFEST_FILENAME = "corpus_manifest.json"
+
+# Bump when the frame-to-text conversion changes, so every frame is re-embedded
+MANIFEST_VERSION = 1
+
+
+def frame_id(source_file: str, frame_type: Optional[str], name: Optional[str], ordinal: int) -> str:
+    """Stable ID for a frame: ``<file>:<type>:<name>``, or its position when it has no name"""
+    source = os.path.basename(source_file)
+    return f"{source}:{frame_type or 'frame'}:{name if name else f'#{ordinal}'}"
+
+
+def content_hash(texts: Iterable[str]) -> str:
+    """Order-independent hash of the text snippets generated for a frame"""
+    digest = hashlib.sha256()
+    for text in sorted(texts):
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def document_ids(frame: str, count: int) -> List[str]:
+    """Vector-store document IDs for the ``count`` snippets of a frame"""
+    return [f"{frame}#{n}" for n in range(count)]
+
+
+class IndexPlan(NamedTuple):
+    """What a re-index has to do to bring the vector store up to date"""
+    upserts: List[str]      # frame IDs that are new or changed and must be embedded
+    stale_ids: List[str]    # document IDs of changed or removed frames to delete
+    removed: List[str]      # frame IDs no longer present in the knowledge base
+    unchanged: int
+
+
+class FrameManifest:
+    """Frame ID -> {hash, chunks} record of what is currently in the vector store"""
+
+    def __init__(self, path: str, frames: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self.frames: Dict[str, Dict] = frames or {}
+
+    @classmethod
+    def load(cls, persist_directory: str) -> Optional["FrameManifest"]:
+        """Load the manifest stored in ``persist_directory``.
+
+        Returns None when there is no usable manifest (missing, unreadable or
+        written by another MANIFEST_VERSION), in which case the store has to be
+        rebuilt from scratch.
+        """
+        path = os.path.join(persist_directory, MANIFEST_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable frame manifest {path}: {e}")
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info(f"Frame manifest {path} has version {data.get('version')}, expected {MANIFEST_VERSION}")
+            return None
+        return cls(path, data.get("frames", {}))
+
+    @classmethod
+    def empty(cls, persist_directory: str) -> "FrameManifest":
+        return cls(os.path.join(persist_directory, MANIFEST_FILENAME))
+
+    def plan(self, current: Dict[str, str]) -> IndexPlan:
+        """Compare ``current`` (frame ID -> content hash) against the indexed frames"""
+        upserts, stale_ids = [], []
+        for frame, digest in current.items():
+            entry = self.frames.get(frame)
+            if entry is None:
+                upserts.append(frame)
+            elif entry["hash"] != digest:
+                upserts.append(frame)
+                stale_ids.extend(document_ids(frame, entry["chunks"]))
+
+        removed = [frame for frame in self.frames if frame not in current]
+        for frame in removed:
+            stale_ids.extend(document_ids(frame, self.frames[frame]["chunks"]))
+
+        return IndexPlan(upserts, stale_ids, removed, len(current) - len(upserts))
+
+    def record(self, frame: str, digest: str, chunks: int) -> None:
+        self.frames[frame] = {"hash": digest, "chunks": chunks}
+
+    @property
+    def index_version(self) -> str:
+        """Short hash of every indexed frame's hash; changes whenever the store's content does"""
+        digest = hashlib.sha256()
+        for frame in sorted(self.frames):
+            digest.update(f"{frame}\0{self.frames[frame]['hash']}\0".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def forget(self, frames: Iterable[str]) -> None:
+        for frame in frames:
+            self.frames.pop(frame, None)
+
+    def save(self) -> None:
+        """Write the manifest atomically, so a crash never leaves a half-written file"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "frames": self.frames}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class CorpusManifest:
+    """Source file -> {hash, chunks} record of the reference texts ingested into the vector store"""
+
+    def __init__(self, path: str, sources: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self.sources: Dict[str, Dict] = sources or {}
+
+    @classmethod
+    def load(cls, persist_directory: str) -> "CorpusManifest":
+        """Load the corpus manifest in ``persist_directory``, empty if there is none"""
+        path = os.path.join(persist_directory, CORPUS_MANIFEST_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f).get("sources", {}))
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable corpus manifest {path}: {e}")
+            return cls(path)
+
+    def record(self, source: str, digest: str, chunks: int) -> None:
+        self.sources[source] = {"hash": digest, "chunks": chunks}
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def store_version(frames: FrameManifest, corpus: Optional[CorpusManifest] = None) -> str:
+    """Content version of a store holding the frames in ``frames`` and the texts in ``corpus``"""
+    if corpus is None or not corpus.sources:
+        return frames.index_version
+    digest = hashlib.sha256(frames.index_version.encode("utf-8"))
+    for source in sorted(corpus.sources):
+        entry = corpus.sources[source]
+        digest.update(f"{source}\0{entry['hash']}\0{entry['chunks']}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class StoreVersion:
+    """
+    Live content version of a persisted Chroma store.
+
+    Sync and ingestion may run in another process, so the version is derived
+    from the manifests on disk. They are re-read only when their inode (they are
+    replaced atomically), modification time or size changes, so checking the
+    version per query costs two stat calls.
+    None while the store has no frame manifest (its content is unknown).
+    """
+
+    def __init__(self, persist_directory: str):
+        self.persist_directory = persist_directory
+        self._signature = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _stat(self) -> tuple:
+        signature = []
+        for filename in (MANIFEST_FILENAME, CORPUS_MANIFEST_FILENAME):
+            try:
+                stat = os.stat(os.path.join(self.persist_directory, filename))
+                signature.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    @property
+    def current(self) -> Optional[str]:
+        signature = self._stat()
+        if signature != self._signature:
+            with self._lock:
+                frames = FrameManifest.load(self.persist_directory)
+                corpus = CorpusManifest.load(self.persist_directory)
+                self._version = store_version(frames, corpus) if frames is not None else None
+                self._signature = signature
+        return self._version
+
+
+def current_version(vector_store) -> Optional[str]:
+    """Content version of a vector store: live for Chroma stores, fixed for a NumpyVectorStore"""
+    stamp = getattr(vector_store, "version_stamp", None)
+    if stamp is not None:
+        return stamp.current
+    return getattr(vector_store, "version", None)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Hybrid Retriever
+
+Combines keyword (BM25) and vector retrieval for RAGQuery. Exact tokens such as
+pest names and Latin binomials ("Myzus persicae") are often missed by the
+embedding search and found by BM25, while paraphrased questions are the
+opposite, so both rankings are fused with reciprocal rank fusion (RRF):
+
+    score(doc) = sum over rankings of 1 / (rrf_k + rank)
+
+The two lookups run concurrently under one latency budget: the vector search
+in a small thread pool, BM25 (well under a millisecond) in the calling thread.
+If the vector search has not finished when the budget runs out, the keyword
+ranking is used on its own, so the retriever never waits longer than the
+budget for a result.
+
+The BM25 index is built over the vector store's own documents, with the frame
+name from the document metadata as a boosted title field. It is rebuilt when
+the store's content version changes (a re-index or an ingested text), so
+keyword search never lags behind the vector search.
+"""
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .bm25_index import BM25Index
+    from .frame_index import current_version
+except ImportError:
+    from bm25_index import BM25Index
+    from frame_index import current_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RRF_K = 60
+DEFAULT_LATENCY_BUDGET = 0.25  # seconds, for both lookups together
+# Each ranking contributes this many candidates per requested result
+CANDIDATE_FACTOR = 4
+
+STOP_WORDS = {"the", "a", "an", "in", "on", "at", "is", "are", "and", "or", "to", "of", "for", "with",
+              "how", "do", "i", "can", "what", "when", "why", "my", "it", "its", "be", "this", "that"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stop words; underscores split frame names"""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], rrf_k: int = DEFAULT_RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked lists of document keys, best first"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _store_documents(vector_store) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Texts and metadata of every document in a NumpyVectorStore or langchain Chroma store"""
+    if hasattr(vector_store, "documents") and hasattr(vector_store, "metadatas"):
+        return list(vector_store.documents), list(vector_store.metadatas)
+    data = vector_store.get(include=["documents", "metadatas"])
+    return list(data["documents"]), [metadata or {} for metadata in data["metadatas"]]
+
+
+def _title(metadata: Dict[str, Any]) -> str:
+    """Frame name from a frame ID such as 'knowledgebase.pl:pest:aphid_general'"""
+    frame = metadata.get("frame_id") or metadata.get("title") or ""
+    return frame.rsplit(":", 1)[-1].replace("_", " ")
+
+
+class HybridRetriever:
+    """BM25 + vector retrieval fused with reciprocal rank fusion under a latency budget"""
+
+    def __init__(self, vector_store, latency_budget: float = DEFAULT_LATENCY_BUDGET, rrf_k: int = DEFAULT_RRF_K):
+        self.vector_store = vector_store
+        self.latency_budget = latency_budget
+        self.rrf_k = rrf_k
+        self._build_lock = threading.Lock()
+        self.version = current_version(vector_store)
+        self.keyword_index = self._build_keyword_index()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-retriever")
+        self.budget_exceeded = 0
+
+    def _build_keyword_index(self) -> BM25Index:
+        texts, metadatas = _store_documents(self.vector_store)
+        index = BM25Index(
+            [{"title": _title(metadata), "content": text} for text, metadata in zip(texts, metadatas)],
+            tokenize,
+        )
+        logger.info(f"HybridRetriever indexed {len(texts)} documents for keyword search")
+        return index
+
+    def refresh(self) -> bool:
+        """Rebuild the BM25 index if the store's content version moved on; True if it was rebuilt"""
+        version = current_version(self.vector_store)
+        if version == self.version:
+            return False
+        with self._build_lock:
+            if version == self.version:
+                return False
+            logger.info(f"Vector store version changed ({self.version} -> {version}); rebuilding keyword index")
+            self.keyword_index = self._build_keyword_index()
+            self.version = version
+        return True
+
+    def keyword_search(self, query: str, k: int) -> List[str]:
+        return [result["content"] for result in self.keyword_index.search(query, k)]
+
+    def vector_search(self, query: str, k: int) -> List[str]:
+        return [doc.page_content for doc in self.vector_store.similarity_search(query, k=k)]
+
+    def retrieve(self, query: str, k: int = 3, latency_budget: Optional[float] = None) -> List[str]:
+        """Top-k document texts for ``query``"""
+        budget = self.latency_budget if latency_budget is None else latency_budget
+        candidates = k * CANDIDATE_FACTOR
+        self.refresh()
+        started = time.perf_counter()
+
+        # The vector search runs in the pool while BM25 (sub-millisecond) runs in this thread
+        vector_future = self._executor.submit(self.vector_search, query, candidates)
+        rankings = []
+        try:
+            rankings.append(self.keyword_search(query, candidates))
+        except Exception as e:
+            logger.error(f"BM25 retrieval failed: {str(e)}")
+
+        remaining = budget - (time.perf_counter() - started)
+        try:
+            rankings.append(vector_future.result(timeout=max(0.0, remaining)))
+        except FutureTimeoutError:
+            vector_future.cancel()
+            self.budget_exceeded += 1
+            logger.warning(f"Vector retrieval exceeded the {budget * 1000:.0f} ms latency budget; "
+                           f"using keyword results only")
+        except Exception as e:
+            logger.error(f"Vector retrieval failed: {str(e)}")
+
+        fused = reciprocal_rank_fusion(rankings, self.rrf_k)[:k]
+        logger.debug(f"Hybrid retrieval took {(time.perf_counter() - started) * 1000:.1f} ms "
+                     f"({len(rankings)} rankings fused)")
+        return [text for text, _ in fused]
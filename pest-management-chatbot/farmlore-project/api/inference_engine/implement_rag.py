@@ -1,11 +1,31 @@
 import os
 import logging
 import json
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
 import re
-from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# langchain and Chroma are imported where they are used: with
+# RAG_VECTOR_BACKEND=numpy the RAG system runs without loading them at all
+try:
+    from .context_packing import FETCH_FACTOR, pack_context
+    from .embedding_cache import CachedEmbeddings
+    from .embedding_service import ServiceEmbeddings
+    from .frame_index import FrameManifest, StoreVersion, content_hash, current_version, document_ids, frame_id
+    from .hybrid_retriever import DEFAULT_LATENCY_BUDGET, HybridRetriever
+    from .retrieval_cache import DEFAULT_RESULT_CACHE_SIZE, RetrievalCache, normalize_query
+    from .vector_index import NumpyVectorStore, index_version
+except ImportError:
+    from context_packing import FETCH_FACTOR, pack_context
+    from embedding_cache import CachedEmbeddings
+    from embedding_service import ServiceEmbeddings
+    from frame_index import FrameManifest, StoreVersion, content_hash, current_version, document_ids, frame_id
+    from hybrid_retriever import DEFAULT_LATENCY_BUDGET, HybridRetriever
+    from retrieval_cache import DEFAULT_RESULT_CACHE_SIZE, RetrievalCache, normalize_query
+    from vector_index import NumpyVectorStore, index_version
+
+# Vector store backends: 'chroma' (langchain + ChromaDB) or 'numpy' (memory-mapped NumpyVectorStore)
+DEFAULT_VECTOR_BACKEND = 'chroma'
+# Document IDs per Chroma delete call, below its maximum batch size
+DELETE_BATCH_SIZE = 5000
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -37,15 +57,17 @@ class PrologToRAGConverter:
     store them in a vector database.
     """
     
-    def __init__(self, embedding_model="all-MiniLM-L6-v2", persist_directory=None):
+    def __init__(self, embedding_model="all-MiniLM-L6-v2", persist_directory=None, backend=None):
         """
         Initialize the converter with the embedding model and storage location
         
         Args:
             embedding_model: HuggingFace model name for embeddings
             persist_directory: Directory to persist the vector database
+            backend: Vector store backend, 'chroma' or 'numpy' (default: RAG_VECTOR_BACKEND)
         """
         self.embed_model = embedding_model
+        self.backend = (backend or os.environ.get('RAG_VECTOR_BACKEND', DEFAULT_VECTOR_BACKEND)).lower()
         
         # Use environment variable if available, otherwise use default
         if persist_directory is None:
@@ -55,64 +77,55 @@ class PrologToRAGConverter:
             
         logger.info(f"Using persistence directory: {self.persist_directory}")
         
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
+        # Both backends embed through the shared, lazily loaded model; embeddings are
+        # cached on disk, so rebuilds only embed text not seen before
+        if self.backend != 'numpy':
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+        self.embeddings = CachedEmbeddings(ServiceEmbeddings(embedding_model), embedding_model)
         
         # Create the persist directory if it doesn't exist
         os.makedirs(self.persist_directory, exist_ok=True)
         
-        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        logger.info(f"PrologToRAGConverter initialized. Embeddings: {embedding_model}, Persist Dir: {self.persist_directory}")
+        logger.info(f"PrologToRAGConverter initialized. Embeddings: {embedding_model}, "
+                    f"Backend: {self.backend}, Persist Dir: {self.persist_directory}")
     
     def _parse_prolog_file(self, file_path):
         """
         Parse a Prolog file and extract frames
         
+        The file is read line by line and each frame is yielded as soon as its
+        closing ``]).`` is seen, so memory does not grow with the file size.
+        
         Args:
             file_path: Path to the Prolog file
             
-        Returns:
-            List of text chunks representing frames
+        Yields:
+            One text chunk per frame ("Type: <frame type>" followed by its slots)
         """
         logger.info(f"Parsing Prolog file: {file_path}")
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract frame definitions with regex
-            frame_pattern = r"frame\((\w+),\s*\[(.*?)\]\)"
-            frames_raw = re.findall(frame_pattern, content, re.DOTALL)
-            
-            text_chunks = []
-            for frame_type, frame_content in frames_raw:
-                # Parse the frame content into a more readable format
-                lines = frame_content.strip().split(',\n')
-                processed_lines = []
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    # Handle lists inside frame
-                    if '[' in line and ']' in line:
-                        key, value = line.split(':', 1)
-                        processed_lines.append(f"{key.strip()}: {value.strip()}")
-                    else:
-                        processed_lines.append(line)
-                
-                # Create a text chunk from the frame
-                text_chunk = f"Type: {frame_type}\n" + "\n".join(processed_lines)
-                text_chunks.append(text_chunk)
-            
-            logger.debug(f"Read {len(text_chunks)} lines from {file_path}")
-            return text_chunks
-            
-        except FileNotFoundError:
-            logger.error(f"Prolog file not found: {file_path}")
-            return []
+        count = 0
+        for frame_lines in self._iter_frames(self._iter_prolog_lines(file_path)):
+            frame_type, _, first_slots = frame_lines[0].partition(',')
+            first_slots = first_slots.strip()
+            if first_slots.startswith('['):
+                first_slots = first_slots[1:]
+            processed_lines = []
+            for line in [first_slots] + frame_lines[1:]:
+                line = line.strip().rstrip(',').strip()
+                if line:
+                    processed_lines.append(line)
+            count += 1
+            yield f"Type: {frame_type.strip()}\n" + "\n".join(processed_lines)
+        
+        logger.debug(f"Read {count} frames from {file_path}")
     
     def _group_lines_into_frames(self, content_lines):
-        frames = []
+        return list(self._iter_frames(content_lines))
+
+    def _iter_frames(self, content_lines):
+        """Yield the content lines of each frame(...) block in ``content_lines`` (any iterable of lines)"""
         current_frame_lines = []
         in_frame_block = False # Tracks if we are inside a frame(...) block
 
@@ -122,7 +135,7 @@ class PrologToRAGConverter:
             if not stripped_line or stripped_line.startswith('%') or stripped_line.startswith(':-'):
                 # If we encounter a comment/directive and were in a frame, end the current frame.
                 if in_frame_block and current_frame_lines:
-                    frames.append(current_frame_lines)
+                    yield current_frame_lines
                     current_frame_lines = []
                 in_frame_block = False
                 continue
@@ -130,14 +143,14 @@ class PrologToRAGConverter:
             # Detect start of a new frame block
             if stripped_line.lower().startswith('frame('):
                 if in_frame_block and current_frame_lines: # End previous frame
-                    frames.append(current_frame_lines)
+                    yield current_frame_lines
                 
                 # Start new frame, remove 'frame(' prefix
                 # And if it's a single line frame like frame(type, [...]). then handle it
                 if stripped_line.endswith(']).'):
                     # Single line frame
                     frame_content_part = stripped_line[len('frame('):-3] # Remove frame(...) and ]).
-                    frames.append([frame_content_part.strip()])
+                    yield [frame_content_part.strip()]
                     in_frame_block = False # Frame ended
                     current_frame_lines = []
                 else:
@@ -149,7 +162,7 @@ class PrologToRAGConverter:
                 if stripped_line.endswith(']).'):
                     current_frame_lines.append(stripped_line[:-3].strip()) # Remove ']).'
                     if current_frame_lines: # Add if not empty
-                        frames.append(current_frame_lines)
+                        yield current_frame_lines
                     current_frame_lines = []
                     in_frame_block = False
                 else:
@@ -160,10 +173,7 @@ class PrologToRAGConverter:
                 # frames.append([stripped_line]) # Treat as a single-line "frame" for processing
 
         if in_frame_block and current_frame_lines: # Add any trailing frame being built
-            frames.append(current_frame_lines)
-        
-        # logger.debug(f"Grouped into {len(frames)} frames. First frame (sample): {frames[0] if frames else 'N/A'}")
-        return frames
+            yield current_frame_lines
 
     def _process_frame_for_rag(self, frame_lines):
         # frame_lines is a list of strings, each being a content line from a frame(...) definition
@@ -238,44 +248,70 @@ class PrologToRAGConverter:
         # Deduplicate and filter empty strings
         return list(set(filter(None, texts)))
 
-    def convert_prolog_to_chunks(self, prolog_files):
+    def _iter_prolog_lines(self, file_path):
+        """Stream the raw lines of a Prolog file for frame grouping"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield line.rstrip('\n')
+        except FileNotFoundError:
+            logger.error(f"Prolog file not found: {file_path}")
+
+    def extract_frames(self, prolog_files):
         """
-        Converts Prolog files into a list of text chunks (Documents).
-        Each frame is processed into one or more descriptive text chunks.
+        Group the Prolog files into frames and generate their RAG text snippets.
+
+        Returns:
+            Dict of stable frame ID -> (content hash, list of text snippets)
         """
-        all_prolog_data = {}
+        frames = {}
         for file_path in prolog_files:
-            lines = self._parse_prolog_file(file_path)
-            if lines:
-                all_prolog_data[file_path] = lines
-        
-        all_extracted_texts = []
-        for file_path, content_lines in all_prolog_data.items():
+            if not os.path.exists(file_path):
+                logger.error(f"Prolog file not found: {file_path}")
+                continue
             logger.info(f"Grouping and processing frames from {file_path} for RAG...")
-            
-            frames = self._group_lines_into_frames(content_lines)
-            file_texts = []
-            for frame_idx, frame_lines in enumerate(frames):
-                # logger.debug(f"Processing frame {frame_idx+1}/{len(frames)} from {file_path} with {len(frame_lines)} lines.")
+
+            snippet_count = 0
+            for ordinal, frame_lines in enumerate(self._iter_frames(self._iter_prolog_lines(file_path))):
                 processed_texts = self._process_frame_for_rag(frame_lines)
-                if processed_texts:
-                    file_texts.extend(processed_texts)
-            
-            if file_texts:
-                logger.info(f"Extracted {len(file_texts)} text snippets from {file_path}")
-                all_extracted_texts.extend(file_texts)
+                if not processed_texts:
+                    continue
+                processed_texts.sort()
+                frame_type = frame_lines[0].split(',', 1)[0].strip() if frame_lines else None
+                name = _get_value_from_frame_lines(frame_lines, 'name')
+                key = frame_id(file_path, frame_type, name if isinstance(name, str) else None, ordinal)
+                if key in frames:
+                    # Same name defined twice in one file: keep both, the second by position
+                    key = frame_id(file_path, frame_type, None, ordinal)
+                frames[key] = (content_hash(processed_texts), processed_texts)
+                snippet_count += len(processed_texts)
+
+            if snippet_count:
+                logger.info(f"Extracted {snippet_count} text snippets from {file_path}")
             else:
                 logger.warning(f"No text snippets extracted from {file_path}")
+        return frames
 
-        # Create Langchain Document objects from the extracted texts
-        documents = [Document(page_content=text) for text in all_extracted_texts]
-        logger.info(f"Created {len(documents)} Document objects for RAG from all Prolog files.")
-        
-        # Optional: Further split large documents if any single processed text is too long
-        # For now, assuming _process_frame_for_rag generates reasonably sized chunks.
-        # If not, text_splitter can be used here on `documents`.
-        # Example: docs_for_store = self.text_splitter.split_documents(documents)
+    def _frame_metadata(self, frame, digest):
+        return {"frame_id": frame, "content_hash": digest, "source": frame.split(':', 1)[0]}
 
+    def _frame_documents(self, frame, digest, texts):
+        """Documents (and their IDs) for the text snippets of one frame"""
+        from langchain.schema import Document
+        metadata = self._frame_metadata(frame, digest)
+        documents = [Document(page_content=text, metadata=dict(metadata)) for text in texts]
+        return documents, document_ids(frame, len(texts))
+
+    def convert_prolog_to_chunks(self, prolog_files):
+        """
+        Converts Prolog files into a list of text chunks (Documents).
+        Each frame is processed into one or more descriptive text chunks,
+        tagged with the frame ID and content hash in their metadata.
+        """
+        documents = []
+        for frame, (digest, texts) in self.extract_frames(prolog_files).items():
+            documents.extend(self._frame_documents(frame, digest, texts)[0])
+        logger.info(f"Created {len(documents)} Document objects for RAG from all Prolog files.")
         return documents # Return the list of Document objects
 
     def _extract_text_from_prolog_content(self, prolog_content_lines):
@@ -291,6 +327,8 @@ class PrologToRAGConverter:
         """
         Creates a ChromaDB vector store from text chunks (Langchain Document objects).
         """
+        from langchain.schema import Document
+        from langchain_community.vectorstores import Chroma
         if not text_chunks_docs: # Changed variable name for clarity
             logger.warning("No text chunks provided to create vector store.")
             return None
@@ -312,12 +350,129 @@ class PrologToRAGConverter:
             logger.error(f"Error creating vector store: {str(e)}", exc_info=True) # Added exc_info
             return None
 
+    def sync_vector_store(self, frames):
+        """
+        Bring the persisted vector store in line with ``frames`` (from extract_frames).
+
+        Only frames that are new or whose content hash changed are embedded;
+        documents of changed and removed frames are deleted. The frame manifest
+        in the persist directory records what the store holds. Without a usable
+        manifest (first run, or a store built before frame IDs existed) the
+        frame documents are rebuilt from scratch; reference texts added by
+        corpus_ingestion are kept either way.
+        """
+        if self.backend == 'numpy':
+            return self._sync_numpy_index(frames)
+
+        from langchain_community.vectorstores import Chroma
+        manifest = FrameManifest.load(self.persist_directory)
+        vector_store = self.load_vector_store() if manifest is not None else None
+
+        if vector_store is None:
+            documents, ids = [], []
+            for frame, (digest, texts) in frames.items():
+                frame_docs, frame_ids = self._frame_documents(frame, digest, texts)
+                documents.extend(frame_docs)
+                ids.extend(frame_ids)
+            if not documents:
+                logger.warning("No text chunks provided to create vector store.")
+                return None
+
+            logger.info(f"Rebuilding vector store in {self.persist_directory}: {len(frames)} frames, {len(documents)} documents")
+            self._delete_frame_documents()
+            vector_store = Chroma.from_documents(
+                documents=documents,
+                embedding=self.embeddings,
+                ids=ids,
+                persist_directory=self.persist_directory
+            )
+            manifest = FrameManifest.empty(self.persist_directory)
+            for frame, (digest, texts) in frames.items():
+                manifest.record(frame, digest, len(texts))
+            manifest.save()
+            vector_store.version_stamp = StoreVersion(self.persist_directory)
+            return vector_store
+
+        plan = manifest.plan({frame: digest for frame, (digest, _) in frames.items()})
+        logger.info(f"Incremental RAG index: {len(plan.upserts)} new/changed frames, "
+                    f"{len(plan.removed)} removed, {plan.unchanged} unchanged")
+
+        if plan.stale_ids:
+            vector_store.delete(ids=plan.stale_ids)
+        manifest.forget(plan.removed)
+
+        documents, ids = [], []
+        for frame in plan.upserts:
+            digest, texts = frames[frame]
+            frame_docs, frame_ids = self._frame_documents(frame, digest, texts)
+            documents.extend(frame_docs)
+            ids.extend(frame_ids)
+            manifest.record(frame, digest, len(texts))
+        if documents:
+            vector_store.add_documents(documents, ids=ids)
+
+        manifest.save()
+        vector_store.version_stamp = StoreVersion(self.persist_directory)
+        return vector_store
+
+    def _sync_numpy_index(self, frames):
+        """
+        Rewrite the memory-mapped NumPy index if the frames changed.
+
+        The whole matrix is rewritten, but only new or changed snippets are
+        embedded: everything else comes from the embedding cache.
+        """
+        ids, texts, metadatas = [], [], []
+        for frame, (digest, frame_texts) in frames.items():
+            metadata = self._frame_metadata(frame, digest)
+            ids.extend(document_ids(frame, len(frame_texts)))
+            texts.extend(frame_texts)
+            metadatas.extend(dict(metadata) for _ in frame_texts)
+        if not texts:
+            logger.warning("No text chunks provided to create vector store.")
+            return None
+
+        existing = NumpyVectorStore.load(self.persist_directory, embedding=self.embeddings)
+        if (existing is not None and existing.model_name == self.embed_model
+                and existing.version == index_version(ids, texts)):
+            logger.info(f"Vector index {existing.version} is up to date ({len(existing)} documents)")
+            return existing
+
+        logger.info(f"Writing vector index in {self.persist_directory}: {len(frames)} frames, {len(texts)} documents")
+        vectors = self.embeddings.embed_documents(texts)
+        NumpyVectorStore.write(self.persist_directory, ids, texts, metadatas, vectors, self.embed_model)
+        return NumpyVectorStore.load(self.persist_directory, embedding=self.embeddings)
+
+    def _delete_frame_documents(self):
+        """
+        Delete the frame documents of a store without a manifest, so a rebuild doesn't duplicate them.
+
+        Documents tagged with a frame_id, and the metadata-less documents of stores
+        built before frame IDs existed, are deleted. Chunks written by
+        corpus_ingestion (which always carry their source) share the collection
+        and are kept.
+        """
+        from langchain_community.vectorstores import Chroma
+        try:
+            existing = Chroma(embedding_function=self.embeddings, persist_directory=self.persist_directory)
+            data = existing.get(include=["metadatas"])
+            stale = [doc_id for doc_id, metadata in zip(data["ids"], data["metadatas"])
+                     if not metadata or "frame_id" in metadata]
+            for start in range(0, len(stale), DELETE_BATCH_SIZE):
+                existing.delete(ids=stale[start:start + DELETE_BATCH_SIZE])
+            if stale:
+                logger.info(f"Deleted {len(stale)} existing frame documents before rebuild "
+                            f"({len(data['ids']) - len(stale)} ingested chunks kept)")
+        except Exception as e:
+            logger.warning(f"Could not delete existing frame documents: {str(e)}")
+
     def process_all_knowledge_bases(self):
         """
-        Process all Prolog knowledge bases and create a vector store
+        Process all Prolog knowledge bases and create or incrementally update
+        the vector store
         
         Returns:
-            The created vector store
+            The up-to-date vector store
         """
         # Check if we're running in Docker environment
         in_docker = os.path.exists('/.dockerenv') or os.environ.get('DOCKER_CONTAINER', False)
@@ -352,15 +507,19 @@ class PrologToRAGConverter:
             ]
             logger.info(f"Constructed local paths: {prolog_files}")
         
-        # Convert Prolog files to text chunks
-        text_chunks = self.convert_prolog_to_chunks(prolog_files)
+        # Convert Prolog files to frames with stable IDs and content hashes
+        frames = self.extract_frames(prolog_files)
         
-        if not text_chunks:
+        if not frames:
             logger.error("No text chunks extracted from Prolog files")
             return None
         
-        # Create vector store
-        return self.create_vector_store(text_chunks)
+        # Embed only new or changed frames
+        try:
+            return self.sync_vector_store(frames)
+        except Exception as e:
+            logger.error(f"Error indexing vector store: {str(e)}", exc_info=True)
+            return None
     
     def load_vector_store(self):
         """
@@ -370,12 +529,23 @@ class PrologToRAGConverter:
             The loaded vector store
         """
         try:
+            if self.backend == 'numpy':
+                vector_store = NumpyVectorStore.load(self.persist_directory, embedding=self.embeddings)
+                if vector_store is None:
+                    logger.warning(f"No existing vector index found at {self.persist_directory}")
+                else:
+                    logger.info(f"Memory-mapped vector index {vector_store.version} from {self.persist_directory}")
+                return vector_store
             if os.path.exists(self.persist_directory):
+                from langchain_community.vectorstores import Chroma
                 logger.info(f"Loading existing vector store from {self.persist_directory}")
                 vectorstore = Chroma(
                     embedding_function=self.embeddings,
                     persist_directory=self.persist_directory
                 )
+                # RAGQuery only caches results for stores with a known content version,
+                # read from the frame and corpus manifests as they change on disk
+                vectorstore.version_stamp = StoreVersion(self.persist_directory)
                 return vectorstore
             else:
                 logger.warning(f"No existing vector store found at {self.persist_directory}")
@@ -389,16 +559,33 @@ class RAGQuery:
     Query the RAG system with natural language queries
     """
     
-    def __init__(self, vector_store):
+    def __init__(self, vector_store, retrieval=None, latency_budget=None, cache_size=None):
         """
         Initialize the RAG query system
         
         Args:
             vector_store: Vector store to query
+            retrieval: 'hybrid' (BM25 + vector, fused) or 'vector' (default: RAG_RETRIEVAL)
+            latency_budget: Seconds allowed for hybrid retrieval (default: RAG_LATENCY_BUDGET_MS)
+            cache_size: Number of cached top-k results, 0 to disable (default: RAG_RESULT_CACHE_SIZE)
         """
         self.vector_store = vector_store
+        self.retriever = None
+        if cache_size is None:
+            cache_size = int(os.environ.get('RAG_RESULT_CACHE_SIZE', DEFAULT_RESULT_CACHE_SIZE))
+        self.result_cache = RetrievalCache(cache_size)
         if not self.vector_store:
             logger.error("RAGQuery initialized with no vector store!")
+            return
+
+        retrieval = (retrieval or os.environ.get('RAG_RETRIEVAL', 'hybrid')).lower()
+        if retrieval == 'hybrid':
+            if latency_budget is None:
+                latency_budget = float(os.environ.get('RAG_LATENCY_BUDGET_MS', DEFAULT_LATENCY_BUDGET * 1000)) / 1000
+            try:
+                self.retriever = HybridRetriever(vector_store, latency_budget=latency_budget)
+            except Exception as e:
+                logger.error(f"Could not build hybrid retriever, using vector search only: {str(e)}")
     
     def query(self, query_text, k=3):
         """
@@ -418,16 +605,59 @@ class RAGQuery:
                 logger.error("Cannot query RAG: Vector store is not available.")
                 return []
             
-            docs = self.vector_store.similarity_search(query_text, k=k)
-            logger.debug(f"RAG similarity_search returned {len(docs)} documents for query: '{query_text}'")
-            
-            # Extract content from documents
-            results = [doc.page_content for doc in docs]
+            # The normalized text is also what gets embedded, so spelling variants of a
+            # question share one query-embedding cache entry
+            normalized = normalize_query(query_text)
+            version = current_version(self.vector_store)
+            if version is not None and self.result_cache.max_size > 0:
+                cached = self.result_cache.get(normalized, k, version)
+                if cached is not None:
+                    logger.debug(f"RAG result cache hit for query: '{query_text}'")
+                    return cached
             
+            results, cacheable = self._retrieve(normalized or query_text, k)
+            if version is not None and cacheable:
+                self.result_cache.put(normalized, k, version, results)
             return results
         except Exception as e:
             logger.error(f"Error querying RAG system: {str(e)}")
             return []
+    
+    def _retrieve(self, query_text, k):
+        """Top-k texts, and whether they may be cached"""
+        if self.retriever:
+            over_budget = self.retriever.budget_exceeded
+            results = self.retriever.retrieve(query_text, k=k)
+            logger.debug(f"RAG hybrid retrieval returned {len(results)} documents for query: '{query_text}'")
+            # Keyword-only results after a budget overrun would otherwise stick in the cache
+            return results, self.retriever.budget_exceeded == over_budget
+        
+        docs = self.vector_store.similarity_search(query_text, k=k)
+        logger.debug(f"RAG similarity_search returned {len(docs)} documents for query: '{query_text}'")
+        
+        # Extract content from documents
+        return [doc.page_content for doc in docs], True
+
+    def query_context(self, query_text, k=3, max_tokens=None):
+        """
+        Retrieved knowledge for an LLM prompt: up to k distinct chunks within a token budget
+
+        Args:
+            query_text: Natural language query
+            k: Maximum number of chunks in the context
+            max_tokens: Token budget for the context (default: RAG_CONTEXT_TOKENS)
+
+        Returns:
+            The selected chunks joined by blank lines ('' if nothing was found)
+        """
+        candidates = self.query(query_text, k=k * FETCH_FACTOR)
+        if not candidates:
+            return ""
+        # NumpyVectorStore.embedding / Chroma.embeddings: the cached index embeddings
+        embeddings = getattr(self.vector_store, 'embedding', None) or getattr(self.vector_store, 'embeddings', None)
+        chunks = pack_context(normalize_query(query_text) or query_text, candidates, embeddings,
+                              max_tokens=max_tokens, max_chunks=k)
+        return "\n\n".join(chunks)
 
 def get_rag_system():
     """
@@ -538,11 +768,10 @@ def extend_hybrid_engine(hybrid_engine):
                 if query and self.rag_system:
                     try:
                         logger.info(f"RAG_EXTEND: Querying RAG vector store with: '{query}'")
-                        rag_results = self.rag_system.query(query)
-                        logger.info(f"RAG_EXTEND: RAG vector store results: {rag_results}")
+                        # Distinct chunks within the token budget rather than the raw top-k
+                        context = self.rag_system.query_context(query)
                         
-                        if rag_results:
-                            context = "\n\n".join(rag_results)
+                        if context:
                             logger.info(f"RAG_EXTEND: RAG context prepared, {len(context)} characters.")
                             
                             # Use the context with Ollama if available
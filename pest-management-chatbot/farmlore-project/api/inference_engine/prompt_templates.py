@@ -9,6 +9,7 @@ import logging
 from typing import Dict, List, Any, Optional
 from enum import Enum
 from .custom_prompts import CUSTOM_PROMPTS
+from .query_classifier import Classification, KeywordClassifier
 
 logger = logging.getLogger(__name__)
 
@@ -186,6 +187,65 @@ def format_prompt(prompt_type: PromptType, **kwargs) -> Dict[str, str]:
     template = get_template(prompt_type)
     return template.format(**kwargs)
 
+# Keyword lists, highest priority first: pest keywords win over symptom and soil ones
+# ("What's the best soil for controlling aphids?" is a pest management question)
+PEST_MANAGEMENT_KEYWORDS = [
+    # Control keywords
+    "control", "manage", "get rid of", "treat", "pesticide", "spray", "kill",
+    
+    # Pest types
+    "pest", "insect", "bug", "aphid", "beetle", "caterpillar", "worm", 
+    "moth", "fly", "mite", "thrip", "weevil", "nematode", "spider mite",
+    # Compound names (keywords match from the start of a word)
+    "hornworm", "armyworm", "cutworm", "bollworm", "wireworm", "whitefly", "mealybug",
+    
+    # Natural enemies and predators
+    "predator", "natural enemy", "beneficial", "ladybug", "ladybird",
+    "lacewing", "parasitic wasp", "predatory", "biological control",
+    "natural control", "eat aphid", "eat pest", "consume pest", "prey on",
+    "natural predator", "predators for", "predators of",
+    
+    # Prevention and management
+    "prevent", "deter", "repel", "trap", "barrier", "protect plant"
+]
+
+PEST_IDENTIFICATION_KEYWORDS = [
+    # Pest identification keywords and patterns
+    "identify", "what pest", "what insect", "what disease", "what bug", 
+    "found insects", "found bugs", "found pests", "insect on", "bug on", "pest on",
+    "insects on my", "bugs on my", "pests on my", "eating my plant", "eating my crop",
+    "damaging my", "holes in leaves", "yellowing leaves", "spots on leaves",
+    "what is this", "what are these", "can you identify", "help identify"
+]
+
+SOIL_ANALYSIS_KEYWORDS = ["soil", "fertility", "nutrients", "ph", "drainage"]
+
+INDIGENOUS_KNOWLEDGE_KEYWORDS = ["traditional", "indigenous", "ancestors", "cultural", "old methods"]
+
+PROMPT_TYPE_CLASSIFIER = KeywordClassifier([
+    (PromptType.PEST_MANAGEMENT, PEST_MANAGEMENT_KEYWORDS),
+    (PromptType.PEST_IDENTIFICATION, PEST_IDENTIFICATION_KEYWORDS),
+    (PromptType.SOIL_ANALYSIS, SOIL_ANALYSIS_KEYWORDS),
+    (PromptType.INDIGENOUS_KNOWLEDGE, INDIGENOUS_KNOWLEDGE_KEYWORDS),
+], default=PromptType.GENERAL)
+
+def classify_prompt_type(query: str) -> Classification:
+    """
+    Detect the appropriate prompt type for a query, with a confidence.
+    
+    Args:
+        query: The user's query
+        
+    Returns:
+        Classification with the prompt type (label), a confidence in [0, 1]
+        and the keywords that decided it
+    """
+    result = PROMPT_TYPE_CLASSIFIER.classify(query)
+    # Runs on every LLM request: skip formatting the message unless it is logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Classified as {result.label.name} ({result.confidence:.2f}, keywords: {result.keywords}): {query}")
+    return result
+
 def detect_prompt_type(query: str) -> PromptType:
     """
     Detect the appropriate prompt type based on query content.
@@ -196,57 +256,4 @@ def detect_prompt_type(query: str) -> PromptType:
     Returns:
         The detected prompt type
     """
-    query_lower = query.lower()
-    
-    # Define comprehensive pest management keywords
-    pest_management_keywords = [
-        # Control keywords
-        "control", "manage", "get rid of", "treat", "pesticide", "spray", "kill",
-        
-        # Pest types
-        "pest", "insect", "bug", "aphid", "beetle", "caterpillar", "worm", 
-        "moth", "fly", "mite", "thrip", "weevil", "nematode", "spider mite",
-        
-        # Natural enemies and predators
-        "predator", "natural enemy", "beneficial", "ladybug", "ladybird",
-        "lacewing", "parasitic wasp", "nematode", "predatory", "biological control",
-        "natural control", "eat aphid", "eat pest", "consume pest", "prey on",
-        "natural predator", "predators for", "predators of",
-        
-        # Prevention and management
-        "prevent", "deter", "repel", "trap", "barrier", "protect plant"
-    ]
-    
-    # Check for pest management keywords FIRST (this is the key fix)
-    if any(keyword in query_lower for keyword in pest_management_keywords):
-        logger.info(f"Classified as PEST_MANAGEMENT due to keywords match: {query}")
-        return PromptType.PEST_MANAGEMENT
-    
-    # Pest identification keywords and patterns
-    pest_id_keywords = [
-        "identify", "what pest", "what insect", "what disease", "what bug", 
-        "found insects", "found bugs", "found pests", "insect on", "bug on", "pest on",
-        "insects on my", "bugs on my", "pests on my", "eating my plant", "eating my crop",
-        "damaging my", "holes in leaves", "yellowing leaves", "spots on leaves",
-        "what is this", "what are these", "can you identify", "help identify"
-    ]
-    
-    if any(keyword in query_lower for keyword in pest_id_keywords):
-        logger.info(f"Classified as PEST_IDENTIFICATION due to keywords match: {query}")
-        return PromptType.PEST_IDENTIFICATION
-    
-    # Soil analysis keywords
-    soil_keywords = ["soil", "fertility", "nutrients", "ph", "drainage"]
-    if any(keyword in query_lower for keyword in soil_keywords):
-        logger.info(f"Classified as SOIL_ANALYSIS due to keywords match: {query}")
-        return PromptType.SOIL_ANALYSIS
-    
-    # Indigenous knowledge keywords
-    indigenous_keywords = ["traditional", "indigenous", "ancestors", "cultural", "old methods"]
-    if any(keyword in query_lower for keyword in indigenous_keywords):
-        logger.info(f"Classified as INDIGENOUS_KNOWLEDGE due to keywords match: {query}")
-        return PromptType.INDIGENOUS_KNOWLEDGE
-    
-    # Default to general if no specific type is detected
-    logger.info(f"Classified as GENERAL (default): {query}")
-    return PromptType.GENERAL
\ No newline at end of file
+    return classify_prompt_type(query).label
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Query Classifier
+
+Keyword classification of user queries in a single pass. Both
+prompt_templates.detect_prompt_type (which prompt template the LLM gets) and
+chatbot.views.detect_query_type (which HybridEngine query type handles the
+message) map a query to a category by keyword lists, checked in priority
+order. Scanning each list with ``any(keyword in query ...)`` reads the query
+once per keyword, and the lists run to a hundred entries.
+
+KeywordClassifier compiles every keyword of every category into one regular
+expression and finds all of them in one scan of the query. Each keyword must
+start at a word boundary and may run into a longer word, so "aphid" matches
+"aphids" but "rot" does not match "carrot" and "ph" does not match "graph". The
+scan is a lookahead at each word start, which finds the longest keyword there.
+The shorter keywords inside it are known when the classifier is built, so
+overlapping keywords ("pest" and "pest on", "yellow" and "yellow leaves") are
+all counted.
+
+The label is the first category, in priority order, with a matching keyword,
+as with the sequential checks. The confidence is the share of all matched
+keyword words that belong to that category, scaled by 1 - 0.5 ** words (one
+matching word gives 0.5, two 0.75, and so on). A query with no matches gets
+the default label and confidence 0.0.
+"""
+import logging
+import re
+from typing import Dict, FrozenSet, Hashable, NamedTuple, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _trie_regex(node: Dict[str, dict]) -> str:
+    """
+    Regex for the keywords in a character trie, with common prefixes factored
+    out so each position is tried against one branch per distinct character
+    rather than every keyword. Optional tails are greedy, so the longest keyword
+    matches.
+    """
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if "" in node:
+        return "(?:" + "|".join(branches) + ")?"
+    return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+
+class Classification(NamedTuple):
+    label: Hashable
+    confidence: float
+    keywords: Tuple[str, ...]  # matched keywords of the label's category
+
+
+class KeywordClassifier:
+    """Scores every category of a set of keyword lists in one regex pass over the query"""
+
+    def __init__(self, categories: Sequence[Tuple[Hashable, Sequence[str]]], default: Hashable):
+        """
+        Args:
+            categories: (label, keywords) pairs, highest priority first
+            default: Label for queries that match no keyword
+        """
+        self.labels = [label for label, _ in categories]
+        self.default = default
+        owners: Dict[str, Set[int]] = {}
+        for index, (_, keywords) in enumerate(categories):
+            for keyword in keywords:
+                owners.setdefault(keyword.lower(), set()).add(index)
+
+        # For each keyword, every (category, keyword) it implies: itself and the
+        # keywords found at word starts inside it
+        self._implied: Dict[str, FrozenSet[Tuple[int, str]]] = {}
+        for keyword in owners:
+            inner = {(index, other) for other in owners
+                     if re.search(r"\b" + re.escape(other), keyword) for index in owners[other]}
+            self._implied[keyword] = frozenset(inner)
+        self._words = {keyword: len(keyword.split()) for keyword in owners}
+
+        trie: Dict[str, dict] = {}
+        for keyword in owners:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._pattern = re.compile(r"\b(?=(" + _trie_regex(trie) + "))")
+
+    def matches(self, query: str) -> Set[Tuple[int, str]]:
+        """(category index, keyword) pairs found in ``query``"""
+        found: Set[Tuple[int, str]] = set()
+        for match in self._pattern.finditer(query.lower()):
+            found |= self._implied[match.group(1)]
+        return found
+
+    def classify(self, query: str) -> Classification:
+        """Label of the highest-priority matching category, with a confidence in [0, 1]"""
+        found = self.matches(query)
+        if not found:
+            return Classification(self.default, 0.0, ())
+        weights = [0] * len(self.labels)
+        for index, keyword in found:
+            weights[index] += self._words[keyword]
+        best = next(index for index, weight in enumerate(weights) if weight)
+        share = weights[best] / sum(weights)
+        confidence = round(share * (1 - 0.5 ** weights[best]), 3)
+        keywords = tuple(sorted(keyword for index, keyword in found if index == best))
+        return Classification(self.labels[best], confidence, keywords)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Retrieval Cache
+
+In-memory LRU of RAGQuery results keyed by (normalized query, k, index
+version). Farmers ask the same handful of questions in many spellings ("How do
+I control aphids?", "how do i control  aphids"), so queries are normalized
+(case, whitespace, trailing punctuation) before lookup. all-MiniLM-L6-v2 is an
+uncased model, so the normalized text also embeds to the same vector and is
+what RAGQuery passes on to retrieval and to the query-embedding LRU.
+
+Including the index version in the key means a rebuilt vector store never
+serves results computed against the previous one; entries for older versions
+are dropped as soon as a new version is seen.
+
+Hits and misses are reported to the performance monitor (the admin dashboard's
+cache metrics) under the cache name, when api.monitoring is importable.
+"""
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_CACHE_SIZE = 512
+
+_SPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "?!.,;: "
+
+_record_cache_event = None
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return _SPACE_RE.sub(" ", text.lower()).strip().rstrip(_TRAILING_PUNCTUATION)
+
+
+def report_cache_event(cache: str, hit: bool) -> None:
+    """Report a hit or miss to the performance monitor, if it is available"""
+    global _record_cache_event
+    if _record_cache_event is None:
+        try:
+            from api.monitoring import record_cache_event
+        except ImportError:
+            # Standalone scripts run without the api package
+            record_cache_event = lambda cache, hit: None
+        _record_cache_event = record_cache_event
+    _record_cache_event(cache, hit)
+
+
+class RetrievalCache:
+    """Thread-safe LRU of top-k results for one index version at a time"""
+
+    def __init__(self, max_size: int = DEFAULT_RESULT_CACHE_SIZE, name: str = "rag_results"):
+        self.max_size = max_size
+        self.name = name
+        self._entries: "OrderedDict[tuple, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[Hashable] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Hashable) -> None:
+        """Drop all entries if the index version moved on. Caller holds the lock."""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"Index version changed ({self._version} -> {version}); "
+                            f"dropping {len(self._entries)} cached retrievals")
+            self._entries.clear()
+            self._version = version
+
+    def get(self, query: str, k: int, version: Hashable) -> Optional[List[str]]:
+        """Cached results for a normalized query, or None"""
+        with self._lock:
+            self._check_version(version)
+            key = (query, k)
+            results = self._entries.get(key)
+            if results is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        report_cache_event(self.name, results is not None)
+        return list(results) if results is not None else None
+
+    def put(self, query: str, k: int, version: Hashable, results: List[str]) -> None:
+        with self._lock:
+            # A store rebuilt while the query ran: the results belong to neither version
+            if version != self._version or self.max_size <= 0:
+                return
+            self._entries[(query, k)] = list(results)
+            self._entries.move_to_end((query, k))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+                "index_version": self._version,
+            }
@@ -9,6 +9,12 @@ import re
 from difflib import SequenceMatcher
 from typing import List, Dict, Any, Tuple, Optional
 
+try:
+    from .bm25_index import MIN_RELEVANCE, BM25Index
+except ImportError:
+    # Imported as a top-level module (e.g. by hybrid_engine_integrator)
+    from bm25_index import MIN_RELEVANCE, BM25Index
+
 # Sample pest management data
 PEST_DATA = [
     {
@@ -107,50 +113,21 @@ def get_keywords(text: str) -> List[str]:
     words = [word for word in text.split() if word not in stop_words]
     return words
 
+# Keyword index over PEST_DATA, tokenized with get_keywords so stop words match
+_search_index = BM25Index(PEST_DATA, get_keywords)
+
+def rebuild_index() -> None:
+    """Rebuild the keyword index after PEST_DATA has changed"""
+    global _search_index
+    _search_index = BM25Index(PEST_DATA, get_keywords)
+
 def simple_similarity(text1: str, text2: str) -> float:
     """Calculate simple text similarity using SequenceMatcher"""
     return SequenceMatcher(None, clean_text(text1), clean_text(text2)).ratio()
 
 def search_pest_data(query: str, top_n: int = 2) -> List[Dict[str, Any]]:
-    """Search the pest data directly using keyword matching and text similarity"""
-    query_keywords = set(get_keywords(query))
-    results = []
-    
-    for item in PEST_DATA:
-        title = item["title"]
-        content = item["content"]
-        
-        # Calculate keyword matching score
-        content_keywords = set(get_keywords(content))
-        title_keywords = set(get_keywords(title))
-        
-        # Count matching keywords
-        content_match_count = len(query_keywords.intersection(content_keywords))
-        title_match_count = len(query_keywords.intersection(title_keywords))
-        
-        # Calculate similarity scores
-        title_sim = simple_similarity(query, title)
-        content_sim = simple_similarity(query, content)
-        
-        # Combined score (weight title matches more heavily)
-        score = (
-            (content_match_count * 0.5) + 
-            (title_match_count * 2.0) + 
-            (title_sim * 3.0) + 
-            (content_sim * 1.0)
-        )
-        
-        results.append({
-            "title": title,
-            "content": content,
-            "score": score
-        })
-    
-    # Sort by score descending
-    results.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Return top_n results
-    return results[:top_n]
+    """Search the pest data with the BM25 keyword index (title matches weighted higher)"""
+    return _search_index.search(query, top_n)
 
 def enhance_response(query: str, original_response: str) -> str:
     """Enhance a response using the RAG approach with direct text search"""
@@ -167,8 +144,8 @@ def enhance_response(query: str, original_response: str) -> str:
         print(f"Found relevant information: {top_result['title']} (Score: {top_result['score']:.2f})")
         
         # Check if result is highly relevant
-        if top_result["score"] < 1.0:
-            print(f"Top result score ({top_result['score']}) below threshold, not enhancing")
+        if top_result["relevance"] < MIN_RELEVANCE:
+            print(f"Top result relevance ({top_result['relevance']:.2f}) below threshold, not enhancing")
             return original_response
         
         # Extract useful information from the top result
@@ -0,0 +1,65 @@
+"""
+Tests for the BM25 keyword index behind the keyword RAG modules.
+"""
+from api.inference_engine import direct_rag_integration, standalone_rag
+from api.inference_engine.bm25_index import BM25Index, singular
+from api.inference_engine.standalone_rag import get_keywords
+
+DOCUMENTS = [
+    {"title": "Aphid Control", "content": "Spray aphids with soap. Aphids hate soap."},
+    {"title": "Mite Management", "content": "Spider mites like dry air; mist plants."},
+    {"title": "Garden Basics", "content": "Water plants in the morning and check for aphids."},
+]
+
+
+def test_ranks_by_bm25_with_title_boost():
+    index = BM25Index(DOCUMENTS, get_keywords)
+    results = index.search("how to control aphids", top_n=3)
+    assert [r["title"] for r in results] == ["Aphid Control", "Garden Basics"]
+    assert results[0]["score"] > results[1]["score"] > 0
+
+
+def test_stop_words_and_unknown_terms_match_nothing():
+    index = BM25Index(DOCUMENTS, get_keywords)
+    assert index.search("what is the", top_n=3) == []
+    assert index.search("weather forecast", top_n=3) == []
+
+
+def test_top_n_limits_results():
+    index = BM25Index(DOCUMENTS, get_keywords)
+    assert len(index.search("plants aphids mites", top_n=1)) == 1
+
+
+def test_singular():
+    assert [singular(word) for word in ["aphids", "tomatoes", "flies", "bushes", "grass", "asparagus"]] == \
+        ["aphid", "tomato", "fly", "bush", "grass", "asparagus"]
+
+
+def test_search_pest_data_uses_index():
+    assert standalone_rag.search_pest_data("hornworm on tomatoes")[0]["title"] == "Controlling Tomato Hornworms"
+    top = direct_rag_integration.search_pest_data("squash bugs", top_n=1)
+    assert [r["title"] for r in top] == ["Dealing with Squash Bugs in Vegetable Gardens"]
+
+
+def test_relevance_is_idf_weighted_query_coverage():
+    index = BM25Index(DOCUMENTS, get_keywords)
+    assert index.search("aphids", top_n=1)[0]["relevance"] == 1.0
+    # "plants" is in two documents, "carrots" in none: weighted as the rarest term
+    top = index.search("when to water carrots plants", top_n=1)[0]
+    assert top["title"] == "Garden Basics"
+    assert 0 < top["relevance"] < 0.5
+    assert index.relevance({}, 0) == 0.0
+
+
+def test_enhance_response_cutoff_does_not_depend_on_corpus_size():
+    original = "Original answer."
+    for query in ["How do I control aphids on my tomatoes?", "Is neem oil safe for aphids on tomatoes?"]:
+        assert standalone_rag.enhance_response(query, original) != original
+        assert direct_rag_integration.enhance_response(query, original)[0] != original
+    # Off-topic queries that share a common word with a document; their raw BM25
+    # score cleared the old fixed cut-off of 1.0 in the larger corpus
+    assert direct_rag_integration.search_pest_data("How much water do peppers need?")[0]["score"] > 1.0
+    for query in ["How much water do peppers need?", "When should I plant carrots?"]:
+        assert standalone_rag.enhance_response(query, original) == original
+        assert direct_rag_integration.enhance_response(query, original) == (
+            original, direct_rag_integration.search_pest_data(query))
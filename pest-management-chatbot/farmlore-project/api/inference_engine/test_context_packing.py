@@ -0,0 +1,75 @@
+"""
+Tests for MMR context packing.
+"""
+import numpy as np
+
+from api.inference_engine.context_packing import (
+    estimate_tokens,
+    mmr_order,
+    pack_context,
+    truncate_to_tokens,
+)
+from api.inference_engine.implement_rag import RAGQuery
+from api.inference_engine.vector_index import NumpyVectorStore
+
+APHID_KB = "Type: pest\nname: aphid_general\ncontrol: [neem_oil, ladybugs]"
+APHID_PEA = "Type: pest\nname: aphid_general\ncontrol: [neem_oil, ladybugs]\ncrops: [pea]"
+MULCH = "Type: practice\nname: reflective_mulch_for_aphid_control"
+MITE = "Type: pest\nname: spider_mite"
+
+
+class KeywordEmbeddings:
+    # The two aphid frames embed identically, like restatements do under a sentence model
+    VOCAB = ['aphid', 'neem', 'mulch', 'mite']
+
+    def embed_query(self, text):
+        return [float(word in text.lower()) for word in self.VOCAB]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def test_token_estimate_and_truncation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * 9) == 3
+    text = "line one\nline two\nline three"
+    assert truncate_to_tokens(text, 100) == text
+    assert truncate_to_tokens(text, 4) == "line one"
+
+
+def test_mmr_prefers_new_information_over_restatement():
+    query = np.array([1.0, 0.0, 0.0])
+    vectors = np.array([[1.0, 0.1, 0.0], [1.0, 0.12, 0.0], [0.6, 0.0, 0.8]])
+    # The second vector is nearly the first: dropped as a duplicate
+    assert mmr_order(query, vectors) == [0, 2]
+    # Pure relevance ranking keeps everything that is not a duplicate, best first
+    assert mmr_order(query, vectors, lambda_mult=1.0, duplicate_threshold=1.1) == [0, 1, 2]
+
+
+def test_pack_context_drops_duplicate_frames():
+    candidates = [APHID_KB, APHID_PEA, MULCH, MITE]
+    assert pack_context("neem for aphid", candidates, KeywordEmbeddings(), max_tokens=1000) == [APHID_KB, MULCH, MITE]
+    # Without embeddings, word overlap still catches a reformatted copy
+    reformatted = APHID_KB.replace("\n", "  ")
+    assert pack_context("aphid", [APHID_KB, reformatted, MITE], max_tokens=1000) == [APHID_KB, MITE]
+
+
+def test_pack_context_respects_token_budget():
+    long_chunk = "aphid " * 200
+    chunks = pack_context("aphid", [long_chunk, MULCH, MITE], KeywordEmbeddings(), max_tokens=40)
+    assert sum(estimate_tokens(chunk) for chunk in chunks) <= 40
+    # The most relevant chunk is cut to fit rather than dropped
+    assert chunks[0].startswith("aphid aphid")
+    assert pack_context("aphid", [APHID_KB, MULCH, MITE], KeywordEmbeddings(), max_chunks=1) == [APHID_KB]
+
+
+def test_query_context(tmp_path):
+    embeddings = KeywordEmbeddings()
+    documents = [APHID_KB, APHID_PEA, MULCH, MITE]
+    NumpyVectorStore.write(str(tmp_path), [str(i) for i in range(len(documents))], documents,
+                           [{} for _ in documents], embeddings.embed_documents(documents))
+    rag = RAGQuery(NumpyVectorStore.load(str(tmp_path), embedding=embeddings), retrieval='vector')
+
+    context = rag.query_context("neem for aphid", k=2)
+    assert context.count("name: aphid_general") == 1
+    assert len(context.split("\n\n")) == 2
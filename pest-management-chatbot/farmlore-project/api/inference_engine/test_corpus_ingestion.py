@@ -0,0 +1,68 @@
+"""
+Tests for streaming corpus chunking and batched, cache-aware embedding.
+"""
+import io
+import random
+
+from api.inference_engine import corpus_ingestion
+from api.inference_engine.corpus_ingestion import chunk_text, embed_chunks, iter_batches, iter_text_chunks, iter_windows
+from api.inference_engine.embedding_cache import EmbeddingCache
+
+
+def test_chunk_text_terminates_and_overlaps():
+    text = "First sentence here. " * 100
+    chunks = chunk_text(text, chunk_size=100, overlap=20)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.endswith('.') for chunk in chunks[:-1])
+    assert chunk_text("short") == ["short"]
+    assert chunk_text("") == []
+
+
+class CountingStream(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_streamed_chunks_match_whole_text_chunking():
+    rng = random.Random(3)
+    words = ['aphid', 'neem.', 'mite\n', 'soap', 'spray.', 'leaf']
+    text = ' '.join(rng.choice(words) for _ in range(3000))
+    assert list(iter_text_chunks(io.StringIO(text), 100, 20, read_size=37)) == chunk_text(text, 100, 20)
+
+
+def test_chunks_are_yielded_before_the_stream_is_consumed():
+    stream = CountingStream("Aphids feed on sap. " * 10000)
+    chunks = iter_text_chunks(stream, chunk_size=100, overlap=20, read_size=1000)
+    assert next(chunks).startswith("Aphids")
+    assert stream.reads == 1
+
+
+def test_iter_batches():
+    assert [list(batch) for batch in iter_batches(list(range(5)), 2)] == [[0, 1], [2, 3], [4]]
+    assert list(iter_windows(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_embed_chunks_batches_misses_and_reports_progress(tmp_path, monkeypatch):
+    encoded = []
+
+    def fake_encode(texts):
+        encoded.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(corpus_ingestion, '_init_worker', lambda model_name, threads: None)
+    monkeypatch.setattr(corpus_ingestion, '_encode_batch', fake_encode)
+    cache = EmbeddingCache(str(tmp_path / 'embeddings.sqlite3'))
+    cache.put_many('m', ['aa'], [[2.0]])
+
+    progress = []
+    vectors = embed_chunks(['a', 'aa', 'aaa', 'aaaa', 'a'], 'm', batch_size=2, workers=1, cache=cache,
+                           progress=lambda done, total, elapsed: progress.append((done, total)))
+
+    assert vectors == [[1.0], [2.0], [3.0], [4.0], [1.0]]
+    assert encoded == [['a', 'aaa'], ['aaaa']]
+    assert progress == [(2, 3), (3, 3)]
@@ -0,0 +1,64 @@
+"""
+Tests for the persistent embedding cache.
+"""
+import pytest
+
+from api.inference_engine.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / 'embeddings.sqlite3'), query_cache_size=2)
+
+
+def test_embed_only_encodes_misses(cache):
+    encode = CountingEncoder()
+    assert cache.embed('m', ['aphid', 'mite'], encode) == [[5.0, 0.5], [4.0, 0.5]]
+    assert cache.embed('m', ['mite', 'thrips', 'thrips'], encode) == [[4.0, 0.5], [6.0, 0.5], [6.0, 0.5]]
+    assert encode.calls == [['aphid', 'mite'], ['thrips']]
+
+
+def test_cache_is_keyed_by_model_and_persists(tmp_path):
+    path = str(tmp_path / 'embeddings.sqlite3')
+    encode = CountingEncoder()
+    EmbeddingCache(path).embed('m', ['aphid'], encode)
+
+    reopened = EmbeddingCache(path)
+    assert reopened.embed('m', ['aphid'], encode) == [[5.0, 0.5]]
+    reopened.embed('other-model', ['aphid'], encode)
+    assert encode.calls == [['aphid'], ['aphid']]
+    assert reopened.get_stats()['size'] == 2
+
+
+def test_query_lru_front(cache):
+    encode = CountingEncoder()
+    for query in ['aphids?', 'aphids?', 'mites?', 'thrips?', 'aphids?']:
+        cache.embed_query('m', query, encode)
+    stats = cache.get_stats()
+    assert stats['query_hits'] == 1
+    assert stats['query_cache_size'] == 2
+    # 'aphids?' fell out of the LRU and is encoded again: queries are never written to disk
+    assert encode.calls == [['aphids?'], ['mites?'], ['thrips?'], ['aphids?']]
+    assert stats['size'] == 0
+
+
+def test_cached_embeddings_wraps_langchain_interface(cache):
+    class FakeEmbeddings:
+        def embed_documents(self, texts):
+            return [[1.0] for _ in texts]
+
+        def embed_query(self, text):
+            return [2.0]
+
+    embeddings = CachedEmbeddings(FakeEmbeddings(), 'm', cache)
+    assert embeddings.embed_documents(['a', 'b']) == [[1.0], [1.0]]
+    assert embeddings.embed_query('q') == [2.0]
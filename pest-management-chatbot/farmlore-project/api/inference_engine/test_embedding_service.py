@@ -0,0 +1,124 @@
+"""
+Tests for the shared embedding service and its Unix-socket sidecar.
+"""
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from api.inference_engine import embedding_service
+from api.inference_engine.embedding_service import (
+    EmbeddingServer,
+    EmbeddingService,
+    RemoteEmbeddingService,
+    ServiceEmbeddings,
+)
+
+
+class LengthModel:
+    """Stands in for a SentenceTransformer: embeds a text as [len(text), 1]"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.calls.append((list(texts), batch_size))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float64)
+
+
+@pytest.fixture
+def service():
+    service = EmbeddingService(batch_size=2)
+    service._models['fake'] = LengthModel()
+    return service
+
+
+def test_encode_is_float32_and_instrumented(service):
+    vectors = service.encode(['a', 'bbb', 'cc'], 'fake')
+    assert vectors.dtype == np.float32
+    assert vectors[:, 0].tolist() == [1.0, 3.0, 2.0]
+    assert service._models['fake'].calls == [(['a', 'bbb', 'cc'], 2)]
+
+    stats = service.get_stats()
+    assert (stats['calls'], stats['texts'], stats['batches']) == (1, 3, 2)
+    assert stats['models'] == ['fake']
+
+
+def test_service_embeddings_share_one_model(service):
+    documents = ServiceEmbeddings('fake', service)
+    queries = ServiceEmbeddings('fake', service)
+    assert documents.embed_documents(['ab', 'c']) == [[2.0, 1.0], [1.0, 1.0]]
+    assert queries.embed_query('abcd') == [4.0, 1.0]
+    assert len(service._models) == 1
+
+
+def test_sidecar_round_trip(tmp_path, service):
+    socket_path = str(tmp_path / 'embeddings.sock')
+    server = EmbeddingServer(socket_path, service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = RemoteEmbeddingService(socket_path, timeout=5)
+        vectors = client.encode(['aphid', 'mite'], 'fake')
+        assert vectors.tolist() == [[5.0, 1.0], [4.0, 1.0]]
+        assert client.get_stats()['calls'] == 1
+        assert service.get_stats()['texts'] == 2
+
+        # Server-side failures are reported, not silently replaced by local encoding
+        with pytest.raises(RuntimeError):
+            client.encode(['aphid'], 'missing-model-name/that-does-not-exist')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unreachable_sidecar_falls_back_to_local(tmp_path, service):
+    client = RemoteEmbeddingService(str(tmp_path / 'missing.sock'))
+    client._local = service
+    assert client.encode(['abc'], 'fake').tolist() == [[3.0, 1.0]]
+    assert client.get_stats()['fallbacks'] == 1
+
+
+def test_slow_sidecar_times_out_without_loading_a_local_model(tmp_path):
+    socket_path = str(tmp_path / 'busy.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as busy:
+        # Accepts connections (into the backlog) but never replies
+        busy.bind(socket_path)
+        busy.listen(1)
+        client = RemoteEmbeddingService(socket_path, timeout=0.1)
+        with pytest.raises(TimeoutError):
+            client.encode(['abc'], 'fake')
+    assert client._local is None
+    assert client.get_stats()['fallbacks'] == 0
+
+
+def test_backend_is_configurable(monkeypatch):
+    loads = []
+
+    def load_model(model_name, backend='torch', model_file=None, threads=None):
+        loads.append((model_name, backend, model_file))
+        return LengthModel()
+    monkeypatch.setattr(embedding_service, 'load_model', load_model)
+    monkeypatch.setenv('EMBEDDING_BACKEND', 'ONNX')
+    monkeypatch.setenv('EMBEDDING_MODEL_FILE', 'onnx/model_O3.onnx')
+
+    service = EmbeddingService()
+    service.encode(['aphid'], 'fake')
+    assert loads == [('fake', 'onnx', 'onnx/model_O3.onnx')]
+    assert service.get_stats()['model_backends'] == {'fake': 'onnx'}
+
+    with pytest.raises(ValueError):
+        EmbeddingService(backend='tensorrt')
+
+
+def test_unavailable_backend_falls_back_to_torch(monkeypatch):
+    def load_model(model_name, backend='torch', model_file=None, threads=None):
+        if backend != 'torch':
+            raise ImportError("optimum is not installed")
+        return LengthModel()
+    monkeypatch.setattr(embedding_service, 'load_model', load_model)
+
+    service = EmbeddingService(backend='onnx')
+    assert service.encode(['aphid'], 'fake').tolist() == [[5.0, 1.0]]
+    assert service.get_stats()['model_backends'] == {'fake': 'torch'}
@@ -0,0 +1,77 @@
+"""
+Tests for the embeddings classifier and its use of the shared embedding service.
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from api.inference_engine import embedding_service
+from api.inference_engine.embedding_cache import EmbeddingCache
+from api.inference_engine.embeddings_classifier import CATEGORY_EXAMPLES, EmbeddingsClassifier
+from api.inference_engine.prompt_templates import PromptType
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+CATEGORIES = list(CATEGORY_EXAMPLES)
+
+
+class CategoryService:
+    """Stands in for the embedding service: a category's examples embed to its one-hot vector"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, model_name):
+        self.calls.append((list(texts), model_name))
+        vectors = []
+        for text in texts:
+            vector = np.ones(len(CATEGORIES), dtype=np.float32)
+            for index, category in enumerate(CATEGORIES):
+                if text in CATEGORY_EXAMPLES[category]:
+                    vector = np.eye(len(CATEGORIES), dtype=np.float32)[index]
+            vectors.append(vector)
+        return np.array(vectors)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = CategoryService()
+    monkeypatch.setattr(embedding_service, '_service_instance', service)
+    return service
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / 'embeddings.sqlite3'))
+
+
+def test_classifier_encodes_through_the_shared_service(service, cache):
+    classifier = EmbeddingsClassifier(cache=cache)
+    assert classifier.service is service
+    assert {model for _, model in service.calls} == {embedding_service.DEFAULT_MODEL}
+
+    assert classifier.classify("how to control aphids on my tomatoes") == PromptType.PEST_MANAGEMENT
+    assert classifier.classify("traditional ways to preserve seeds") == PromptType.INDIGENOUS_KNOWLEDGE
+    # Equally similar to everything: below the threshold
+    assert classifier.classify("tell me a joke") == PromptType.GENERAL
+
+
+def test_example_embeddings_come_from_the_cache(service, cache):
+    EmbeddingsClassifier(cache=cache)
+    encoded = len(service.calls)
+    EmbeddingsClassifier(cache=cache)
+    assert len(service.calls) == encoded
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(REPO_ROOT, 'embeddings_classifier.py')),
+                    reason="repository root scripts not found")
+def test_root_script_reexports_the_app_classifier():
+    # Run from the repository root, whose own api/ directory lacks the embedding modules
+    result = subprocess.run(
+        [sys.executable, '-c', 'import embeddings_classifier; print(embeddings_classifier.EmbeddingsClassifier.__module__)'],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith('api.inference_engine.embeddings_classifier')
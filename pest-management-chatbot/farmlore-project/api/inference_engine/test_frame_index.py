@@ -0,0 +1,73 @@
+"""
+Tests for the frame manifest behind incremental RAG indexing.
+"""
+import json
+
+from api.inference_engine.frame_index import (
+    MANIFEST_FILENAME, CorpusManifest, FrameManifest, StoreVersion, content_hash, document_ids, frame_id,
+    store_version,
+)
+
+
+def test_frame_id_is_stable_and_falls_back_to_position():
+    assert frame_id('/app/prolog_integration/knowledgebase.pl', 'pest', 'aphid', 3) == 'knowledgebase.pl:pest:aphid'
+    assert frame_id('kb.pl', None, None, 7) == 'kb.pl:frame:#7'
+
+
+def test_content_hash_ignores_snippet_order():
+    assert content_hash(['a', 'b']) == content_hash(['b', 'a'])
+    assert content_hash(['a', 'b']) != content_hash(['ab'])
+
+
+def test_plan_upserts_changed_and_deletes_removed(tmp_path):
+    manifest = FrameManifest.empty(str(tmp_path))
+    manifest.record('kb.pl:pest:aphid', 'h1', 2)
+    manifest.record('kb.pl:pest:mite', 'h2', 1)
+    manifest.record('kb.pl:pest:thrips', 'h3', 3)
+
+    plan = manifest.plan({'kb.pl:pest:aphid': 'h1', 'kb.pl:pest:mite': 'changed', 'kb.pl:pest:whitefly': 'h4'})
+
+    assert plan.upserts == ['kb.pl:pest:mite', 'kb.pl:pest:whitefly']
+    assert plan.removed == ['kb.pl:pest:thrips']
+    assert plan.unchanged == 1
+    assert sorted(plan.stale_ids) == sorted(['kb.pl:pest:mite#0'] + document_ids('kb.pl:pest:thrips', 3))
+
+
+def test_manifest_round_trip_and_version_check(tmp_path):
+    manifest = FrameManifest.empty(str(tmp_path))
+    manifest.record('kb.pl:pest:aphid', 'h1', 2)
+    manifest.save()
+
+    loaded = FrameManifest.load(str(tmp_path))
+    assert loaded.frames == {'kb.pl:pest:aphid': {'hash': 'h1', 'chunks': 2}}
+    assert loaded.plan({'kb.pl:pest:aphid': 'h1'}).upserts == []
+    assert loaded.index_version == manifest.index_version
+    loaded.record('kb.pl:pest:aphid', 'h2', 2)
+    assert loaded.index_version != manifest.index_version
+
+    (tmp_path / MANIFEST_FILENAME).write_text(json.dumps({'version': 0, 'frames': {}}))
+    assert FrameManifest.load(str(tmp_path)) is None
+    assert FrameManifest.load(str(tmp_path / 'missing')) is None
+
+
+def test_store_version_follows_frames_and_ingested_texts(tmp_path):
+    stamp = StoreVersion(str(tmp_path))
+    assert stamp.current is None
+
+    manifest = FrameManifest.empty(str(tmp_path))
+    manifest.record('kb.pl:pest:aphid', 'h1', 2)
+    manifest.save()
+    frames_only = stamp.current
+    assert frames_only == manifest.index_version
+
+    corpus = CorpusManifest.load(str(tmp_path))
+    corpus.record('handbook.txt', 'c1', 40)
+    corpus.save()
+    with_corpus = stamp.current
+    assert with_corpus not in (None, frames_only)
+    assert with_corpus == store_version(manifest, CorpusManifest.load(str(tmp_path)))
+
+    # Re-ingesting a text with more chunks is a new version too
+    corpus.record('handbook.txt', 'c2', 41)
+    corpus.save()
+    assert stamp.current != with_corpus
@@ -0,0 +1,89 @@
+"""
+Tests for hybrid BM25 + vector retrieval with reciprocal rank fusion.
+"""
+import time
+
+import pytest
+
+from api.inference_engine.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion, tokenize
+from api.inference_engine.vector_index import NumpyVectorStore
+
+DOCUMENTS = [
+    ("kb.pl:pest:green_peach_aphid", "Myzus persicae colonies on leaf undersides."),
+    ("kb.pl:pest:spider_mite", "Fine webbing and stippled leaves in hot dry weather."),
+    ("kb.pl:practice:neem_oil", "Spray neem oil to suppress soft-bodied insects."),
+]
+
+
+class TopicEmbeddings:
+    """Embeds by topic words only, so Latin names are invisible to vector search"""
+    TOPICS = ['webbing', 'spray', 'leaf', 'insects']
+
+    def embed_query(self, text):
+        vector = [float(topic in text.lower()) for topic in self.TOPICS]
+        # Rare names land near an unrelated topic
+        return vector if any(vector) else [1.0, 0.0, 0.0, 0.0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    embeddings = TopicEmbeddings()
+    NumpyVectorStore.write(str(tmp_path), [f"{frame}#0" for frame, _ in DOCUMENTS], [text for _, text in DOCUMENTS],
+                           [{"frame_id": frame} for frame, _ in DOCUMENTS],
+                           [embeddings.embed_query(text) for _, text in DOCUMENTS])
+    return NumpyVectorStore.load(str(tmp_path), embedding=embeddings)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'c', 'a']], rrf_k=60)
+    assert [key for key, _ in fused] == ['b', 'a', 'c']
+
+
+def test_tokenize_splits_frame_names():
+    assert tokenize("How do I treat green_peach_aphid?") == ['treat', 'green', 'peach', 'aphid']
+
+
+def test_hybrid_finds_binomial_missed_by_vector_search(store):
+    retriever = HybridRetriever(store)
+    assert DOCUMENTS[0][1] not in retriever.vector_search("Myzus persicae", 1)
+    assert retriever.retrieve("Myzus persicae", k=1) == [DOCUMENTS[0][1]]
+    # Title field comes from the frame name
+    assert retriever.keyword_search("spider mite", 1) == [DOCUMENTS[1][1]]
+
+
+def test_slow_vector_search_falls_back_to_keywords(store):
+    retriever = HybridRetriever(store, latency_budget=0.05)
+    retriever.vector_search = lambda query, k: time.sleep(0.5) or []
+
+    start = time.perf_counter()
+    results = retriever.retrieve("neem oil spray", k=2)
+
+    assert time.perf_counter() - start < 0.3
+    assert results[0] == DOCUMENTS[2][1]
+    assert retriever.budget_exceeded == 1
+
+
+class MutableStore:
+    """A store whose documents change in place, as Chroma's do when texts are ingested"""
+
+    def __init__(self, documents):
+        self.documents = [text for _, text in documents]
+        self.metadatas = [{"frame_id": frame} for frame, _ in documents]
+        self.version = 'v1'
+
+    def similarity_search(self, query, k):
+        return []
+
+
+def test_keyword_index_is_rebuilt_when_store_version_changes():
+    store = MutableStore(DOCUMENTS)
+    retriever = HybridRetriever(store)
+    assert retriever.retrieve("Bt kurstaki caterpillars", k=1) == []
+
+    store.documents.append("Bacillus thuringiensis kurstaki (Bt) controls caterpillars.")
+    store.metadatas.append({"source": "handbook.txt", "chunk_idx": 0})
+    assert retriever.retrieve("Bt kurstaki caterpillars", k=1) == []
+
+    store.version = 'v2'
+    assert retriever.retrieve("Bt kurstaki caterpillars", k=1) == [store.documents[-1]]
+    assert retriever.refresh() is False
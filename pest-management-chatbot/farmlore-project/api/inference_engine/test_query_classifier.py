@@ -0,0 +1,117 @@
+"""
+Tests for the single-pass keyword classifier behind detect_prompt_type.
+
+The regression set is the recorded output of the repository's query
+classification test script (query_classification_test_*.txt at the repository
+root): every query with its expected label, corrected where the file marks it
+[MISCLASSIFIED]. The symptom_classification_test_*.txt files record the
+separate patch classifier (improved_patch_classifier.py), whose bare colour and
+symptom keywords detect_prompt_type does not use.
+"""
+import glob
+import json
+import os
+import re
+
+import pytest
+
+from api.inference_engine import prompt_templates
+from api.inference_engine.prompt_templates import PromptType, classify_prompt_type, detect_prompt_type
+from api.inference_engine.query_classifier import KeywordClassifier
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')
+RESULT_FILES = ['query_classification_test_*.txt']
+QUERY_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks', 'rag_queries.json')
+
+_RESULT_RE = re.compile(r"^\s+- '(.+)' -> (\w+)")
+_CORRECTION_RE = re.compile(r"\[MISCLASSIFIED\]: Should be (\w+)")
+
+
+def load_regression_set():
+    """(query, expected PromptType) pairs from the recorded classification test runs"""
+    expected = {}
+    for pattern in RESULT_FILES:
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern))):
+            query = None
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    result = _RESULT_RE.match(line)
+                    correction = _CORRECTION_RE.search(line)
+                    if result:
+                        query = result.group(1)
+                        expected[query] = result.group(2)
+                    elif correction and query:
+                        expected[query] = correction.group(1)
+    names = {'GENERAL_QUERY': 'GENERAL'}
+    return [(query, PromptType[names.get(label, label)]) for query, label in expected.items()]
+
+
+REGRESSION_SET = load_regression_set()
+
+# Soil questions mentioning a colour or symptom word stay soil questions
+SOIL_QUERIES = [
+    "What nutrients do yellow peppers need?",
+    "Best soil for purple sweet potatoes",
+    "Why are my soil tests so acidic?",
+    "Tomatoes are dropping flowers, soil is dry",
+]
+
+
+@pytest.mark.skipif(not REGRESSION_SET, reason="classification test results not found")
+@pytest.mark.parametrize('query,expected', REGRESSION_SET)
+def test_regression_set(query, expected):
+    assert detect_prompt_type(query) == expected
+
+
+@pytest.mark.parametrize('query', SOIL_QUERIES)
+def test_soil_queries(query):
+    assert detect_prompt_type(query) == PromptType.SOIL_ANALYSIS
+
+
+def reference_label(query):
+    """The sequential any() checks the classifier replaces, with the same word-start matching"""
+    query_lower = query.lower()
+    for label, keywords in [
+        (PromptType.PEST_MANAGEMENT, prompt_templates.PEST_MANAGEMENT_KEYWORDS),
+        (PromptType.PEST_IDENTIFICATION, prompt_templates.PEST_IDENTIFICATION_KEYWORDS),
+        (PromptType.SOIL_ANALYSIS, prompt_templates.SOIL_ANALYSIS_KEYWORDS),
+        (PromptType.INDIGENOUS_KNOWLEDGE, prompt_templates.INDIGENOUS_KNOWLEDGE_KEYWORDS),
+    ]:
+        if any(re.search(r"\b" + re.escape(keyword), query_lower) for keyword in keywords):
+            return label
+    return PromptType.GENERAL
+
+
+def test_single_pass_agrees_with_sequential_checks():
+    with open(QUERY_FILE, 'r', encoding='utf-8') as f:
+        queries = [item['query'] for item in json.load(f)['queries']]
+    queries += [query for query, _ in REGRESSION_SET] + SOIL_QUERIES
+    queries += ["When should I plant carrots?", "Traditional ways to store maize", "Tell me a joke"]
+    for query in queries:
+        assert detect_prompt_type(query) == reference_label(query), query
+
+
+def test_keywords_match_from_word_start():
+    classifier = KeywordClassifier([('disease', ['rot']), ('soil', ['ph'])], default='general')
+    assert classifier.classify("Root rot on beans").label == 'disease'
+    assert classifier.classify("rotting stems").label == 'disease'
+    assert classifier.classify("When should I plant carrots?").label == 'general'
+    assert classifier.classify("Read the graph").label == 'general'
+
+
+def test_overlapping_keywords_are_all_found():
+    classifier = KeywordClassifier([('manage', ['pest']), ('identify', ['pest on', 'what pest'])], default='general')
+    assert classifier.matches("what pest on my beans") == {(0, 'pest'), (1, 'pest on'), (1, 'what pest')}
+    # Priority decides the label, the other category lowers the confidence
+    result = classifier.classify("what pest on my beans")
+    assert result.label == 'manage'
+    assert result.keywords == ('pest',)
+    assert result.confidence == pytest.approx(1 / 5 * 0.5)
+
+
+def test_confidence():
+    result = classify_prompt_type("How do I get rid of aphids?")
+    assert result.label == PromptType.PEST_MANAGEMENT
+    assert result.keywords == ('aphid', 'get rid of')
+    assert result.confidence == pytest.approx(1 - 0.5 ** 4, abs=1e-3)
+    assert classify_prompt_type("Tell me a joke") == (PromptType.GENERAL, 0.0, ())
@@ -0,0 +1,83 @@
+"""
+Tests for the RAGQuery result cache.
+"""
+import pytest
+
+from api.inference_engine import retrieval_cache
+from api.inference_engine.implement_rag import RAGQuery
+from api.inference_engine.retrieval_cache import RetrievalCache, normalize_query
+from api.inference_engine.vector_index import NumpyVectorStore
+
+DOCUMENTS = ["aphid colonies on tomato", "mite webbing on beans", "neem spray for aphid"]
+
+
+class CountingEmbeddings:
+    VOCAB = ['aphid', 'mite', 'neem', 'tomato']
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(word in text.lower()) for word in self.VOCAB]
+
+
+@pytest.fixture
+def events(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(retrieval_cache, '_record_cache_event', lambda cache, hit: recorded.append((cache, hit)))
+    return recorded
+
+
+def write_store(directory, documents):
+    embeddings = CountingEmbeddings()
+    NumpyVectorStore.write(str(directory), [str(i) for i in range(len(documents))], documents,
+                           [{} for _ in documents], [embeddings.embed_query(text) for text in documents])
+    embeddings.calls.clear()
+    return NumpyVectorStore.load(str(directory), embedding=embeddings)
+
+
+def test_normalize_query():
+    assert normalize_query("  How do I   control Aphids?? ") == "how do i control aphids"
+
+
+def test_spelling_variants_share_one_retrieval(tmp_path, events):
+    store = write_store(tmp_path, DOCUMENTS)
+    rag = RAGQuery(store, retrieval='vector')
+
+    first = rag.query("Aphid on tomato?", k=2)
+    assert rag.query("aphid  on TOMATO", k=2) == first
+    assert store.embedding.calls == ["aphid on tomato"]
+    # k is part of the key
+    rag.query("aphid on tomato", k=1)
+    assert len(store.embedding.calls) == 2
+    assert events == [('rag_results', False), ('rag_results', True), ('rag_results', False)]
+
+
+def test_new_index_version_invalidates(tmp_path, events):
+    rag = RAGQuery(write_store(tmp_path / 'a', DOCUMENTS), retrieval='vector')
+    assert rag.query("neem", k=1) == ["neem spray for aphid"]
+
+    rag.vector_store = write_store(tmp_path / 'b', ["neem cake for nematodes"])
+    assert rag.query("neem", k=1) == ["neem cake for nematodes"]
+    assert rag.result_cache.invalidations == 1
+
+
+def test_results_over_latency_budget_are_not_cached(tmp_path, events):
+    rag = RAGQuery(write_store(tmp_path, DOCUMENTS), retrieval='hybrid')
+
+    def over_budget(query, k):
+        rag.retriever.budget_exceeded += 1
+        return ["keyword only"]
+    rag.retriever.retrieve = over_budget
+
+    assert rag.query("aphid", k=1) == ["keyword only"]
+    assert rag.result_cache.get_stats()['size'] == 0
+
+
+def test_put_for_a_superseded_version_is_ignored():
+    cache = RetrievalCache(max_size=2)
+    assert cache.get("aphid", 3, "v1") is None
+    cache.get("mite", 3, "v2")
+    cache.put("aphid", 3, "v1", ["stale"])
+    assert cache.get("aphid", 3, "v2") is None
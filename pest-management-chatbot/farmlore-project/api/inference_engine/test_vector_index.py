@@ -0,0 +1,69 @@
+"""
+Tests for the memory-mapped NumPy vector index.
+"""
+import numpy as np
+import pytest
+
+from api.inference_engine.vector_index import NumpyVectorStore, index_version
+
+
+class KeywordEmbeddings:
+    """Deterministic bag-of-words embeddings over a tiny vocabulary"""
+    VOCAB = ['aphid', 'mite', 'soap', 'neem', 'tomato']
+
+    def embed_query(self, text):
+        return [float(word in text) for word in self.VOCAB]
+
+
+@pytest.fixture
+def store(tmp_path):
+    ids = ['kb.pl:pest:aphid#0', 'kb.pl:pest:mite#0', 'kb.pl:practice:soap#0']
+    documents = ['aphid on tomato', 'mite webbing', 'soap spray for aphid']
+    vectors = [[3, 0, 0, 0, 3], [0, 2, 0, 0, 0], [1, 0, 1, 0, 0]]
+    metadatas = [{'frame_id': doc_id.split('#')[0]} for doc_id in ids]
+    NumpyVectorStore.write(str(tmp_path), ids, documents, metadatas, vectors, 'test-model')
+    return NumpyVectorStore.load(str(tmp_path), embedding=KeywordEmbeddings())
+
+
+def test_load_memory_maps_normalized_vectors(store):
+    assert isinstance(store.vectors, np.memmap)
+    assert np.allclose(np.linalg.norm(store.vectors, axis=1), 1.0)
+    assert store.model_name == 'test-model'
+    assert store.version == index_version(store.ids, store.documents)
+
+
+def test_exact_top_k(store):
+    results = store.similarity_search('aphid on my tomato', k=2)
+    assert [r.page_content for r in results] == ['aphid on tomato', 'soap spray for aphid']
+    assert results[0].score == pytest.approx(1.0)
+    assert results[0].metadata == {'frame_id': 'kb.pl:pest:aphid'}
+    assert len(store.similarity_search('aphid', k=10)) == 3
+
+
+def test_missing_index_loads_as_none(tmp_path):
+    assert NumpyVectorStore.load(str(tmp_path / 'none')) is None
+
+
+# Binary codes are coarse on random data, so they need a longer shortlist
+@pytest.mark.parametrize('quantization, rescore_factor', [('int8', 4), ('binary', 20)])
+def test_quantized_scan_with_rescoring_matches_exact_search(tmp_path, quantization, rescore_factor):
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(500, 64)).astype(np.float32)
+    ids = [str(i) for i in range(len(vectors))]
+    NumpyVectorStore.write(str(tmp_path), ids, ids, [{} for _ in ids], vectors)
+    exact = NumpyVectorStore.load(str(tmp_path), quantization='none')
+    quantized = NumpyVectorStore.load(str(tmp_path), quantization=quantization, rescore_factor=rescore_factor)
+    assert quantized.codes.nbytes < exact.vectors.nbytes / 3
+
+    query = vectors[42] + rng.normal(scale=0.1, size=64)
+    expected = exact.search_by_vector(query, k=5)
+    results = quantized.search_by_vector(query, k=5)
+    assert results[0].page_content == '42'
+    # Scores come from the full-precision rows
+    assert results[0].score == pytest.approx(expected[0].score)
+    assert len({r.page_content for r in results} & {r.page_content for r in expected}) >= 4
+
+
+def test_unknown_quantization_is_rejected(store):
+    with pytest.raises(ValueError):
+        NumpyVectorStore(store.vectors, store.ids, store.documents, store.metadatas, quantization='int4')
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""
+NumPy Vector Index
+
+A small exact-search vector store for the RAG system that needs only numpy
+(and the shared embedding service to embed queries), instead of the langchain +
+Chroma stack. Our knowledge base is a few thousand frames, so a brute-force
+scan is one matrix-vector product and gives exact top-k results.
+
+On disk the index is two files in the persist directory:
+    vectors.npy         float32 matrix, one L2-normalized row per document
+    vectors_meta.json   ids, texts, metadata, model name and index version
+
+The matrix is opened with ``mmap_mode='r'``, so every worker process maps the
+same page-cache pages instead of holding its own copy. Files are replaced
+atomically; processes that still map the old file keep a consistent view until
+they reload.
+
+Optionally (RAG_VECTOR_QUANTIZATION) the scan runs over a quantized copy of
+the matrix, written next to it: ``int8`` (per-row scaled codes, 4x smaller) or
+``binary`` (sign bits, 32x smaller, compared by Hamming distance). The best
+k * RAG_VECTOR_RESCORE_FACTOR candidates are then rescored exactly against the
+full-precision rows, so only those rows of vectors.npy are ever paged in.
+
+NumpyVectorStore implements ``similarity_search`` like the langchain stores, so
+RAGQuery works with either backend (selected with RAG_VECTOR_BACKEND).
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "vectors_meta.json"
+INT8_FILE = "vectors.int8.npy"
+INT8_SCALE_FILE = "vectors.int8_scale.npy"
+BINARY_FILE = "vectors.binary.npy"
+
+QUANTIZATIONS = ("none", "int8", "binary")
+DEFAULT_RESCORE_FACTOR = 4
+INT8_SCAN_BLOCK = 2048
+
+# Set bits per byte value, for Hamming distances on numpy < 2.0 (no np.bitwise_count)
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class SearchResult(NamedTuple):
+    """A retrieved document; mirrors the page_content/metadata of a langchain Document"""
+    page_content: str
+    metadata: Dict[str, Any]
+    score: float
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_int8(matrix: np.ndarray):
+    """Per-row symmetric int8 codes and the float32 scales that map them back"""
+    scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.zeros(0, dtype=np.float32)
+    scales[scales == 0] = 1.0
+    codes = np.round(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(matrix: np.ndarray) -> np.ndarray:
+    """Sign bits of each row, packed 8 per byte"""
+    return np.packbits(matrix > 0, axis=-1)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT[values]
+
+
+def index_version(ids: Sequence[str], documents: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    for doc_id, text in zip(ids, documents):
+        digest.update(doc_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class NumpyVectorStore:
+    """Exact cosine-similarity search over a memory-mapped, normalized embedding matrix"""
+
+    def __init__(self, vectors: np.ndarray, ids: List[str], documents: List[str],
+                 metadatas: List[Dict[str, Any]], embedding=None, model_name: Optional[str] = None,
+                 version: Optional[str] = None, quantization: str = "none",
+                 rescore_factor: int = DEFAULT_RESCORE_FACTOR):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown vector quantization '{quantization}', expected one of {QUANTIZATIONS}")
+        self.vectors = vectors
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.embedding = embedding
+        self.model_name = model_name
+        self.version = version or index_version(ids, documents)
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self.codes = None
+        self.scales = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return (os.path.exists(os.path.join(directory, VECTORS_FILE))
+                and os.path.exists(os.path.join(directory, METADATA_FILE)))
+
+    @classmethod
+    def write(cls, directory: str, ids: Sequence[str], documents: Sequence[str],
+              metadatas: Sequence[Dict[str, Any]], vectors, model_name: Optional[str] = None) -> str:
+        """Write a new index to ``directory`` atomically and return its version"""
+        os.makedirs(directory, exist_ok=True)
+        matrix = normalize_rows(vectors) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        version = index_version(ids, documents)
+        metadata = {
+            "version": version,
+            "model": model_name,
+            "dim": int(matrix.shape[1]),
+            "ids": list(ids),
+            "documents": list(documents),
+            "metadatas": list(metadatas),
+        }
+
+        # Vectors first, then metadata: a reader that sees new metadata also sees new vectors
+        codes, scales = quantize_int8(matrix)
+        for filename, array in ((INT8_FILE, codes), (INT8_SCALE_FILE, scales),
+                                (BINARY_FILE, quantize_binary(matrix)), (VECTORS_FILE, matrix)):
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npy.tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, os.path.join(directory, filename))
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".json.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, os.path.join(directory, METADATA_FILE))
+
+        logger.info(f"Wrote vector index {version} to {directory}: {matrix.shape[0]} x {matrix.shape[1]}")
+        return version
+
+    @classmethod
+    def load(cls, directory: str, embedding=None, quantization: Optional[str] = None,
+             rescore_factor: Optional[int] = None) -> Optional["NumpyVectorStore"]:
+        """
+        Memory-map the index in ``directory``; None if there is none.
+
+        ``quantization`` and ``rescore_factor`` default to RAG_VECTOR_QUANTIZATION
+        and RAG_VECTOR_RESCORE_FACTOR.
+        """
+        if not cls.exists(directory):
+            return None
+        if quantization is None:
+            quantization = os.environ.get("RAG_VECTOR_QUANTIZATION", "none").lower()
+        if rescore_factor is None:
+            rescore_factor = int(os.environ.get("RAG_VECTOR_RESCORE_FACTOR", DEFAULT_RESCORE_FACTOR))
+        with open(os.path.join(directory, METADATA_FILE), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r")
+        if vectors.shape[0] != len(metadata["ids"]):
+            logger.error(f"Vector index in {directory} is inconsistent: "
+                         f"{vectors.shape[0]} vectors for {len(metadata['ids'])} documents")
+            return None
+        store = cls(vectors, metadata["ids"], metadata["documents"], metadata["metadatas"],
+                    embedding=embedding, model_name=metadata.get("model"), version=metadata["version"],
+                    quantization=quantization, rescore_factor=rescore_factor)
+        store._load_quantized(directory)
+        return store
+
+    def _load_quantized(self, directory: str) -> None:
+        """Memory-map the quantized matrix, or compute it for indexes written without one"""
+        if self.quantization == "none":
+            return
+        path = os.path.join(directory, INT8_FILE if self.quantization == "int8" else BINARY_FILE)
+        if os.path.exists(path):
+            self.codes = np.load(path, mmap_mode="r")
+            if self.quantization == "int8":
+                self.scales = np.load(os.path.join(directory, INT8_SCALE_FILE), mmap_mode="r")
+        if self.codes is None or len(self.codes) != len(self):
+            logger.warning(f"No {self.quantization} vectors in {directory}; quantizing in memory")
+            if self.quantization == "int8":
+                self.codes, self.scales = quantize_int8(np.asarray(self.vectors))
+            else:
+                self.codes = quantize_binary(np.asarray(self.vectors))
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Scores from the quantized matrix; only their order matters"""
+        if self.quantization == "int8":
+            # numpy has no int8 matrix-vector product: converting the codes in cache-sized
+            # blocks is ~3x faster than letting `codes @ query` upcast the whole matrix
+            scores = np.empty(len(self), dtype=np.float32)
+            for start in range(0, len(self), INT8_SCAN_BLOCK):
+                end = start + INT8_SCAN_BLOCK
+                scores[start:end] = self.codes[start:end].astype(np.float32) @ query
+            return scores * self.scales
+        query_bits = quantize_binary(query.reshape(1, -1))[0]
+        return -_popcount(np.bitwise_xor(self.codes, query_bits)).sum(axis=1, dtype=np.int32)
+
+    def search_by_vector(self, query_vector, k: int = 4) -> List[SearchResult]:
+        """Exact top-k documents by cosine similarity to ``query_vector``"""
+        if not len(self) or k <= 0:
+            return []
+        query = normalize_rows(query_vector)[0]
+        k = min(k, len(self))
+        shortlist = min(len(self), k * self.rescore_factor)
+
+        if self.quantization == "none" or shortlist == len(self):
+            scores = self.vectors @ query
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [SearchResult(self.documents[i], self.metadatas[i], float(scores[i])) for i in top]
+
+        # Shortlist from the quantized scan, then rescore exactly against full precision
+        approximate = self._approximate_scores(query)
+        candidates = np.sort(np.argpartition(-approximate, shortlist - 1)[:shortlist])
+        exact = self.vectors[candidates] @ query
+        order = np.argsort(-exact)[:k]
+        return [SearchResult(self.documents[i], self.metadatas[i], float(exact[j]))
+                for i, j in zip(candidates[order], order)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[SearchResult]:
+        if self.embedding is None:
+            raise ValueError("NumpyVectorStore needs an embedding to search by text")
+        return self.search_by_vector(self.embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4) -> List[SearchResult]:
+        return self.similarity_search_with_score(query, k)
@@ -40,25 +40,25 @@ class Command(BaseCommand):
         else:
             # Import RAG modules
             try:
-                from langchain_community.embeddings import HuggingFaceEmbeddings
                 from langchain_community.vectorstores import Chroma
             except ImportError:
                 self.stdout.write(self.style.WARNING("⚠ Failed to import LangChain modules. Installing..."))
                 try:
                     import subprocess
                     subprocess.run(["pip", "install", "langchain", "langchain-community", "sentence-transformers", "chromadb"])
-                    from langchain_community.embeddings import HuggingFaceEmbeddings
                     from langchain_community.vectorstores import Chroma
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f"⚠ Failed to install dependencies: {str(e)}"))
                     return
             
+            from api.inference_engine.embedding_service import ServiceEmbeddings
+            
             # Create a simple RAG class for direct integration
             class SimpleRAG:
                 def __init__(self, persist_dir):
                     self.persist_dir = persist_dir
                     self.stdout.write("Initializing embeddings model...")
-                    self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+                    self.embeddings = ServiceEmbeddings("all-MiniLM-L6-v2")
                     
                     if os.path.exists(persist_dir) and os.path.isdir(persist_dir) and any(os.listdir(persist_dir)):
                         self.stdout.write(f"Loading existing vector store from {persist_dir}")
@@ -0,0 +1,103 @@
+"""
+Management command to profile the Prolog knowledge base.
+
+Runs a representative suite of KB queries with predicate-level profiling
+enabled on PrologConnector and prints wall time, inferences and result
+counts aggregated by predicate signature. The profile is also saved as a
+report that the admin performance dashboard shows, since the dashboard's
+server process never sees this command's queries.
+"""
+
+import json
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from prolog_integration.connector import PrologConnector
+from prolog_integration.profiler import REPORT_FILE, save_report
+
+# Goals that scan the whole KB rather than using the name index
+SCAN_QUERIES = [
+    "frame(pest, F), member(controls:C, F), member(neem_extract, C)",
+    "frame(practice, F), member(cost:low, F)",
+    "frame(Type, F), member(name:aphid_general, F)",
+]
+
+class Command(BaseCommand):
+    help = 'Run a representative Prolog query suite with predicate-level profiling'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of times to run the suite',
+        )
+        parser.add_argument(
+            '--pests',
+            type=int,
+            default=25,
+            help='Number of pests (and practices) to run per-entity lookups for',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the profile as JSON',
+        )
+        parser.add_argument(
+            '--output',
+            default=REPORT_FILE,
+            help='Report file for the admin performance dashboard',
+        )
+
+    def handle(self, *args, **options):
+        connector = PrologConnector()
+        self.stdout.write(f"Profiling {connector.backend} backend, {options['repeat']} run(s)...")
+        
+        was_enabled = connector.profiler.enabled
+        connector.enable_profiling()
+        try:
+            for _ in range(options['repeat']):
+                self.run_suite(connector, options['pests'])
+        finally:
+            connector.profiler.enabled = was_enabled
+        
+        profile = connector.get_profile()
+        save_report({
+            'generated_at': timezone.now().isoformat(),
+            'backend': connector.backend,
+            'repeat': options['repeat'],
+            'predicates': profile,
+            'limits': connector.get_limit_stats(),
+        }, options['output'])
+        if options['json']:
+            self.stdout.write(json.dumps(profile, indent=2))
+            return
+        
+        self.stdout.write(
+            f"{'Predicate':<26}{'Calls':>7}{'Total s':>10}{'Avg ms':>9}{'Max ms':>9}"
+            f"{'Avg inf':>10}{'Avg res':>9}{'Trunc':>7}"
+        )
+        for row in profile:
+            self.stdout.write(
+                f"{row['predicate']:<26}{row['calls']:>7}{row['total_time']:>10.4f}"
+                f"{row['avg_time'] * 1000:>9.3f}{row['max_time'] * 1000:>9.3f}"
+                f"{row['avg_inferences']:>10.1f}{row['avg_results']:>9.1f}{row['truncated']:>7}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Profiling complete, report saved to {options['output']}"))
+
+    def run_suite(self, connector, entity_count):
+        """Issue the queries PrologService makes for typical chat traffic"""
+        pests = connector.get_all_pests()
+        practices = connector.get_all_practices()
+        connector.get_all_crops()
+        
+        for pest in pests[:entity_count]:
+            connector.get_pest_info(pest)
+            connector.get_pest_solutions(pest)
+            connector.recommend_solution(pest)
+            connector.get_pest_solution_frames(pest)
+        
+        for practice in practices[:entity_count]:
+            connector.get_practice_details(practice)
+        
+        for query in SCAN_QUERIES:
+            connector.query(query)
@@ -10,7 +10,13 @@ from .model_performance import (
 )
 
 # Import the compatibility wrapper for the monitor
-from .compatibility import monitor, record_llm_performance, record_query_performance, ModelPerformanceTracker
+from .compatibility import (
+    monitor,
+    record_cache_event,
+    record_llm_performance,
+    record_query_performance,
+    ModelPerformanceTracker
+)
 
 __all__ = [
     'record_model_response',
@@ -19,6 +25,7 @@ __all__ = [
     'get_query_type_stats',
     'save_current_metrics',
     'monitor',
+    'record_cache_event',
     'record_llm_performance',
     'record_query_performance',
     'ModelPerformanceTracker'
@@ -4,6 +4,7 @@ This module provides compatibility with older monitoring code.
 """
 import time
 import logging
+import threading
 from .model_performance import monitor as performance_monitor, record_model_response
 
 logger = logging.getLogger(__name__)
@@ -71,6 +72,7 @@ class MonitorCompatibilityWrapper:
     def __init__(self, model_performance_monitor):
         self.model_performance_monitor = model_performance_monitor
         self.start_time = time.time()
+        self._cache_lock = threading.Lock()
         
         # Initialize metrics structure expected by admin_views
         self.metrics = {
@@ -90,7 +92,8 @@ class MonitorCompatibilityWrapper:
             },
             "cache": {
                 "hits": 0,
-                "misses": 0
+                "misses": 0,
+                "by_cache": {}
             },
             "llm": {
                 "calls": 0,
@@ -104,6 +107,17 @@ class MonitorCompatibilityWrapper:
             }
         }
     
+    def record_cache_event(self, hit, cache="default"):
+        """
+        Record a cache hit or miss, overall and for the named cache.
+        """
+        with self._cache_lock:
+            totals = self.metrics["cache"]
+            named = totals.setdefault("by_cache", {}).setdefault(cache, {"hits": 0, "misses": 0})
+            key = "hits" if hit else "misses"
+            totals[key] += 1
+            named[key] += 1
+
     def get_metrics(self):
         """
         Get metrics in the format expected by the admin dashboard.
@@ -140,12 +154,28 @@ class MonitorCompatibilityWrapper:
         for query_type, count in query_stats.items():
             self.metrics['queries']['by_type'][query_type] = count
         
+        # Cache hit rates as percentages, for the dashboard
+        cache = self.metrics['cache']
+        for counts in [cache] + list(cache.get('by_cache', {}).values()):
+            total = counts['hits'] + counts['misses']
+            counts['hit_rate'] = 100.0 * counts['hits'] / total if total else 0.0
+        
         return self.metrics
 
 # Create a compatibility wrapper around the performance monitor
 monitor = MonitorCompatibilityWrapper(performance_monitor)
 
 
+def record_cache_event(cache, hit):
+    """
+    Record a hit or miss of a named cache (e.g. "rag_results") on the dashboard metrics.
+    """
+    try:
+        monitor.record_cache_event(hit, cache)
+    except Exception as e:
+        logger.error(f"Error recording cache event: {str(e)}")
+
+
 def record_query_performance(func_or_query_type=None, response_time=None, success=True, source="hybrid"):
     """
     Record query performance metrics.
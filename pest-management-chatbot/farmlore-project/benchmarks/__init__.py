@@ -0,0 +1,2 @@
+# Micro-benchmarks for FarmLore components. Run each module with
+# `python -m benchmarks.<module>` from the project root.
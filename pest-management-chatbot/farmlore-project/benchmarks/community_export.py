@@ -0,0 +1,62 @@
+"""
+Benchmark: memory and time of the full community knowledge export.
+
+Streams synthetic knowledge entries (standing in for a queryset consumed
+with .iterator()) through knowledge_exporter.export_to_prolog and reports
+the peak traced Python memory per corpus size. With chunked streaming the
+peak should stay flat as the corpus grows.
+
+Usage:
+    python -m benchmarks.community_export [--sizes 1000 10000 100000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from community.knowledge_exporter import export_to_prolog
+
+KEEPER = SimpleNamespace(full_name='Mme Lineo', village="Ha Ramabanta")
+
+
+def synthetic_entries(count):
+    for entry_id in range(1, count + 1):
+        yield SimpleNamespace(
+            id=entry_id,
+            title=f"Practice {entry_id}",
+            practice_type='pest_control',
+            pests=['aphids', 'cut worms'],
+            description="Grandmother's remedy: soak the leaves overnight, then spray at dawn.",
+            materials=['Wood ash', 'Water'],
+            crops=['maize', 'sorghum'],
+            keeper=KEEPER,
+            verification_count=3,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'Entries':>9}{'Seconds':>10}{'Peak KiB':>10}{'File MiB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, 'community_kb.pl')
+        for size in args.sizes:
+            tracemalloc.start()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                export_to_prolog(synthetic_entries(size), output_file)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            file_size = os.path.getsize(output_file) / 2 ** 20
+            print(f"{size:>9}{elapsed:>10.2f}{peak / 1024:>10.0f}{file_size:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: latency and agreement of the embedding service backends.
+
+Loads the embedding model once per backend (EMBEDDING_BACKEND: torch, onnx,
+openvino) and reports load time, single-query latency (p50/p95 over the
+labelled questions in benchmarks/rag_queries.json), batch throughput on chunks
+of a reference text, and how far each backend's embeddings are from torch's
+(largest absolute difference, lowest cosine similarity). Exits with status 1
+if a backend's embeddings differ from torch's by more than --tolerance.
+Backends whose packages are not installed are reported as unavailable.
+Requires sentence-transformers; onnx needs optimum[onnxruntime], openvino
+needs optimum[openvino].
+
+Usage:
+    python -m benchmarks.embedding_backends [--backends torch,onnx] [--model-file onnx/model_O3.onnx] [--batch-sizes 32,128]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from api.inference_engine.corpus_ingestion import chunk_text
+from api.inference_engine.embedding_service import DEFAULT_MODEL, EmbeddingService
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                              'The-Organic-Gardeners-Handbook-of-Natural-Insect.txt')
+QUERY_FILE = os.path.join(os.path.dirname(__file__), 'rag_queries.json')
+
+
+def int_list(value):
+    return [int(item) for item in value.split(',')]
+
+
+def single_query_latency(service, model, queries, repeats):
+    samples = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            service.encode([query], model)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def batch_throughput(service, model, chunks, batch_size):
+    service.batch_size = batch_size
+    start = time.perf_counter()
+    for i in range(0, len(chunks), batch_size):
+        service.encode(chunks[i:i + batch_size], model)
+    return len(chunks) / (time.perf_counter() - start)
+
+
+def agreement(vectors, reference):
+    """Largest absolute difference and lowest row-wise cosine similarity"""
+    cosines = np.sum(vectors * reference, axis=1) / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1))
+    return float(np.max(np.abs(vectors - reference))), float(np.min(cosines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--backends', default='torch,onnx', help='comma-separated; torch always runs first as the reference')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--model-file', help='export to load for onnx/openvino, e.g. onnx/model_qint8_avx2.onnx')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--chunks', type=int, default=512, help='corpus chunks for the batch runs')
+    parser.add_argument('--batch-sizes', type=int_list, default=[32, 128])
+    parser.add_argument('--repeats', type=int, default=3, help='passes over the questions for single-query latency')
+    parser.add_argument('--tolerance', type=float, default=1e-3, help='allowed absolute difference from torch')
+    args = parser.parse_args()
+
+    with open(QUERY_FILE, 'r', encoding='utf-8') as f:
+        queries = [item['query'] for item in json.load(f)['queries']]
+    with open(args.corpus, 'r', encoding='utf-8', errors='replace') as f:
+        chunks = chunk_text(f.read())[:args.chunks]
+    texts = queries + chunks
+
+    backends = ['torch'] + [backend for backend in args.backends.split(',') if backend != 'torch']
+    print(f"Model: {args.model}, {len(queries)} questions, {len(chunks)} chunks, {os.cpu_count()} CPUs")
+    print(f"{'backend':10}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          + ''.join(f"{f'batch {size}/s':>14}" for size in args.batch_sizes) + f"{'max diff':>11}{'min cos':>9}")
+
+    reference = None
+    failures = []
+    for backend in backends:
+        service = EmbeddingService(backend=backend, model_file=args.model_file if backend != 'torch' else None)
+        try:
+            # Loading happens on the first encode, which also gives the vectors compared below
+            vectors = service.encode(texts, args.model)
+        except ImportError as e:
+            print(f"{backend:10}  unavailable: {e}")
+            continue
+        if service.get_stats()['model_backends'].get(args.model) != backend:
+            print(f"{backend:10}  unavailable: fell back to torch (see log)")
+            continue
+
+        p50, p95 = single_query_latency(service, args.model, queries, args.repeats)
+        rates = [batch_throughput(service, args.model, chunks, size) for size in args.batch_sizes]
+        if reference is None:
+            reference = vectors
+        max_diff, min_cosine = agreement(vectors, reference)
+        print(f"{backend:10}{service.load_seconds:>8.1f}{p50:>9.2f}{p95:>9.2f}"
+              + ''.join(f"{rate:>14.1f}" for rate in rates) + f"{max_diff:>11.2e}{min_cosine:>9.5f}")
+        if max_diff > args.tolerance:
+            failures.append(f"{backend}: max difference {max_diff:.2e} from torch exceeds {args.tolerance:.0e}")
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: embedding throughput of the corpus ingestion pipeline.
+
+Chunks a reference text (by default the Organic Gardener's Handbook at the
+repository root) and embeds the first --chunks chunks with every combination
+of --workers and --batch-sizes, reporting chunks/s. Each run uses a fresh,
+empty embedding cache so nothing is served from disk. Requires
+sentence-transformers.
+
+Usage:
+    python -m benchmarks.embedding_ingestion [--corpus FILE] [--chunks N] [--workers 1,2,4] [--batch-sizes 16,64]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from api.inference_engine.corpus_ingestion import chunk_text, embed_chunks
+from api.inference_engine.embedding_cache import EmbeddingCache
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                              'The-Organic-Gardeners-Handbook-of-Natural-Insect.txt')
+
+
+def int_list(value):
+    return [int(item) for item in value.split(',')]
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--chunks', type=int, default=1000, help='chunks to embed per run (0 = all)')
+    parser.add_argument('--workers', type=int_list, default=sorted({1, max(1, cpus // 2), cpus}))
+    parser.add_argument('--batch-sizes', type=int_list, default=[16, 64])
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8', errors='replace') as f:
+        chunks = chunk_text(f.read())
+    if args.chunks:
+        chunks = chunks[:args.chunks]
+    print(f"Corpus: {os.path.basename(args.corpus)}, {len(chunks)} chunks, {cpus} CPUs")
+    print(f"{'workers':>8}{'batch':>8}{'seconds':>10}{'chunks/s':>10}")
+
+    baseline = None
+    for workers in args.workers:
+        for batch_size in args.batch_sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = EmbeddingCache(os.path.join(tmp, 'embeddings.sqlite3'))
+                start = time.perf_counter()
+                embed_chunks(chunks, batch_size=batch_size, workers=workers, cache=cache)
+                elapsed = time.perf_counter() - start
+            rate = len(chunks) / elapsed
+            baseline = baseline or rate
+            print(f"{workers:>8}{batch_size:>8}{elapsed:>10.1f}{rate:>10.1f}  ({rate / baseline:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
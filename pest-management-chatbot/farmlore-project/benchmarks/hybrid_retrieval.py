@@ -0,0 +1,95 @@
+"""
+Benchmark: recall@k and latency of keyword, vector and hybrid RAG retrieval.
+
+Indexes the knowledge-base frames into a temporary NumpyVectorStore and asks
+two questions per named frame: one by common name ("How do I deal with pepper
+weevil?") and, where the frame has a Latin binomial, one by scientific name
+("What is Anthonomus eugenii?"). A query counts as recalled at k when any
+snippet of the frame it was generated from is among the top k results.
+Compares BM25 alone, vector search alone and the RRF-fused HybridRetriever
+under --budget-ms. Requires sentence-transformers.
+
+Usage:
+    python -m benchmarks.hybrid_retrieval [--k 3] [--budget-ms 250] [--files a.pl,b.pl]
+"""
+import argparse
+import os
+import re
+import statistics
+import tempfile
+import time
+
+from api.inference_engine.hybrid_retriever import HybridRetriever
+from api.inference_engine.implement_rag import PrologToRAGConverter
+
+KB_DIR = os.path.join(os.path.dirname(__file__), '..', 'prolog_integration')
+DEFAULT_FILES = 'knowledgebase.pl,pea_updates.pl,crop_updates.pl,insect_reference.pl'
+
+_BINOMIAL_RE = re.compile(r"scientific_name is ([A-Z][a-z]+ [a-z]{3,})")
+
+
+def build_queries(frames):
+    """(query, kind, frame ID) triples generated from the frames"""
+    queries = []
+    for frame, (_, texts) in frames.items():
+        name = frame.rsplit(':', 1)[-1]
+        if name.startswith('#') or name == 'atom':
+            continue
+        queries.append((f"How do I deal with {name.replace('_', ' ')}?", 'name', frame))
+        for text in texts:
+            match = _BINOMIAL_RE.search(text)
+            if match:
+                queries.append((f"What is {match.group(1)}?", 'binomial', frame))
+                break
+    return queries
+
+
+def evaluate(search, queries, frame_of, k):
+    """Recall@k per query kind and latency percentiles in ms"""
+    hits, samples = {}, []
+    for query, kind, frame in queries:
+        start = time.perf_counter()
+        results = search(query, k)
+        samples.append(time.perf_counter() - start)
+        found = any(frame_of.get(text) == frame for text in results)
+        hits.setdefault(kind, []).append(found)
+    samples.sort()
+    recall = {kind: sum(values) / len(values) for kind, values in hits.items()}
+    return recall, statistics.median(samples) * 1000, samples[int(len(samples) * 0.95) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=250.0, help='hybrid latency budget')
+    parser.add_argument('--files', default=DEFAULT_FILES, help='comma-separated KB files')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        converter = PrologToRAGConverter(persist_directory=tmp, backend='numpy')
+        frames = converter.extract_frames([os.path.join(KB_DIR, name) for name in args.files.split(',')])
+        store = converter.sync_vector_store(frames)
+        frame_of = {text: metadata['frame_id'] for text, metadata in zip(store.documents, store.metadatas)}
+        retriever = HybridRetriever(store, latency_budget=args.budget_ms / 1000)
+        queries = build_queries(frames)
+
+        # Warm up the model so the first vector query doesn't pay for loading it
+        retriever.vector_search("aphids", 1)
+
+        runs = [
+            ('BM25', retriever.keyword_search),
+            ('Vector', retriever.vector_search),
+            ('Hybrid (RRF)', lambda query, k: retriever.retrieve(query, k)),
+        ]
+        kinds = sorted({kind for _, kind, _ in queries})
+        print(f"Documents: {len(store)}, queries: {len(queries)} "
+              f"({', '.join(f'{sum(q[1] == kind for q in queries)} {kind}' for kind in kinds)}), k={args.k}")
+        print(f"{'':14}" + ''.join(f"{'R@k ' + kind:>14}" for kind in kinds) + f"{'p50 ms':>10}{'p95 ms':>10}")
+        for label, search in runs:
+            recall, p50, p95 = evaluate(search, queries, frame_of, args.k)
+            print(f"{label:14}" + ''.join(f"{recall.get(kind, 0.0):>14.2f}" for kind in kinds) + f"{p50:>10.2f}{p95:>10.2f}")
+        print(f"Hybrid queries over budget: {retriever.budget_exceeded}")
+
+
+if __name__ == '__main__':
+    main()
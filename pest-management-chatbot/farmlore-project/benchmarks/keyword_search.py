@@ -0,0 +1,77 @@
+"""
+Benchmark: latency of the keyword RAG search in standalone_rag.
+
+Compares the BM25 inverted index now behind search_pest_data with the previous
+scan, which re-tokenized every document and ran difflib.SequenceMatcher over
+the full content on every query. The corpus is PEST_DATA replicated --scale
+times (with distinct titles) to show how both grow with the number of documents.
+
+Usage:
+    python -m benchmarks.keyword_search [--scale N] [--repeat N]
+"""
+import argparse
+import statistics
+import time
+
+from api.inference_engine.bm25_index import BM25Index
+from api.inference_engine.standalone_rag import PEST_DATA, get_keywords, simple_similarity
+
+QUERIES = [
+    "How do I control aphids on my tomato plants?",
+    "spider mites on beans",
+    "hornworm caterpillars eating tomatoes",
+    "neem oil for mites",
+    "what is the best organic spray",
+]
+
+
+def legacy_search(documents, query, top_n=2):
+    """The per-query scan search_pest_data used before the index."""
+    query_keywords = set(get_keywords(query))
+    results = []
+    for item in documents:
+        content_keywords = set(get_keywords(item["content"]))
+        title_keywords = set(get_keywords(item["title"]))
+        score = (len(query_keywords & content_keywords) * 0.5 + len(query_keywords & title_keywords) * 2.0
+                 + simple_similarity(query, item["title"]) * 3.0 + simple_similarity(query, item["content"]))
+        results.append({"title": item["title"], "content": item["content"], "score": score})
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results[:top_n]
+
+
+def latencies(search, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            search(query)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--scale', type=int, default=100, help='copies of PEST_DATA in the corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the query set')
+    args = parser.parse_args()
+
+    documents = [dict(item, title=f"{item['title']} ({copy})")
+                 for copy in range(args.scale) for item in PEST_DATA]
+
+    start = time.perf_counter()
+    index = BM25Index(documents, get_keywords)
+    build_time = time.perf_counter() - start
+
+    bm25_p50, bm25_p95 = latencies(lambda query: index.search(query), args.repeat)
+    legacy_p50, legacy_p95 = latencies(lambda query: legacy_search(documents, query), args.repeat)
+
+    print(f"Documents: {len(documents)}, index build: {build_time * 1000:.1f} ms")
+    print(f"{'':16}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'BM25 index':16}{bm25_p50 * 1000:>10.3f}{bm25_p95 * 1000:>10.3f}")
+    print(f"{'Legacy scan':16}{legacy_p50 * 1000:>10.3f}{legacy_p95 * 1000:>10.3f}")
+    print(f"Speedup (p50): {legacy_p50 / bm25_p50:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: tabled vs untabled evaluation of the advanced query interface.
+
+Loads query_examples.pl (and through it load_all.pl and advanced_queries.pl)
+into a fresh SWI-Prolog process once with tabling and once with the
+farmlore_tabling flag set to false, then times the example queries plus a
+set of natural-language and integrated multi-domain queries.
+
+"cold" runs abolish all tables before every pass, so they measure a single
+query suite evaluated from scratch; "warm" runs keep the tables between
+passes, as a long-running connector does.
+
+Requires the swipl executable on PATH.
+
+Usage:
+    python -m benchmarks.prolog_tabling [--repeat N]
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+KB_DIR = Path(__file__).resolve().parent.parent / 'prolog_integration'
+
+NL_QUERIES = [
+    "How can I control aphids on my tomatoes in the summer?",
+    "what pests attack my tomatoes",
+    "what diseases affect roses",
+    "how to attract beneficial insects",
+    "common pests in summer",
+    "organic control for bugs",
+]
+
+INTEGRATED_QUERIES = [
+    ('aphids', 'tomato', 'summer'),
+    ('aphids', 'pea', 'spring'),
+    ('spider_mites', 'bean', 'summer'),
+    ('colorado_potato_beetle', 'potato', 'summer'),
+    ('slugs', 'lettuce', 'spring'),
+]
+
+DRIVER = r"""
+:- create_prolog_flag(farmlore_tabling, {tabling}, []).
+:- consult('{kb}').
+
+quiet(Goal) :- catch(with_output_to(string(_), ignore(Goal)), _, true).
+
+run_suite :-
+    forall(between(1, 30, N),
+           ( atom_concat(example_query_, N, Example),
+             ( current_predicate(Example/0) -> quiet(Example) ; true ) )),
+    forall(member(Query, {nl_queries}), quiet(process_query(Query, _))),
+    forall(member(Pest-Crop-Season, {integrated}),
+           quiet(integrated_approach(Pest, Crop, Season, _))).
+
+timed(Mode, Runs) :-
+    statistics(inferences, I0), statistics(cputime, T0),
+    forall(between(1, Runs, _),
+           ( Mode == cold -> abolish_all_tables, run_suite ; run_suite )),
+    statistics(cputime, T1), statistics(inferences, I1),
+    Time is (T1 - T0) / Runs, Inferences is (I1 - I0) // Runs,
+    format("BENCH ~w ~w ~w~n", [Mode, Time, Inferences]).
+
+main :-
+    abolish_all_tables, quiet(run_suite),
+    timed(cold, {repeat}),
+    abolish_all_tables, quiet(run_suite),
+    timed(warm, {repeat}).
+"""
+
+
+def prolog_list(items):
+    return '[' + ', '.join(items) + ']'
+
+
+def run(tabling, repeat):
+    """Run the suite in a fresh swipl process and return {mode: (seconds, inferences)}."""
+    driver = DRIVER.format(
+        tabling='true' if tabling else 'false',
+        kb=(KB_DIR / 'query_examples.pl').as_posix(),
+        nl_queries=prolog_list(json.dumps(query) for query in NL_QUERIES),
+        integrated=prolog_list(f"{pest}-{crop}-{season}" for pest, crop, season in INTEGRATED_QUERIES),
+        repeat=repeat,
+    )
+    with tempfile.NamedTemporaryFile('w', suffix='.pl', delete=False) as handle:
+        handle.write(driver)
+    try:
+        completed = subprocess.run(
+            ['swipl', '-q', '-g', 'main', '-t', 'halt', handle.name],
+            capture_output=True, text=True, cwd=KB_DIR,
+        )
+    finally:
+        Path(handle.name).unlink()
+
+    results = {}
+    for line in completed.stdout.splitlines():
+        if line.startswith('BENCH '):
+            _, mode, seconds, inferences = line.split()
+            results[mode] = (float(seconds), int(inferences))
+    if len(results) != 2:
+        raise RuntimeError(f"swipl did not report timings:\n{completed.stderr[-2000:]}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--repeat', type=int, default=20, help='suite passes per measurement')
+    args = parser.parse_args()
+
+    if shutil.which('swipl') is None:
+        sys.exit("swipl not found on PATH; install SWI-Prolog to run this benchmark")
+
+    untabled = run(False, args.repeat)
+    tabled = run(True, args.repeat)
+
+    print(f"Query suite: {args.repeat} passes")
+    print(f"{'':8}{'untabled ms':>14}{'tabled ms':>12}{'speedup':>9}{'untabled inf':>15}{'tabled inf':>13}")
+    for mode in ('cold', 'warm'):
+        (slow, slow_inf), (fast, fast_inf) = untabled[mode], tabled[mode]
+        speedup = slow / fast if fast else float('inf')
+        print(f"{mode:8}{slow * 1000:>14.2f}{fast * 1000:>12.2f}{speedup:>8.1f}x{slow_inf:>15}{fast_inf:>13}")
+
+
+if __name__ == '__main__':
+    main()
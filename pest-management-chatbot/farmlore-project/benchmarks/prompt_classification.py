@@ -0,0 +1,90 @@
+"""
+Benchmark: cost per query of keyword prompt-type classification.
+
+Times classify_prompt_type (one compiled regex pass over the query, with a
+confidence) against the sequential ``any(keyword in query)`` scans it replaced,
+run over the same keyword lists. The old function also logged every
+classification at INFO, so the sequential scan is timed both with and without
+an INFO record written to an in-memory handler. The queries are the labelled
+questions in benchmarks/rag_queries.json plus a few prompt-type examples.
+
+Usage:
+    python -m benchmarks.prompt_classification [--repeats 2000]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import time
+
+from api.inference_engine import prompt_templates
+from api.inference_engine.prompt_templates import PromptType, classify_prompt_type
+
+QUERY_FILE = os.path.join(os.path.dirname(__file__), 'rag_queries.json')
+EXTRA_QUERIES = [
+    "What is the optimal soil pH for growing tomatoes?",
+    "Why are my tomato leaves yellow?",
+    "Traditional ways to keep weevils out of stored maize",
+    "When should I plant carrots?",
+]
+
+logger = logging.getLogger('benchmarks.prompt_classification.sequential')
+
+
+def sequential_scan(query, log=False):
+    """The previous detect_prompt_type: one any() scan per category, in priority order"""
+    query_lower = query.lower()
+    for label, keywords in [
+        (PromptType.PEST_MANAGEMENT, prompt_templates.PEST_MANAGEMENT_KEYWORDS),
+        (PromptType.PEST_IDENTIFICATION, prompt_templates.PEST_IDENTIFICATION_KEYWORDS),
+        (PromptType.SOIL_ANALYSIS, prompt_templates.SOIL_ANALYSIS_KEYWORDS),
+        (PromptType.INDIGENOUS_KNOWLEDGE, prompt_templates.INDIGENOUS_KNOWLEDGE_KEYWORDS),
+    ]:
+        if any(keyword in query_lower for keyword in keywords):
+            if log:
+                logger.info(f"Classified as {label.name} due to keywords match: {query}")
+            return label
+    if log:
+        logger.info(f"Classified as GENERAL (default): {query}")
+    return PromptType.GENERAL
+
+
+def time_per_query(classify, queries, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in queries:
+            classify(query)
+    return (time.perf_counter() - start) / (repeats * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--repeats', type=int, default=2000, help='passes over the query set')
+    args = parser.parse_args()
+
+    with open(QUERY_FILE, 'r', encoding='utf-8') as f:
+        queries = [item['query'] for item in json.load(f)['queries']] + EXTRA_QUERIES
+
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    timings = [
+        ("sequential scan, INFO log", time_per_query(lambda query: sequential_scan(query, log=True), queries, args.repeats)),
+        ("sequential scan", time_per_query(sequential_scan, queries, args.repeats)),
+        ("compiled single pass", time_per_query(classify_prompt_type, queries, args.repeats)),
+    ]
+    keywords = sum(len(keywords) for keywords in (
+        prompt_templates.PEST_MANAGEMENT_KEYWORDS, prompt_templates.PEST_IDENTIFICATION_KEYWORDS,
+        prompt_templates.SOIL_ANALYSIS_KEYWORDS, prompt_templates.INDIGENOUS_KNOWLEDGE_KEYWORDS))
+    print(f"{len(queries)} queries x {args.repeats}, {keywords} keywords")
+    baseline = timings[0][1]
+    for name, micros in timings:
+        print(f"{name:28}{micros:>8.2f} us/query  ({baseline / micros:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
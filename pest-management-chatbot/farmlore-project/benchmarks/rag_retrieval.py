@@ -0,0 +1,242 @@
+"""
+Benchmark: retrieval quality, latency and memory of the RAG retrievers.
+
+Runs the labelled questions in benchmarks/rag_queries.json through each
+retriever and reports recall@k, MRR, p50/p95 latency and Python heap use
+(tracemalloc: retained after setup, and peak while answering). A question
+only counts for a retriever when one of its relevant documents is in that
+retriever's corpus. Retrievers that cannot be set up here (missing package or
+vector store) are reported as unavailable rather than failing the run.
+Results are written as JSON to test_results/ at the repository root; with
+--baseline the run exits with status 1 if any retriever regressed beyond the
+given thresholds.
+
+Retrievers:
+    standalone_rag          BM25 over standalone_rag.PEST_DATA
+    direct_rag_integration  BM25 over direct_rag_integration.PEST_DATA
+    docker_query_wrapper    docker_query_wrapper_v2.RAGQueryIntegration over the Chroma store in --persist-dir
+    rag_query_hybrid        implement_rag.RAGQuery (BM25 + vector) over a temporary NumPy index of --files
+    rag_query_vector        implement_rag.RAGQuery (vector only) over the same index
+
+Usage:
+    python -m benchmarks.rag_retrieval [--k 3] [--retrievers a,b] [--persist-dir DIR] [--files a.pl,b.pl]
+    python -m benchmarks.rag_retrieval --baseline test_results/rag_benchmark_X.json [--max-quality-drop 0.05] [--max-latency-increase 0.5]
+"""
+import argparse
+import datetime
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+KB_DIR = os.path.join(os.path.dirname(__file__), '..', 'prolog_integration')
+# The files PrologToRAGConverter.process_all_knowledge_bases indexes
+DEFAULT_FILES = 'knowledgebase.pl,pea_updates.pl,advanced_queries.pl'
+QUERY_FILE = os.path.join(os.path.dirname(__file__), 'rag_queries.json')
+RESULTS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'test_results'))
+RETRIEVERS = ['standalone_rag', 'direct_rag_integration', 'docker_query_wrapper', 'rag_query_hybrid', 'rag_query_vector']
+# p95 increases below this are treated as timer noise in --baseline checks
+LATENCY_SLACK_MS = 1.0
+
+
+class Unavailable(Exception):
+    """The retriever cannot run in this environment"""
+
+
+def label_of(metadata):
+    """Document label used in rag_queries.json: frame ID, or article title"""
+    metadata = metadata or {}
+    return metadata.get('frame_id') or metadata.get('title')
+
+
+def text_labeller(texts, metadatas):
+    """Map retrieved texts back to their labels, for retrievers that return only text"""
+    labels = {text: label_of(metadata) for text, metadata in zip(texts, metadatas)}
+    return (lambda results: [labels.get(text) for text in results]), {label for label in labels.values() if label}
+
+
+def setup_pest_data(module_name):
+    import importlib
+    module = importlib.import_module(f'api.inference_engine.{module_name}')
+    search = lambda query, k: [result['title'] for result in module.search_pest_data(query, k)]
+    return search, {item['title'] for item in module.PEST_DATA}
+
+
+def setup_docker_query_wrapper(persist_dir):
+    from api.inference_engine.docker_query_wrapper_v2 import RAGQueryIntegration
+    from api.inference_engine.hybrid_retriever import _store_documents
+    if not os.path.isdir(persist_dir):
+        raise Unavailable(f"no vector store at {persist_dir}")
+    integration = RAGQueryIntegration(persist_directory=persist_dir)
+    if integration.vector_store is None:
+        raise Unavailable(f"could not load the vector store at {persist_dir} (see log)")
+    labels, corpus = text_labeller(*_store_documents(integration.vector_store))
+    return (lambda query, k: labels(integration.query(query, k))), corpus
+
+
+def setup_rag_query(retrieval, files, tmp):
+    from api.inference_engine.implement_rag import PrologToRAGConverter, RAGQuery
+    try:
+        converter = PrologToRAGConverter(persist_directory=tmp, backend='numpy')
+        store = converter.load_vector_store() or converter.sync_vector_store(converter.extract_frames(files))
+    except ImportError as e:
+        raise Unavailable(str(e))
+    if store is None:
+        raise Unavailable("no frames indexed")
+    # Result cache off: every question is answered by the retriever
+    rag = RAGQuery(store, retrieval=retrieval, cache_size=0)
+    labels, corpus = text_labeller(store.documents, store.metadatas)
+    return (lambda query, k: labels(rag.query(query, k))), corpus
+
+
+def unique(labels):
+    return list(dict.fromkeys(label for label in labels if label))
+
+
+def evaluate(search, queries, corpus, k):
+    """Recall@k, MRR and latency percentiles over the questions answerable from ``corpus``"""
+    recalls, reciprocal_ranks, samples = [], [], []
+    for item in queries:
+        relevant = set(item['relevant']) & corpus
+        if not relevant:
+            continue
+        start = time.perf_counter()
+        results = search(item['query'], k)
+        samples.append((time.perf_counter() - start) * 1000)
+        ranked = unique(results[:k])
+        recalls.append(len(relevant & set(ranked)) / len(relevant))
+        reciprocal_ranks.append(next((1.0 / rank for rank, label in enumerate(ranked, 1) if label in relevant), 0.0))
+    if not samples:
+        raise Unavailable("no labelled question is answerable from this corpus")
+    samples.sort()
+    return {
+        'questions': len(samples),
+        'recall_at_k': statistics.mean(recalls),
+        'mrr': statistics.mean(reciprocal_ranks),
+        'latency_ms': {'p50': statistics.median(samples), 'p95': samples[max(0, int(len(samples) * 0.95) - 1)]},
+    }
+
+
+def run_retriever(name, args, queries, tmp):
+    """Set up one retriever and measure it; returns its result entry"""
+    files = [os.path.join(KB_DIR, file_name) for file_name in args.files.split(',')]
+    setups = {
+        'standalone_rag': lambda: setup_pest_data('standalone_rag'),
+        'direct_rag_integration': lambda: setup_pest_data('direct_rag_integration'),
+        'docker_query_wrapper': lambda: setup_docker_query_wrapper(args.persist_dir),
+        'rag_query_hybrid': lambda: setup_rag_query('hybrid', files, tmp),
+        'rag_query_vector': lambda: setup_rag_query('vector', files, tmp),
+    }
+    gc.collect()
+    tracemalloc.start()
+    try:
+        search, corpus = setups[name]()
+        setup_mb = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    except (Unavailable, ImportError) as e:
+        return {'status': 'unavailable', 'reason': str(e)}
+    finally:
+        tracemalloc.stop()
+
+    # Warm up (model loading, lazy indexes), then time without tracemalloc overhead
+    search(queries[0]['query'], args.k)
+    try:
+        result = evaluate(search, queries, corpus, args.k)
+    except Unavailable as e:
+        return {'status': 'unavailable', 'reason': str(e)}
+
+    tracemalloc.start()
+    for item in queries:
+        search(item['query'], args.k)
+    query_peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    result['memory_mb'] = {'setup': setup_mb, 'query_peak': query_peak_mb}
+    return {'status': 'ok', **result}
+
+
+def find_regressions(results, baseline, max_quality_drop, max_latency_increase):
+    """Human-readable regressions of ``results`` against a previous run"""
+    regressions = []
+    if baseline.get('k') != results['k']:
+        regressions.append(f"baseline was run with k={baseline.get('k')}, this run with k={results['k']}")
+        return regressions
+    for name, current in results['retrievers'].items():
+        previous = baseline.get('retrievers', {}).get(name)
+        if not previous or previous.get('status') != 'ok':
+            continue
+        if current['status'] != 'ok':
+            regressions.append(f"{name}: was measured in the baseline, now {current['status']} ({current.get('reason')})")
+            continue
+        for metric in ('recall_at_k', 'mrr'):
+            if current[metric] < previous[metric] - max_quality_drop:
+                regressions.append(f"{name}: {metric} {previous[metric]:.3f} -> {current[metric]:.3f}")
+        before, after = previous['latency_ms']['p95'], current['latency_ms']['p95']
+        if after > before * (1 + max_latency_increase) + LATENCY_SLACK_MS:
+            regressions.append(f"{name}: p95 latency {before:.2f} ms -> {after:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--retrievers', default=','.join(RETRIEVERS), help='comma-separated subset to run')
+    parser.add_argument('--queries', default=QUERY_FILE, help='labelled query set (JSON)')
+    parser.add_argument('--files', default=DEFAULT_FILES, help='comma-separated KB files for the RAGQuery index')
+    parser.add_argument('--persist-dir', default=os.environ.get('RAG_PERSIST_DIR', './data/chromadb'),
+                        help='Chroma store for docker_query_wrapper (default: RAG_PERSIST_DIR)')
+    parser.add_argument('--output', help=f'results file (default: {RESULTS_DIR}/rag_benchmark_<timestamp>.json)')
+    parser.add_argument('--baseline', help='previous results file to check for regressions')
+    parser.add_argument('--max-quality-drop', type=float, default=0.05, help='allowed absolute drop in recall@k and MRR')
+    parser.add_argument('--max-latency-increase', type=float, default=0.5, help='allowed relative p95 increase')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with open(args.queries, 'r', encoding='utf-8') as f:
+        queries = json.load(f)['queries']
+
+    started = datetime.datetime.now()
+    results = {'timestamp': started.isoformat(), 'k': args.k, 'queries': len(queries),
+               'files': args.files.split(','), 'retrievers': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.retrievers.split(','):
+            results['retrievers'][name] = run_retriever(name, args, queries, tmp)
+
+    print(f"Questions: {len(queries)}, k={args.k}")
+    print(f"{'':24}{'questions':>10}{'R@k':>7}{'MRR':>7}{'p50 ms':>9}{'p95 ms':>9}{'setup MB':>10}{'peak MB':>9}")
+    for name, result in results['retrievers'].items():
+        if result['status'] != 'ok':
+            print(f"{name:24}  unavailable: {result['reason']}")
+            continue
+        print(f"{name:24}{result['questions']:>10}{result['recall_at_k']:>7.2f}{result['mrr']:>7.2f}"
+              f"{result['latency_ms']['p50']:>9.2f}{result['latency_ms']['p95']:>9.2f}"
+              f"{result['memory_mb']['setup']:>10.1f}{result['memory_mb']['query_peak']:>9.1f}")
+
+    regressions = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), args.max_quality_drop, args.max_latency_increase)
+        results['baseline'] = args.baseline
+        results['regressions'] = regressions
+
+    output = args.output or os.path.join(RESULTS_DIR, f"rag_benchmark_{started.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    if regressions is not None:
+        print("No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: cost per frame of turning Prolog frame query results into Python dicts.
+
+Compares the native term conversion used by PrologConnector (terms.to_python)
+with the previous approach: normalizing attributes to 'key:value' strings (as
+pyswip's normalize=True does) and re-parsing them by splitting on ':' and ','.
+
+Usage:
+    python -m benchmarks.term_conversion [--repeat N]
+"""
+import argparse
+import logging
+import time
+
+from prolog_integration.frame_engine import FrameEngine, default_kb_path, _to_binding
+from prolog_integration.terms import to_python
+
+
+def legacy_parse(attributes_list):
+    """The string parser PrologService used before native conversion."""
+    attrs_dict = {}
+    for attr_str in attributes_list:
+        if isinstance(attr_str, str) and ':' in attr_str:
+            key, val = attr_str.split(':', 1)
+            key = key.strip()
+            val = val.strip()
+            if val.startswith('[') and val.endswith(']') and len(val) > 2:
+                attrs_dict[key] = [item.strip() for item in val[1:-1].split(',')]
+            elif val.lower() in ['true', 'false']:
+                attrs_dict[key] = val.lower() == 'true'
+            elif val.isdigit():
+                attrs_dict[key] = int(val)
+            else:
+                attrs_dict[key] = val
+    return attrs_dict
+
+
+def time_per_frame(func, frames, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            func(frame)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--repeat', type=int, default=50, help='passes over the whole KB')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    engine = FrameEngine.from_file(default_kb_path())
+    raw_frames = [slots for frames in engine.frames.values() for slots in frames]
+    string_frames = [_to_binding(slots) for slots in raw_frames]
+
+    native = time_per_frame(to_python, raw_frames, args.repeat)
+    legacy = time_per_frame(lambda slots: legacy_parse(_to_binding(slots)), raw_frames, args.repeat)
+
+    mismatched = sum(1 for raw, rendered in zip(raw_frames, string_frames)
+                     if legacy_parse(rendered) != to_python(raw))
+
+    print(f"Frames: {len(raw_frames)} (x{args.repeat} passes)")
+    print(f"Native term conversion : {native * 1e6:8.2f} us/frame")
+    print(f"Legacy normalize+parse : {legacy * 1e6:8.2f} us/frame")
+    print(f"Frames the legacy parser got wrong: {mismatched}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: memory, recall and latency of quantized NumpyVectorStore search.
+
+Builds a vector index and compares exact float32 search with int8 and binary
+scans that rescore a k * --rescore-factor shortlist at full precision. Reports
+the size of the matrix each mode scans, recall@k against the exact float32
+top-k, and p50 query latency. By default the index holds the knowledge-base
+frames embedded with all-MiniLM-L6-v2 (requires sentence-transformers) and the
+queries are the frame snippets themselves with a little noise; --synthetic N
+uses N clustered random 384-dimensional vectors instead.
+
+Usage:
+    python -m benchmarks.vector_quantization [--synthetic N] [--k 5] [--rescore-factor 4] [--queries 200]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from api.inference_engine.vector_index import NumpyVectorStore, normalize_rows
+
+KB_DIR = os.path.join(os.path.dirname(__file__), '..', 'prolog_integration')
+KB_FILES = ['knowledgebase.pl', 'pea_updates.pl', 'crop_updates.pl', 'insect_reference.pl',
+            'plant_disease_reference.pl']
+
+
+def kb_vectors():
+    from api.inference_engine.implement_rag import PrologToRAGConverter
+    converter = PrologToRAGConverter(persist_directory=tempfile.mkdtemp(), backend='numpy')
+    frames = converter.extract_frames([os.path.join(KB_DIR, name) for name in KB_FILES])
+    texts = [text for _, frame_texts in frames.values() for text in frame_texts]
+    return np.asarray(converter.embeddings.embed_documents(texts), dtype=np.float32)
+
+
+def synthetic_vectors(count, dim=384, clusters=50, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=count)] + rng.normal(scale=0.6, size=(count, dim))).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--synthetic', type=int, default=0, help='use N random vectors instead of the KB')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--rescore-factor', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.synthetic) if args.synthetic else kb_vectors()
+    rng = np.random.default_rng(1)
+    picks = rng.integers(len(vectors), size=args.queries)
+    queries = normalize_rows(vectors[picks]) + rng.normal(scale=0.02, size=(args.queries, vectors.shape[1]))
+
+    with tempfile.TemporaryDirectory() as directory:
+        ids = [str(i) for i in range(len(vectors))]
+        NumpyVectorStore.write(directory, ids, ids, [{} for _ in ids], vectors)
+
+        results = {}
+        for mode in ('none', 'int8', 'binary'):
+            store = NumpyVectorStore.load(directory, quantization=mode, rescore_factor=args.rescore_factor)
+            scanned = store.vectors.nbytes if mode == 'none' else store.codes.nbytes + (
+                store.scales.nbytes if store.scales is not None else 0)
+            samples, found = [], []
+            for query in queries:
+                start = time.perf_counter()
+                found.append([r.page_content for r in store.search_by_vector(query, args.k)])
+                samples.append(time.perf_counter() - start)
+            results[mode] = (scanned, statistics.median(samples), found)
+
+    exact_bytes, exact_p50, exact_found = results['none']
+    print(f"Vectors: {len(vectors)} x {vectors.shape[1]} ({'synthetic' if args.synthetic else 'KB'}), "
+          f"k={args.k}, rescore factor={args.rescore_factor}")
+    print(f"{'':10}{'scan KiB':>10}{'memory':>9}{'recall@k':>10}{'p50 ms':>9}{'speedup':>9}")
+    for mode, (scanned, p50, found) in results.items():
+        recall = statistics.mean(len(set(a) & set(b)) / args.k for a, b in zip(found, exact_found))
+        print(f"{mode:10}{scanned / 1024:>10.0f}{exact_bytes / scanned:>8.1f}x{recall:>10.3f}"
+              f"{p50 * 1000:>9.3f}{exact_p50 / p50:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ import logging
 import re
 from api.inference_engine.hybrid_engine import HybridEngine
 from api.inference_engine.prompt_templates import detect_prompt_type
+from api.inference_engine.query_classifier import KeywordClassifier
 
 # Initialize logging
 logger = logging.getLogger(__name__)
@@ -82,7 +83,7 @@ def rag_api(request):
                 })
             
             # Classify query type using existing function
-            query_type = detect_query_type(query)
+            query_type, confidence, _ = classify_query_type(query)
             
             # Extract entities if needed
             params = extract_entities(query)
@@ -91,9 +92,6 @@ def rag_api(request):
             # Process the query using the hybrid engine
             result = hybrid_engine.query(query_type, params)
             
-            # Get classification confidence (placeholder for now)
-            confidence = 0.85
-            
             # Map source from hybrid_engine to our frontend terminology
             source_mapping = {
                 'ollama': 'llm',
@@ -148,30 +146,25 @@ def submit_feedback(request):
         'error': 'Invalid request method'
     }, status=405)
 
+# HybridEngine query types by keyword, highest priority first
+QUERY_TYPE_CLASSIFIER = KeywordClassifier([
+    ("pest_identification", ["identify", "what pest", "what insect", "what disease"]),
+    ("control_methods", ["control", "manage", "treat", "get rid of", "solution"]),
+    ("crop_pests", ["crops affected", "what crops", "crop pests"]),
+    ("indigenous_knowledge", ["traditional", "indigenous", "old methods"]),
+], default="general_query")
+
+def classify_query_type(query):
+    """
+    Detect the query type based on its content, with a confidence in [0, 1]
+    """
+    return QUERY_TYPE_CLASSIFIER.classify(query)
+
 def detect_query_type(query):
     """
     Detect the query type based on its content
     """
-    query_lower = query.lower()
-    
-    # Check for pest identification
-    if any(term in query_lower for term in ["identify", "what pest", "what insect", "what disease"]):
-        return "pest_identification"
-    
-    # Check for control methods
-    if any(term in query_lower for term in ["control", "manage", "treat", "get rid of", "solution"]):
-        return "control_methods"
-    
-    # Check for crop pests
-    if any(term in query_lower for term in ["crops affected", "what crops", "crop pests"]):
-        return "crop_pests"
-    
-    # Check for indigenous knowledge
-    if any(term in query_lower for term in ["traditional", "indigenous", "old methods"]):
-        return "indigenous_knowledge"
-    
-    # Default to general query
-    return "general_query"
+    return classify_query_type(query).label
 
 def extract_entities(query):
     """
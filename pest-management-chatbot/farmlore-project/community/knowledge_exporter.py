@@ -7,119 +7,292 @@ It uses a frame-based representation to match the structure of the main knowledg
 """
 import os
 import sys
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from prolog_integration.terms import quote_atom
 
 # Django imports - uncomment these in the actual implementation
 # from django.conf import settings
 # from .models import IndigenousKnowledge, KnowledgeKeeper
 
-def export_to_prolog(knowledge_entries, output_file: str) -> None:
+# Entries fetched from the database and written to disk per batch during a full export
+EXPORT_CHUNK_SIZE = 500
+
+# Markers that delimit each entry's frame in the exported file, so an incremental
+# export can replace or drop single entries without regenerating the whole file
+ENTRY_BEGIN_PREFIX = "% BEGIN entry "
+ENTRY_BEGIN_MARKER = ENTRY_BEGIN_PREFIX + "{}\n"
+ENTRY_END_MARKER = "% END entry {}\n"
+FRAMES_END_MARKER = "% END COMMUNITY FRAMES\n"
+
+def format_practice_frame(entry) -> str:
+    """
+    Format a single knowledge entry as a frame(practice, [...]) fact, without the final period.
+    
+    Args:
+        entry: IndigenousKnowledge object
+        
+    Returns:
+        The Prolog text of the frame
+    """
+    # Convert title to a valid Prolog atom (lowercase, underscores)
+    practice_name = entry.title.lower().replace(' ', '_')
+    
+    # Every user-supplied value goes through quote_atom, so quotes, backslashes and
+    # newlines in community text cannot break the generated file
+    lines = ["frame(practice, ["]
+    lines.append(f"    name: {quote_atom(practice_name)},")
+    lines.append(f"    type: {quote_atom(entry.practice_type)},")
+    
+    # Add controls (pests) if any
+    if entry.pests:
+        pests_str = ', '.join(quote_atom(str(pest)) for pest in entry.pests)
+        lines.append(f"    controls: [{pests_str}],")
+    else:
+        lines.append(f"    resolves: [low_fertility, poor_organic_matter],")
+    
+    # Add description
+    lines.append(f"    description: {_quote_text(entry.description)},")
+    
+    # Add cost and difficulty (estimated)
+    lines.append(f"    cost: low,")
+    lines.append(f"    difficulty: medium,")
+    
+    # Add materials
+    materials_str = ', '.join(_quote_text(material) for material in entry.materials)
+    lines.append(f"    materials: [{materials_str}],")
+    
+    # Add applicable crops
+    crops_str = ', '.join(quote_atom(str(crop)) for crop in entry.crops)
+    lines.append(f"    applicable_crops: [{crops_str}],")
+    
+    # Add season (default to growing_season)
+    lines.append(f"    season: [growing_season],")
+    
+    # Add source information
+    lines.append(f"    source: {_quote_text(f'{entry.keeper.full_name} from {entry.keeper.village}')},")
+    lines.append(f"    verification_count: {entry.verification_count},")
+    
+    # Add cultural context
+    lines.append("    cultural_context: [basotho]")
+    lines.append("])")
+    return '\n'.join(lines)
+
+def _quote_text(text) -> str:
+    """Render free text as a quoted Prolog atom, always quoted like the rest of the KB's text slots."""
+    quoted = quote_atom(str(text))
+    return quoted if quoted.startswith("'") else f"'{quoted}'"
+
+@contextmanager
+def _atomic_write(output_file: str):
+    """Write to a temporary file next to output_file and move it into place on success."""
+    directory = os.path.dirname(output_file) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.community_kb.', suffix='.pl', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yield f
+        os.replace(temp_path, output_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+def _iterate_in_chunks(knowledge_entries, chunk_size: int):
+    """Yield lists of at most chunk_size entries, streaming querysets with .iterator()."""
+    if hasattr(knowledge_entries, 'iterator'):
+        knowledge_entries = knowledge_entries.iterator(chunk_size=chunk_size)
+    chunk = []
+    for entry in knowledge_entries:
+        chunk.append(entry)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _write_entry(f, entry_id, frame: str) -> None:
+    """Write one entry's frame between its begin/end markers."""
+    f.write(ENTRY_BEGIN_MARKER.format(entry_id))
+    f.write(frame + ".\n")
+    f.write(ENTRY_END_MARKER.format(entry_id))
+    f.write("\n")
+
+def _write_header(f) -> None:
+    f.write("% ========================\n")
+    f.write("% COMMUNITY KNOWLEDGE BASE\n")
+    f.write("% ========================\n")
+    f.write("% This file is automatically generated from community contributions\n")
+    f.write("% Last updated: {}\n\n".format(datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    # frame/2 is dynamic so incremental exports can retract/assert single frames
+    # in a running engine instead of reloading the KB
+    f.write(":- dynamic(frame/2).\n")
+    f.write(":- discontiguous(frame/2).\n\n")
+
+def _write_helper_predicates(f) -> None:
+    # Add helper predicates for community knowledge
+    f.write("% ========================\n")
+    f.write("% HELPER PREDICATES\n")
+    f.write("% ========================\n")
+    f.write("% Find indigenous practices for controlling a specific pest\n")
+    f.write("indigenous_practice_for_pest(Pest, Practice) :-\n")
+    f.write("    practice(name:Practice, controls:Controls, cultural_context:Ctx),\n")
+    f.write("    member(basotho, Ctx),\n")
+    f.write("    member(Pest, Controls).\n\n")
+    
+    f.write("% Find indigenous practices for a specific crop\n")
+    f.write("indigenous_practice_for_crop(Crop, Practice) :-\n")
+    f.write("    practice(name:Practice, applicable_crops:Crops, cultural_context:Ctx),\n")
+    f.write("    member(basotho, Ctx),\n")
+    f.write("    member(Crop, Crops).\n\n")
+    
+    f.write("% Find verified indigenous practices (verification count >= 3)\n")
+    f.write("verified_indigenous_practice(Practice) :-\n")
+    f.write("    practice(name:Practice, verification_count:Count, cultural_context:Ctx),\n")
+    f.write("    member(basotho, Ctx),\n")
+    f.write("    Count >= 3.\n\n")
+    
+    f.write("% Find all indigenous practices by type\n")
+    f.write("indigenous_practices_by_type(Type, Practices) :-\n")
+    f.write("    findall(Practice, (\n")
+    f.write("        practice(name:Practice, type:Type, cultural_context:Ctx),\n")
+    f.write("        member(basotho, Ctx)\n")
+    f.write("    ), Practices).\n\n")
+    
+    f.write("% Integrated queries that combine conventional and indigenous knowledge\n")
+    f.write("all_practices_for_pest(Pest, AllPractices) :-\n")
+    f.write("    findall(practice(Name, conventional), (\n")
+    f.write("        practice(name:Name, controls:Controls, cultural_context:Ctx),\n")
+    f.write("        \\+ member(basotho, Ctx),\n")
+    f.write("        member(Pest, Controls)\n")
+    f.write("    ), ConventionalPractices),\n")
+    f.write("    findall(practice(Name, indigenous), (\n")
+    f.write("        practice(name:Name, controls:Controls, cultural_context:Ctx),\n")
+    f.write("        member(basotho, Ctx),\n")
+    f.write("        member(Pest, Controls)\n")
+    f.write("    ), IndigenousPractices),\n")
+    f.write("    append(ConventionalPractices, IndigenousPractices, AllPractices).\n")
+
+def export_to_prolog(knowledge_entries, output_file: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
     """
     Export community knowledge to Prolog format using frame-based representation.
     
+    Entries are streamed (querysets via .iterator()) and written chunk by chunk, so memory
+    use does not grow with the number of entries. The file is written to a temporary
+    file and renamed into place, so readers never see a partially written KB.
+    
     Args:
-        knowledge_entries: List of IndigenousKnowledge objects
+        knowledge_entries: Iterable or queryset of IndigenousKnowledge objects
         output_file: Path to the output Prolog file
+        chunk_size: Number of entries fetched and written per batch
+        
+    Returns:
+        Number of entries exported
     """
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("% ========================\n")
-        f.write("% COMMUNITY KNOWLEDGE BASE\n")
-        f.write("% ========================\n")
-        f.write("% This file is automatically generated from community contributions\n")
-        f.write("% Last updated: {}\n\n".format(datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    count = 0
+    with _atomic_write(output_file) as f:
+        _write_header(f)
         
         # Export knowledge entries as Prolog frames
-        for entry in knowledge_entries:
-            # Convert title to a valid Prolog atom (lowercase, underscores)
-            practice_name = entry.title.lower().replace(' ', '_')
-            
-            # Create a frame for each practice
-            f.write("frame(practice, [\n")
-            f.write(f"    name: {practice_name},\n")
-            f.write(f"    type: {entry.practice_type},\n")
-            
-            # Add controls (pests) if any
-            if entry.pests:
-                pests_str = ', '.join(entry.pests)
-                f.write(f"    controls: [{pests_str}],\n")
-            else:
-                f.write(f"    resolves: [low_fertility, poor_organic_matter],\n")
-            
-            # Add description
-            f.write(f"    description: '{entry.description}',\n")
-            
-            # Add cost and difficulty (estimated)
-            f.write(f"    cost: low,\n")
-            f.write(f"    difficulty: medium,\n")
-            
-            # Add materials
-            materials_str = ', '.join([f"'{material}'" for material in entry.materials])
-            f.write(f"    materials: [{materials_str}],\n")
-            
-            # Add applicable crops
-            crops_str = ', '.join(entry.crops)
-            f.write(f"    applicable_crops: [{crops_str}],\n")
-            
-            # Add season (default to growing_season)
-            f.write(f"    season: [growing_season],\n")
-            
-            # Add source information
-            f.write(f"    source: '{entry.keeper.full_name} from {entry.keeper.village}',\n")
-            f.write(f"    verification_count: {entry.verification_count},\n")
-            
-            # Add cultural context
-            f.write("    cultural_context: [basotho]\n")
-            f.write("]).\n\n")
+        for chunk in _iterate_in_chunks(knowledge_entries, chunk_size):
+            for entry in chunk:
+                _write_entry(f, entry.id, format_practice_frame(entry))
+            count += len(chunk)
+        f.write(FRAMES_END_MARKER + "\n")
         
-        # Add helper predicates for community knowledge
-        f.write("% ========================\n")
-        f.write("% HELPER PREDICATES\n")
-        f.write("% ========================\n")
-        f.write("% Find indigenous practices for controlling a specific pest\n")
-        f.write("indigenous_practice_for_pest(Pest, Practice) :-\n")
-        f.write("    practice(name:Practice, controls:Controls, cultural_context:Ctx),\n")
-        f.write("    member(basotho, Ctx),\n")
-        f.write("    member(Pest, Controls).\n\n")
+        _write_helper_predicates(f)
+    
+    print(f"Exported {count} community knowledge entries to {output_file}")
+    return count
+
+def splice_community_frames(output_file: str, changed_entries, removed_ids) -> Tuple[List[str], List[str]]:
+    """
+    Update an exported community KB file in place for a set of changed entries.
+    
+    Frames of changed entries are replaced where they are, frames of removed entries
+    are dropped and frames of new entries are added at the end of the frame section.
+    Only the change set is formatted; the rest of the file is copied line by line to a
+    temporary file that then replaces the original.
+    
+    Args:
+        output_file: Path to a file written by export_to_prolog
+        changed_entries: IndigenousKnowledge objects to (re)export
+        removed_ids: ids of entries whose frames should be dropped
         
-        f.write("% Find indigenous practices for a specific crop\n")
-        f.write("indigenous_practice_for_crop(Crop, Practice) :-\n")
-        f.write("    practice(name:Practice, applicable_crops:Crops, cultural_context:Ctx),\n")
-        f.write("    member(basotho, Ctx),\n")
-        f.write("    member(Crop, Crops).\n\n")
+    Returns:
+        (retracted, asserted): the Prolog text of the frames that were replaced or
+        dropped, and of the frames that were written
         
-        f.write("% Find verified indigenous practices (verification count >= 3)\n")
-        f.write("verified_indigenous_practice(Practice) :-\n")
-        f.write("    practice(name:Practice, verification_count:Count, cultural_context:Ctx),\n")
-        f.write("    member(basotho, Ctx),\n")
-        f.write("    Count >= 3.\n\n")
+    Raises:
+        ValueError: If the file has no entry markers (written by an older exporter)
+    """
+    pending = {str(entry.id): format_practice_frame(entry) for entry in changed_entries}
+    asserted = list(pending.values())
+    dropped = {str(entry_id) for entry_id in removed_ids} | set(pending)
+    retracted = []
+    
+    with open(output_file, 'r', encoding='utf-8') as src, _atomic_write(output_file) as dst:
+        section_id = None
+        section_lines = []
+        found_end = False
+        for line in src:
+            if section_id is not None:
+                if line == ENTRY_END_MARKER.format(section_id):
+                    # The whole old frame is retracted, not every frame sharing its name
+                    retracted.append(''.join(section_lines).strip().rstrip('.'))
+                    if section_id in pending:
+                        _write_entry(dst, section_id, pending.pop(section_id))
+                    section_id = None
+                    section_lines = []
+                else:
+                    section_lines.append(line)
+                continue
+            if line.startswith(ENTRY_BEGIN_PREFIX) and line[len(ENTRY_BEGIN_PREFIX):].strip() in dropped:
+                section_id = line[len(ENTRY_BEGIN_PREFIX):].strip()
+                continue
+            if line == FRAMES_END_MARKER:
+                found_end = True
+                for entry_id, frame in pending.items():
+                    _write_entry(dst, entry_id, frame)
+                pending = {}
+            dst.write(line)
+        if not found_end:
+            raise ValueError(f"{output_file} has no community frame markers")
+    
+    return retracted, asserted
+
+def exported_entry_ids(output_file: str) -> Set[str]:
+    """
+    Ids of the entries that have a frame in an exported community KB file.
+    
+    Args:
+        output_file: Path to a file written by export_to_prolog
         
-        f.write("% Find all indigenous practices by type\n")
-        f.write("indigenous_practices_by_type(Type, Practices) :-\n")
-        f.write("    findall(Practice, (\n")
-        f.write("        practice(name:Practice, type:Type, cultural_context:Ctx),\n")
-        f.write("        member(basotho, Ctx)\n")
-        f.write("    ), Practices).\n\n")
+    Returns:
+        The ids from the file's entry markers, as strings
+    """
+    with open(output_file, 'r', encoding='utf-8') as f:
+        return {line[len(ENTRY_BEGIN_PREFIX):].strip() for line in f if line.startswith(ENTRY_BEGIN_PREFIX)}
+
+def stale_entry_ids(output_file: str, verified_ids) -> Set[str]:
+    """
+    Ids of entries exported to ``output_file`` that are no longer verified.
+    
+    This covers rows deleted from the database, which no query can return, as
+    well as rows that lost their verification.
+    
+    Args:
+        output_file: Path to a file written by export_to_prolog
+        verified_ids: ids of every currently verified entry
         
-        f.write("% Integrated queries that combine conventional and indigenous knowledge\n")
-        f.write("all_practices_for_pest(Pest, AllPractices) :-\n")
-        f.write("    findall(practice(Name, conventional), (\n")
-        f.write("        practice(name:Name, controls:Controls, cultural_context:Ctx),\n")
-        f.write("        \\+ member(basotho, Ctx),\n")
-        f.write("        member(Pest, Controls)\n")
-        f.write("    ), ConventionalPractices),\n")
-        f.write("    findall(practice(Name, indigenous), (\n")
-        f.write("        practice(name:Name, controls:Controls, cultural_context:Ctx),\n")
-        f.write("        member(basotho, Ctx),\n")
-        f.write("        member(Pest, Controls)\n")
-        f.write("    ), IndigenousPractices),\n")
-        f.write("    append(ConventionalPractices, IndigenousPractices, AllPractices).\n")
-    
-    print(f"Exported community knowledge to {output_file}")
+    Returns:
+        The stale ids, as strings
+    """
+    return exported_entry_ids(output_file) - {str(entry_id) for entry_id in verified_ids}
 
 def get_verified_knowledge_from_database():
     """
@@ -131,15 +304,56 @@ def get_verified_knowledge_from_database():
     # Import the models here to avoid circular imports
     from .models import IndigenousKnowledge
     
-    # Get all verified knowledge entries
-    return IndigenousKnowledge.objects.filter(verification_status='verified')
+    # Get all verified knowledge entries, with their keeper fetched in the same query
+    return IndigenousKnowledge.objects.filter(verification_status='verified').select_related('keeper')
 
-def export_validated_knowledge_to_prolog(output_file: Optional[str] = None) -> str:
+def mark_entries_exported(queryset, exported_at) -> int:
+    """
+    Mark a queryset of entries as exported with single UPDATE statements.
+    
+    Equivalent to calling IndigenousKnowledge.mark_as_exported() on each entry.
+    
+    Returns:
+        Number of entries marked
+    """
+    from django.db.models import Q, Value
+    from django.db.models.functions import Lower, Replace
+    
+    queryset.filter(Q(prolog_name__isnull=True) | Q(prolog_name='')).update(
+        prolog_name=Replace(Lower('title'), Value(' '), Value('_'))
+    )
+    return queryset.update(is_exported=True, last_exported=exported_at)
+
+def get_changed_knowledge_from_database():
+    """
+    Get the entries an incremental export has to touch.
+    
+    Returns:
+        (changed, withdrawn): verified entries never exported or modified since their
+        last export, and previously exported entries that are no longer verified.
+        Deleted entries are not in the database; see stale_entry_ids
+    """
+    from django.db.models import F, Q
+    from .models import IndigenousKnowledge
+    
+    changed = IndigenousKnowledge.objects.filter(verification_status='verified').filter(
+        Q(last_exported__isnull=True) | Q(date_modified__gt=F('last_exported'))
+    ).select_related('keeper')
+    withdrawn = IndigenousKnowledge.objects.filter(is_exported=True).exclude(verification_status='verified')
+    return changed, withdrawn
+
+def export_validated_knowledge_to_prolog(output_file: Optional[str] = None, incremental: bool = True) -> str:
     """
     Export validated indigenous knowledge to a Prolog file.
     
+    When the file already exists, only entries that changed since their last export are
+    written (see splice_community_frames) and the same change set is applied to the
+    running Prolog engine with retract/assert. Otherwise the whole file is regenerated
+    and the engine reloads it.
+    
     Args:
         output_file: Optional path to the output file. If not provided, a default path is used.
+        incremental: Set to False to always regenerate the whole file
         
     Returns:
         Path to the generated Prolog file
@@ -152,23 +366,57 @@ def export_validated_knowledge_to_prolog(output_file: Optional[str] = None) -> s
         os.makedirs(prolog_dir, exist_ok=True)
         output_file = str(prolog_dir / 'community_kb.pl')
     
-    # Get verified knowledge from the database
-    knowledge_entries = get_verified_knowledge_from_database()
+    from django.utils import timezone
+    from prolog_integration.connector import apply_kb_updates, request_kb_reload
+    from .models import IndigenousKnowledge
     
-    # Export to Prolog
-    export_to_prolog(knowledge_entries, output_file)
+    # Taken before any entry is read: entries edited after this point keep
+    # date_modified > last_exported and are picked up by the next export
+    export_started = timezone.now()
+    spliced = False
+    if incremental and os.path.exists(output_file):
+        changed, withdrawn = get_changed_knowledge_from_database()
+        changed = list(changed)
+        # Withdrawn entries, plus entries deleted since they were exported: their
+        # frames are still in the file but their rows are gone
+        verified_ids = IndigenousKnowledge.objects.filter(
+            verification_status='verified').values_list('id', flat=True)
+        withdrawn_ids = stale_entry_ids(output_file, verified_ids) | {
+            str(entry_id) for entry_id in withdrawn.values_list('id', flat=True)}
+        if not changed and not withdrawn_ids:
+            return output_file
+        try:
+            retracted, asserted = splice_community_frames(output_file, changed, withdrawn_ids)
+            spliced = True
+        except ValueError as e:
+            # File from an older exporter without entry markers: regenerate it
+            print(f"Falling back to a full export: {e}")
     
-    # Update the last export timestamp
-    from django.utils import timezone
+    if spliced:
+        withdrawn.update(is_exported=False)
+        # Mark the exported change set in bulk, like the full export below
+        exported = IndigenousKnowledge.objects.filter(pk__in=[entry.pk for entry in changed])
+        mark_entries_exported(exported.filter(date_modified__lte=export_started), export_started)
+    else:
+        # Get verified knowledge from the database
+        knowledge_entries = get_verified_knowledge_from_database()
+        
+        # Export to Prolog
+        export_to_prolog(knowledge_entries, output_file)
+        
+        # Mark all exported entries in bulk
+        mark_entries_exported(knowledge_entries.filter(date_modified__lte=export_started), export_started)
     
     # Store the export timestamp in a file
     timestamp_file = os.path.join(os.path.dirname(output_file), 'last_export.txt')
     with open(timestamp_file, 'w') as f:
-        f.write(timezone.now().isoformat())
+        f.write(export_started.isoformat())
     
-    # Mark all exported entries
-    for entry in knowledge_entries:
-        entry.mark_as_exported()
+    # Let a running connector pick up the new community frames without a restart
+    if spliced:
+        apply_kb_updates(retracted, asserted, source_file=output_file)
+    else:
+        request_kb_reload()
     
     return output_file
 
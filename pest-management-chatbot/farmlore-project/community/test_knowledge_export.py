@@ -0,0 +1,110 @@
+"""
+Tests for the streaming and incremental community knowledge export.
+
+Uses simple stand-ins for the Django models, like test_frame_exporter.py.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from community.knowledge_exporter import (
+    export_to_prolog, exported_entry_ids, splice_community_frames, stale_entry_ids,
+)
+from prolog_integration.frame_engine import FrameEngine, parse_fact
+
+KEEPER = SimpleNamespace(full_name='Ntate Thabo', village='Maseru')
+
+
+def make_entry(entry_id, title, pests):
+    return SimpleNamespace(
+        id=entry_id, title=title, practice_type='pest_control', pests=pests,
+        description='Traditional practice', materials=['Wood ash'], crops=['maize'],
+        keeper=KEEPER, verification_count=3,
+    )
+
+
+@pytest.fixture
+def kb_file(tmp_path):
+    path = tmp_path / 'community_kb.pl'
+    export_to_prolog([make_entry(1, 'Ash Barrier', ['cutworms']),
+                      make_entry(2, 'Aloe Spray', ['aphids'])], str(path))
+    return path
+
+
+def test_splice_replaces_drops_and_adds_frames(kb_file):
+    retracted, asserted = splice_community_frames(
+        str(kb_file),
+        [make_entry(1, 'Ash Barrier', ['cutworms', 'slugs']), make_entry(3, 'Marigold Border', ['nematodes'])],
+        removed_ids=[2],
+    )
+
+    assert sorted(parse_fact(frame).args[1][0].args[1] for frame in retracted) == ['aloe_spray', 'ash_barrier']
+    assert "cutworms" in retracted[0] and "slugs" not in retracted[0]
+    assert len(asserted) == 2
+    engine = FrameEngine.from_file(kb_file)
+    assert engine.get_names('practice') == ['ash_barrier', 'marigold_border']
+    controls = list(engine.query('practice(name:ash_barrier, X), member(controls:C, X)'))[0]['C']
+    assert controls == ['cutworms', 'slugs']
+    # Helper predicates stay after the frames
+    text = kb_file.read_text(encoding='utf-8')
+    assert text.index('marigold_border') < text.index('HELPER PREDICATES')
+
+
+def test_deleted_entry_is_dropped_on_reexport(kb_file):
+    assert exported_entry_ids(str(kb_file)) == {'1', '2'}
+    # Entry 2 was deleted from the database: only entry 1 is still verified
+    removed = stale_entry_ids(str(kb_file), verified_ids=[1])
+    assert removed == {'2'}
+
+    retracted, asserted = splice_community_frames(str(kb_file), [], removed)
+    assert [parse_fact(frame).args[1][0].args[1] for frame in retracted] == ['aloe_spray']
+    assert asserted == []
+    assert exported_entry_ids(str(kb_file)) == {'1'}
+    assert FrameEngine.from_file(kb_file).get_names('practice') == ['ash_barrier']
+    # Nothing is stale any more
+    assert stale_entry_ids(str(kb_file), verified_ids=[1]) == set()
+
+
+def test_splice_requires_markers(tmp_path):
+    path = tmp_path / 'community_kb.pl'
+    path.write_text("frame(practice, [name: old]).\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        splice_community_frames(str(path), [make_entry(1, 'Ash Barrier', [])], [])
+    assert path.read_text(encoding='utf-8') == "frame(practice, [name: old]).\n"
+    assert [p.name for p in tmp_path.iterdir()] == ['community_kb.pl']
+
+
+class FakeQuerySet(list):
+    """Records how the exporter consumes a queryset."""
+    def iterator(self, chunk_size):
+        self.chunk_size = chunk_size
+        return iter(self)
+
+
+def test_export_streams_in_chunks_and_escapes_text(tmp_path):
+    entry = make_entry(1, "Farmer's Ash", ['cut worms'])
+    entry.description = 'Mix ash with water\nthen sprinkle; don\'t use "wet" ash \\ coal'
+    entries = FakeQuerySet([entry, make_entry(2, 'Aloe Spray', ['aphids'])])
+    path = tmp_path / 'community_kb.pl'
+
+    assert export_to_prolog(entries, str(path), chunk_size=1) == 2
+    assert entries.chunk_size == 1
+
+    engine = FrameEngine.from_file(path)
+    assert engine.skipped_frames == 0
+    results = list(engine.query("practice(name:'farmer\\'s_ash', X)", normalize=False))
+    frame = {slot.args[0]: slot.args[1] for slot in results[0]['X']}
+    assert frame['description'] == entry.description
+    assert frame['controls'] == ['cut worms']
+    assert frame['source'] == 'Ntate Thabo from Maseru'
+
+
+def test_failed_export_leaves_previous_file(kb_file):
+    before = kb_file.read_text(encoding='utf-8')
+    broken = make_entry(3, 'Broken', [])
+    broken.keeper = None
+    with pytest.raises(AttributeError):
+        export_to_prolog([broken], str(kb_file))
+    assert kb_file.read_text(encoding='utf-8') == before
+    assert [p.name for p in kb_file.parent.iterdir()] == ['community_kb.pl']
+
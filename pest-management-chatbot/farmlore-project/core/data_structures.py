@@ -65,6 +65,90 @@ class EntityTrie:
         return results
 
 
+class AhoCorasickMatcher:
+    """
+    Aho-Corasick automaton for finding every entity mention in a single pass.
+
+    Patterns are added with ``add`` and compiled with ``build``; ``search`` then
+    scans the text once regardless of how many patterns are registered.
+    """
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Tuple[int, Any, str]]] = [[]]
+        self.pattern_count = 0
+        self._built = False
+
+    def add(self, pattern: str, entity_type: str, value: Any = None) -> None:
+        """Add a pattern that reports ``value`` (default: the pattern) as ``entity_type``."""
+        pattern = pattern.lower()
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[state][char] = next_state
+            state = next_state
+        output = (len(pattern), value if value is not None else pattern, entity_type)
+        if output not in self.outputs[state]:
+            self.outputs[state].append(output)
+            self.pattern_count += 1
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = []
+        for next_state in self.goto[0].values():
+            self.fail[next_state] = 0
+            queue.append(next_state)
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+        self._built = True
+
+    def search(self, text: str, whole_words: bool = True) -> List[Tuple[Any, str, int, int]]:
+        """
+        Find all pattern occurrences in the text.
+        Returns a list of tuples (entity_value, entity_type, start_pos, end_pos)
+        ordered by start position, longest match first.
+        """
+        if not self._built:
+            self.build()
+        text_lower = text.lower()
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        results = []
+        state = 0
+        for index, char in enumerate(text_lower):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value, entity_type in outputs[state]:
+                start = index - length + 1
+                end = index + 1
+                if whole_words and (
+                    (start > 0 and text_lower[start - 1].isalnum()) or
+                    (end < len(text_lower) and text_lower[end].isalnum())
+                ):
+                    continue
+                results.append((value, entity_type, start, end))
+        results.sort(key=lambda match: (match[2], -(match[3] - match[2])))
+        return results
+
+
 class LRUCache:
     """Thread-safe LRU Cache implementation."""
     def __init__(self, max_size: int = 100):
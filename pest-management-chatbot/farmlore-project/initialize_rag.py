@@ -43,23 +43,16 @@ def initialize_rag():
         logger.info("Initializing PrologToRAGConverter...")
         converter = PrologToRAGConverter(persist_directory=persist_dir)
         
-        # Check if vector store already exists
-        logger.info("Checking for existing vector store...")
-        vector_store = converter.load_vector_store()
-        
-        if vector_store:
-            logger.info("Existing vector store found and loaded successfully")
-            return True
-        
-        # Process the knowledge base and create vector store
-        logger.info("Creating new vector store from knowledge base...")
+        # Index the knowledge base; an existing store is updated incrementally,
+        # re-embedding only frames that were added or changed since the last run
+        logger.info("Indexing knowledge base into vector store...")
         vector_store = converter.process_all_knowledge_bases()
         
         if vector_store:
-            logger.info("Vector store created successfully")
+            logger.info("Vector store is up to date")
             return True
         else:
-            logger.error("Failed to create vector store")
+            logger.error("Failed to create or update vector store")
             return False
             
     except ImportError as e:
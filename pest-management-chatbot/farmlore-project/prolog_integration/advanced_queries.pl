@@ -14,6 +14,22 @@
 :- consult(control_methods).
 :- consult(organic_sprays).
 
+% ========================
+% TABLING
+% ========================
+% Multi-domain queries re-derive the same entity checks and per-pest/per-crop
+% lookups many times over. These predicates are tabled so each subgoal is
+% computed once per KB load. Only side-effect free predicates that either
+% return a single answer or are used as membership checks are tabled, so the
+% order and duplicates callers see are unchanged.
+% Set the flag farmlore_tabling to false before loading this file to run
+% untabled (used by benchmarks/prolog_tabling.py).
+:- if(\+ current_prolog_flag(farmlore_tabling, false)).
+:- table is_pest/1, is_disease/1, is_crop/1,
+         crop_pest_list/2, disease_controls/2,
+         pest_control_methods/2, pest_controls_in_category/3.
+:- endif.
+
 % ========================
 % 1. NATURAL LANGUAGE QUERY INTERFACE
 % ========================
@@ -159,7 +175,7 @@ is_season(Season) :-
 
 % Execute query based on identified intent
 execute_query(pest_control(Pest), Response) :-
-    findall(Method, effective_against(Method, Pest), Methods),
+    pest_control_methods(Pest, Methods),
     format_response('Control methods for ~w:', [Pest], Intro),
     format_list(Methods, MethodList),
     string_concat(Intro, MethodList, Response).
@@ -375,16 +391,10 @@ seasonal_control_plan(Season, Pest, [
 % Integrated approach combining multiple control strategies
 integrated_approach(Pest, Crop, Season, Approach) :-
     % Get physical controls
-    findall(PhysMethod, 
-           (effective_against(PhysMethod, Pest), 
-            belongs_to(PhysMethod, physical_control)), 
-           PhysMethods),
+    pest_controls_in_category(Pest, physical_control, PhysMethods),
     
     % Get biological controls
-    findall(BioMethod, 
-           (effective_against(BioMethod, Pest), 
-            belongs_to(BioMethod, biological_control)), 
-           BioMethods),
+    pest_controls_in_category(Pest, biological_control, BioMethods),
     
     % Get organic sprays
     findall(SprayMethod, 
@@ -419,6 +429,17 @@ prioritize_methods(PhysMethods, BioMethods, SprayMethods, SeasonalPlan, CropSpec
     % Select only 1 spray method (least toxic)
     select_up_to_n(SprayMethods, 1, SpraySelected).
 
+% All control methods effective against a pest, in KB order
+pest_control_methods(Pest, Methods) :-
+    findall(Method, effective_against(Method, Pest), Methods).
+
+% Control methods effective against a pest that belong to a category
+pest_controls_in_category(Pest, Category, Methods) :-
+    findall(Method, 
+           (effective_against(Method, Pest), 
+            belongs_to(Method, Category)), 
+           Methods).
+
 % Helper to select unique elements
 select_unique(List, UniqueList) :-
     list_to_set(List, UniqueList).
@@ -8,6 +8,9 @@
 % This file is automatically generated from community contributions
 % Last updated: 2025-05-14 16:34:12
 
+:- dynamic(frame/2).
+:- discontiguous(frame/2).
+
 frame(practice, [
     name: ashh_application_for_pest_control,
     type: pest_control,
@@ -0,0 +1,29 @@
+"""
+Shared fixtures for the prolog_integration tests.
+"""
+import threading
+from collections import defaultdict
+
+import pytest
+
+from prolog_integration.connector import PrologConnector
+from prolog_integration.frame_engine import FrameEngine
+from prolog_integration.profiler import PredicateProfiler
+
+
+@pytest.fixture
+def make_connector():
+    """Build a standalone FrameEngine-backed connector, leaving the process-wide singleton alone."""
+    def factory(kb_file):
+        instance = object.__new__(PrologConnector)
+        instance.kb_version = 1
+        instance._version_lock = threading.Lock()
+        instance._reload_lock = threading.Lock()
+        instance._limit_lock = threading.Lock()
+        instance.limit_stats = defaultdict(lambda: {'time': 0, 'inferences': 0})
+        instance.profiler = PredicateProfiler()
+        instance.backend = 'frames'
+        instance.kb_path = kb_file
+        instance.prolog = FrameEngine.from_file(kb_file)
+        return instance
+    return factory
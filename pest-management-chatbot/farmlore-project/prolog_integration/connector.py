@@ -10,11 +10,25 @@ if 'SWI_HOME_DIR' not in os.environ:
     else:
         print(f"[PrologConnector] SWI_HOME_DIR not set and default '{potential_swi_home}' not found or invalid.")
 
-# Now import Prolog
-from pyswip import Prolog
+# Now import Prolog. SWI-Prolog is optional: without it the connector uses the
+# pure-Python FrameEngine, which answers the frame lookups PrologService needs.
+try:
+    from pyswip import Prolog
+except ImportError:
+    Prolog = None
 from pathlib import Path
+from collections import defaultdict
+import hashlib
+import threading
+import time
 import logging # Added for more detailed logging
 
+from .frame_engine import (
+    FrameEngine, QueryBudget, QueryLimitExceeded, default_kb_path, parse_fact, predicate_signature,
+)
+from .profiler import PredicateProfiler
+from .terms import bindings_dict, convert_bindings, quote_string, to_python
+
 # Configure logging for the connector
 connector_logger = logging.getLogger(__name__)
 # Set a default handler if no handlers are configured
@@ -25,14 +39,57 @@ if not connector_logger.hasHandlers():
     connector_logger.addHandler(handler)
     connector_logger.setLevel(logging.INFO)
 
+# Default per-query limits; a query that hits one returns the solutions found so far
+DEFAULT_TIME_LIMIT = float(os.environ.get('PROLOG_QUERY_TIME_LIMIT', '5'))
+DEFAULT_INFERENCE_LIMIT = int(os.environ.get('PROLOG_QUERY_INFERENCE_LIMIT', '1000000'))
+
+# Files consulted, in order, by the pyswip backend. The frame adapters define the
+# pest/2, practice/2, crop/2, pest_solutions/3, recommend_solution/2 and
+# pest_solution_frames/5 goals the connector queries over the frames in the KB.
+PYSWIP_KB_FILES = ('knowledgebase.pl', 'frame_adapters.pl')
+
+
+class QueryResults(list):
+    """Solutions of a bounded query. ``truncated`` is set when a limit cut the query short,
+    and ``limit`` says which one ('time' or 'inferences'). ``inferences`` is only
+    filled in when it was counted (FrameEngine backend, or profiling enabled)."""
+
+    def __init__(self, results=(), limit=None):
+        super().__init__(results)
+        self.limit = limit
+        self.inferences = 0
+
+    @property
+    def truncated(self):
+        return self.limit is not None
+
+
 class PrologConnector:
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(PrologConnector, cls).__new__(cls)
+            # Bumped whenever the loaded KB changes so dependent caches can invalidate
+            cls._instance.kb_version = 1
+            cls._instance._version_lock = threading.Lock()
+            cls._instance._reload_lock = threading.Lock()
+            cls._instance.kb_watcher = None
+            cls._instance._limit_lock = threading.Lock()
+            cls._instance.limit_stats = defaultdict(lambda: {'time': 0, 'inferences': 0})
+            # PROLOG_PROFILE=1 records per-predicate cost from startup
+            cls._instance.profiler = PredicateProfiler(
+                enabled=os.environ.get('PROLOG_PROFILE', '').lower() in ('1', 'true', 'yes')
+            )
+            # PROLOG_BACKEND: 'pyswip', 'frames', or 'auto' (pyswip when installed)
+            backend = os.environ.get('PROLOG_BACKEND', 'auto').lower()
+            if backend == 'frames' or (backend == 'auto' and Prolog is None):
+                cls._instance._init_frame_engine()
+                cls._instance._maybe_start_kb_watcher()
+                return cls._instance
             try:
                 connector_logger.info("Initializing Prolog instance in PrologConnector...")
+                cls._instance.backend = 'pyswip'
                 cls._instance.prolog = Prolog()
                 connector_logger.info("Prolog instance created successfully.")
                 
@@ -44,40 +101,296 @@ class PrologConnector:
                 except Exception as e_cwd:
                     connector_logger.error(f"[PrologConnector] Error getting CWD: {e_cwd}")
 
-                script_dir = Path(os.path.dirname(__file__))
-                kb_path_obj = script_dir / 'knowledgebase.pl'
-                
-                connector_logger.info(f"[PrologConnector] Resolved script directory: {script_dir}")
-                connector_logger.info(f"[PrologConnector] Attempting to load KB from path object: {kb_path_obj}")
-                connector_logger.info(f"[PrologConnector] Does KB file exist at path object? {kb_path_obj.exists()}")
-                
-                prolog_path_atom = kb_path_obj.as_posix() 
-                
-                query_string = f"consult('{prolog_path_atom}')"
-                connector_logger.info(f"[PrologConnector] Executing consult query: {query_string}")
-                
-                # Perform the consult
-                consult_result = list(cls._instance.prolog.query(query_string))
-                connector_logger.info(f"[PrologConnector] Consult query result: {consult_result}")
-                # Typically, a successful consult returns an empty list or a list with an empty dict for pyswip.
-                # A failure might raise an exception or return specific error structures.
-                # Check if the consult was successful (pyswip often raises exception on failure)
-                connector_logger.info(f"[PrologConnector] Knowledge base '{prolog_path_atom}' loaded (or consult attempted).")
+                cls._instance._consult_pyswip_kb()
 
             except Exception as e:
                 connector_logger.error(f"[PrologConnector] CRITICAL ERROR during PrologConnector initialization or KB consult: {e}", exc_info=True)
                 # Optionally, re-raise or handle as appropriate. If Prolog cannot be initialized, the service is unusable.
                 raise # Re-raise the exception so it's clear initialization failed.
+            cls._instance._maybe_start_kb_watcher()
         return cls._instance
+
+    def _consult_pyswip_kb(self):
+        """Consult PYSWIP_KB_FILES into the SWI-Prolog engine."""
+        script_dir = Path(os.path.dirname(__file__))
+        connector_logger.info(f"[PrologConnector] Resolved script directory: {script_dir}")
+        
+        for kb_file in PYSWIP_KB_FILES:
+            kb_path_obj = script_dir / kb_file
+            connector_logger.info(f"[PrologConnector] Attempting to load KB from path object: {kb_path_obj}")
+            connector_logger.info(f"[PrologConnector] Does KB file exist at path object? {kb_path_obj.exists()}")
+            
+            prolog_path_atom = kb_path_obj.as_posix() 
+            
+            query_string = f"consult('{prolog_path_atom}')"
+            connector_logger.info(f"[PrologConnector] Executing consult query: {query_string}")
+            
+            # Perform the consult
+            consult_result = list(self.prolog.query(query_string))
+            connector_logger.info(f"[PrologConnector] Consult query result: {consult_result}")
+            # Typically, a successful consult returns an empty list or a list with an empty dict for pyswip.
+            # A failure might raise an exception or return specific error structures.
+            # Check if the consult was successful (pyswip often raises exception on failure)
+            connector_logger.info(f"[PrologConnector] Knowledge base '{prolog_path_atom}' loaded (or consult attempted).")
+
+    def _init_frame_engine(self):
+        """Load the KB into the pure-Python FrameEngine instead of SWI-Prolog."""
+        kb_path = default_kb_path()
+        connector_logger.info(f"[PrologConnector] Using pure-Python FrameEngine backend with KB: {kb_path}")
+        self.backend = 'frames'
+        self.kb_path = kb_path
+        self.prolog = FrameEngine.from_file(kb_path)
+    
+    def _maybe_start_kb_watcher(self):
+        """Start polling the KB files for changes if PROLOG_KB_WATCH_INTERVAL (seconds) is > 0"""
+        interval = float(os.environ.get('PROLOG_KB_WATCH_INTERVAL', '0'))
+        if interval > 0:
+            from .kb_watcher import KBWatcher
+            self.kb_watcher = KBWatcher(self, interval=interval)
+            self.kb_watcher.start()
+
+    def reload_kb(self, background=False):
+        """
+        Reload the knowledge base from disk.
+        
+        With the FrameEngine backend a new engine is built and validated while the
+        current one keeps serving queries, then swapped in with a single reference
+        assignment; queries already running finish on the old engine. The KB version
+        is only bumped when the content actually changed, so caches keyed on it stay
+        warm across no-op reloads. With pyswip the running engine is updated in place
+        via make/0, and tabled answers computed from the old KB are discarded.
+        
+        Args:
+            background: Run the reload in a daemon thread and return the thread
+            
+        Returns:
+            bool: True if a new KB was loaded (or the thread, when background=True)
+        """
+        if background:
+            thread = threading.Thread(target=self.reload_kb, name='prolog-kb-reload', daemon=True)
+            thread.start()
+            return thread
+        
+        with self._reload_lock:
+            if self.backend != 'frames':
+                try:
+                    list(self.prolog.query("make, abolish_all_tables"))
+                except Exception as e:
+                    connector_logger.error(f"[PrologConnector] KB reload via make/0 failed: {e}")
+                    return False
+                self.bump_kb_version()
+                return True
+            
+            current = self.prolog
+            try:
+                candidate = FrameEngine.from_file(self.kb_path)
+                self._validate_engine(candidate)
+            except Exception as e:
+                connector_logger.error(f"[PrologConnector] KB reload rejected, keeping current KB: {e}")
+                return False
+            
+            if candidate.fingerprint == current.fingerprint:
+                connector_logger.info("[PrologConnector] KB reload found no content changes")
+                return False
+            
+            self.prolog = candidate
+            self.bump_kb_version()
+            connector_logger.info(
+                f"[PrologConnector] Swapped in reloaded KB: {candidate.frame_count} frames "
+                f"(was {current.frame_count})"
+            )
+            return True
+
+    def apply_frame_updates(self, removed, added_facts, source_file=None):
+        """
+        Apply a change set to the running KB without reloading it.
+        
+        Args:
+            removed: frame/2 facts as Prolog text, each retracted once; other frames
+                with the same name (e.g. core KB frames) are left alone
+            added_facts: frame/2 facts as Prolog text, asserted after the retractions
+            source_file: File the change set was also written to; its digest is refreshed
+                so a later reload of the unchanged file is a no-op
+            
+        Returns:
+            bool: True if the update was applied (falls back to a full reload otherwise)
+        """
+        removed = [fact.strip().rstrip('.') for fact in removed]
+        added_facts = [fact.strip().rstrip('.') for fact in added_facts]
+        if not removed and not added_facts:
+            return True
+        
+        with self._reload_lock:
+            try:
+                if self.backend == 'frames':
+                    self._apply_frame_updates_to_engine(removed, added_facts, source_file)
+                else:
+                    # frame/2 is declared dynamic in the KB headers; retract/1 removes
+                    # one clause equal to the old frame and fails (no error) if it is gone
+                    for fact in removed:
+                        list(self.prolog.query(f"ignore(retract(({fact})))"))
+                    for fact in added_facts:
+                        list(self.prolog.query(f"assertz(({fact}))"))
+                    list(self.prolog.query("abolish_all_tables"))
+            except Exception as e:
+                connector_logger.error(f"[PrologConnector] Incremental KB update failed, reloading instead: {e}")
+                applied = False
+            else:
+                applied = True
+                self.bump_kb_version()
+                connector_logger.info(
+                    f"[PrologConnector] Applied KB update: {len(removed)} retracted, {len(added_facts)} asserted"
+                )
+        if not applied:
+            self.reload_kb()
+        return applied
+    
+    def _apply_frame_updates_to_engine(self, removed, added_facts, source_file):
+        """Build the updated FrameEngine off to the side and swap it in atomically"""
+        removed = [parse_fact(fact) for fact in removed]
+        added = [parse_fact(fact) for fact in added_facts]
+        digests = {}
+        if source_file is not None:
+            resolved = str(Path(source_file).resolve())
+            if resolved in self.prolog.file_digests:
+                with open(resolved, 'rb') as f:
+                    digests[resolved] = hashlib.sha1(f.read()).hexdigest()
+        self.prolog = self.prolog.with_updates(removed, added, digests)
+
+    @staticmethod
+    def _validate_engine(engine):
+        """Raise if a freshly built engine is not fit to replace the running one"""
+        if not engine.source_files:
+            raise ValueError("no knowledge base files were loaded")
+        for frame_type in ('pest', 'practice', 'crop'):
+            if not engine.frames.get(frame_type):
+                raise ValueError(f"reloaded KB has no {frame_type} frames")
+        list(engine.query("recommend_solution(Pest, Solution)", maxresult=1))
+
+    def bump_kb_version(self):
+        """Mark the knowledge base as changed and return the new version."""
+        with self._version_lock:
+            self.kb_version += 1
+            connector_logger.info(f"[PrologConnector] Knowledge base version is now {self.kb_version}")
+            return self.kb_version
     
-    def query(self, query_string):
-        """Execute a Prolog query and return results"""
+    def query(self, query_string, time_limit=None, inference_limit=None):
+        """Execute a Prolog query and return results converted to Python values
+        (frame attribute lists become dicts, see terms.to_python).
+        
+        The query is bounded by a wall-clock limit (seconds) and an inference limit,
+        defaulting to PROLOG_QUERY_TIME_LIMIT and PROLOG_QUERY_INFERENCE_LIMIT. When a
+        limit is hit the solutions found so far are returned, flagged as truncated.
+        
+        Returns:
+            QueryResults: list of solution dicts with ``truncated``/``limit`` attributes
+        """
+        time_limit = DEFAULT_TIME_LIMIT if time_limit is None else time_limit
+        inference_limit = DEFAULT_INFERENCE_LIMIT if inference_limit is None else inference_limit
+        results = QueryResults()
+        profiling = self.profiler.enabled
+        start = time.perf_counter()
         try:
-            results = list(self.prolog.query(query_string))
-            return results
+            if self.backend == 'frames':
+                budget = QueryBudget(time_limit, inference_limit)
+                try:
+                    for solution in self.prolog.query(query_string, normalize=False, budget=budget):
+                        results.append(convert_bindings(solution))
+                finally:
+                    results.inferences = budget.inferences
+            else:
+                self._query_pyswip(query_string, time_limit, inference_limit, results, profiling)
+        except QueryLimitExceeded as e:
+            results.limit = e.limit
         except Exception as e:
             print(f"Prolog query error: {e}")
-            return []
+            return QueryResults()
+        if profiling:
+            self.profiler.record(predicate_signature(query_string), time.perf_counter() - start,
+                                 results.inferences, len(results), results.truncated)
+        if results.truncated:
+            self._record_limit(query_string, results)
+        return results
+    
+    def _query_pyswip(self, query_string, time_limit, inference_limit, results, count_inferences=False):
+        """Run a query through SWI-Prolog under call_with_inference_limit/3 and
+        call_with_time_limit/2.
+        
+        The inference limit bounds the work done for each solution. The wall-clock
+        limit covers the whole query, including a solution that never returns:
+        call_with_time_limit/2 runs its goal once, so the query is driven to
+        exhaustion inside it by a failure-driven loop that stores a copy of each
+        solution's bindings with nb_setarg/3, and time_limit_exceeded is caught
+        in Prolog so the solutions stored before it are kept. With
+        count_inferences the goal is bracketed by statistics/2 calls to measure
+        the inferences it used.
+        """
+        goal = query_string.strip().rstrip('.')
+        if inference_limit:
+            goal = f"call_with_inference_limit(({goal}), {inference_limit}, LimitResult__)"
+        if count_inferences:
+            goal = f"statistics(inferences, Inferences0__), {goal}, statistics(inferences, Inferences1__)"
+        if time_limit:
+            goal = (
+                f"term_string(Goal__, {quote_string(goal)}, [variable_names(Bindings__)]), "
+                f"Store__ = solutions([]), "
+                f"catch(call_with_time_limit({float(time_limit):.6e}, "
+                f"(call(Goal__), Store__ = solutions(Found__), nb_setarg(1, Store__, [Bindings__|Found__]), fail ; true)), "
+                f"time_limit_exceeded, TimeLimit__ = exceeded), "
+                f"Store__ = solutions(Solutions__)"
+            )
+        solutions = self.prolog.query(goal, normalize=False)
+        try:
+            for solution in solutions:
+                if time_limit:
+                    found = [bindings_dict(bindings) for bindings in reversed(solution['Solutions__'])]
+                    timed_out = to_python(solution.get('TimeLimit__')) == 'exceeded'
+                else:
+                    found, timed_out = [solution], False
+                for bindings in found:
+                    self._add_solution(bindings, inference_limit, results, count_inferences)
+                if timed_out:
+                    raise QueryLimitExceeded('time', f"Time limit of {time_limit}s exceeded")
+        finally:
+            # Close the open Prolog query so the engine is usable again
+            solutions.close()
+    
+    @staticmethod
+    def _add_solution(solution, inference_limit, results, count_inferences):
+        solution = convert_bindings(solution)
+        if count_inferences:
+            results.inferences = solution.pop('Inferences1__') - solution.pop('Inferences0__')
+        if solution.pop('LimitResult__', None) == 'inference_limit_exceeded':
+            raise QueryLimitExceeded('inferences', f"Inference limit of {inference_limit} exceeded")
+        results.append(solution)
+    
+    def _record_limit(self, query_string, results):
+        signature = predicate_signature(query_string)
+        with self._limit_lock:
+            self.limit_stats[signature][results.limit] += 1
+        connector_logger.warning(
+            f"[PrologConnector] Query hit its {results.limit} limit after {len(results)} "
+            f"solutions: {query_string}"
+        )
+    
+    def get_limit_stats(self):
+        """Number of queries cut short by each limit, keyed by predicate signature (name/arity)"""
+        with self._limit_lock:
+            return {signature: dict(counts) for signature, counts in self.limit_stats.items()}
+    
+    def enable_profiling(self, reset=True):
+        """Start recording per-predicate wall time, inferences and result counts"""
+        if reset:
+            self.profiler.reset()
+        self.profiler.enabled = True
+    
+    def disable_profiling(self):
+        """Stop recording; collected statistics are kept until the next reset"""
+        self.profiler.enabled = False
+    
+    def get_profile(self):
+        """Per-predicate profile rows, most expensive first (see profiler.PredicateProfiler)"""
+        return self.profiler.get_stats()
     
     def get_pest_solutions(self, pest, region="global"):
         """Get solutions for a specific pest in a region"""
@@ -87,6 +400,18 @@ class PrologConnector:
             return results[0]['Solutions']
         return []
     
+    def get_pest_solution_frames(self, pest, region="global"):
+        """Get a pest's attributes and the attributes of all its solutions in one query"""
+        query = f"pest_solution_frames({pest}, {region}, PestAttributes, Solutions, SolutionFrames)"
+        results = self.query(query)
+        if results and 'Solutions' in results[0]:
+            return {
+                'pest': results[0]['PestAttributes'],
+                'solutions': results[0]['Solutions'],
+                'solution_frames': results[0]['SolutionFrames']
+            }
+        return None
+    
     def recommend_solution(self, pest):
         """Get recommended solution for a pest based on IPM priority"""
         query = f"recommend_solution({pest}, Solution)"
@@ -115,10 +440,43 @@ class PrologConnector:
         results = self.query(query)
         return [result['Name'] for result in results]
     
+    def get_all_crops(self):
+        """Get a list of all crops in the knowledge base"""
+        query = "crop(name:Name, _)"
+        results = self.query(query)
+        return [result['Name'] for result in results]
+    
     def get_practice_details(self, practice_name):
         """Get details about a specific practice"""
         query = f"practice(name:{practice_name}, X)"
         results = self.query(query)
         if results:
             return results[0]['X']
-        return {}
\ No newline at end of file
+        return {}
+
+
+def request_kb_reload():
+    """
+    Ask the running connector (if this process has one) to reload the KB in the background.
+    
+    Returns:
+        bool: True if a reload was started
+    """
+    connector = PrologConnector._instance
+    if connector is None or not hasattr(connector, 'prolog'):
+        return False
+    connector.reload_kb(background=True)
+    return True
+
+
+def apply_kb_updates(removed, added_facts, source_file=None):
+    """
+    Apply a frame change set to the running connector (if this process has one).
+    
+    Returns:
+        bool: True if the change set was applied in place
+    """
+    connector = PrologConnector._instance
+    if connector is None or not hasattr(connector, 'prolog'):
+        return False
+    return connector.apply_frame_updates(removed, added_facts, source_file)
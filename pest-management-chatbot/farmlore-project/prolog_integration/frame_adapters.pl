@@ -38,4 +38,16 @@ pest_solutions(Pest, Region, Solutions) :-
 % Simple implementation that returns the first solution from pest_solutions
 recommend_solution(Pest, Solution) :-
     pest_solutions(Pest, global, Solutions),
-    Solutions = [Solution|_]. 
\ No newline at end of file
+    Solutions = [Solution|_]. 
+
+% Adapter for bulk solution retrieval
+% Returns a pest's attributes, its solutions and the attribute list of every
+% solution practice ([] when a solution has no practice frame) in one query,
+% so callers don't need a separate practice/2 query per solution
+pest_solution_frames(Pest, Region, PestAttributes, Solutions, SolutionFrames) :-
+    pest_solutions(Pest, Region, Solutions), !,
+    pest(name:Pest, PestAttributes), !,
+    findall(Attributes,
+            (member(Solution, Solutions),
+             (practice(name:Solution, Attributes) -> true ; Attributes = [])),
+            SolutionFrames).
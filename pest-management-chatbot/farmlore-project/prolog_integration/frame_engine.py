@@ -0,0 +1,654 @@
+"""
+Pure-Python frame engine for the FarmLore knowledge base.
+
+Reads the ``frame(Type, [slot:value, ...])`` facts from the Prolog files in this
+directory into hash-indexed structures and answers the goals PrologService
+relies on (pest/2, practice/2, crop/2, frame/2, pest_solutions/3,
+recommend_solution/2, pest_solution_frames/5 and member/2 in conjunctions). It exposes the same
+``query()`` interface as ``pyswip.Prolog`` so PrologConnector can use it when
+SWI-Prolog is not available.
+
+The engine is read-only once loaded, so a single instance can be shared by
+any number of threads.
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FrameEngineError(Exception):
+    """Raised when a file or goal cannot be parsed or solved by the frame engine."""
+
+
+class QueryLimitExceeded(FrameEngineError):
+    """Raised when a query runs past its wall-clock or inference budget.
+
+    ``limit`` is ``'time'`` or ``'inferences'``, mirroring SWI-Prolog's
+    ``time_limit_exceeded`` and ``inference_limit_exceeded``.
+    """
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+class QueryBudget:
+    """Per-query wall-clock and inference budget; one predicate call counts as one inference."""
+
+    def __init__(self, time_limit: Optional[float] = None, inference_limit: Optional[int] = None):
+        self.deadline = time.monotonic() + time_limit if time_limit else None
+        self.inference_limit = inference_limit
+        self.inferences = 0
+
+    def tick(self) -> None:
+        self.inferences += 1
+        if self.inference_limit and self.inferences > self.inference_limit:
+            raise QueryLimitExceeded('inferences', f"Inference limit of {self.inference_limit} exceeded")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise QueryLimitExceeded('time', "Time limit exceeded")
+
+
+class Var(NamedTuple):
+    """A logic variable appearing in a goal."""
+    name: str
+
+
+class Term(NamedTuple):
+    """A compound Prolog term such as ``name:aphid`` or ``cv('Bell Boy', [...])``."""
+    functor: str
+    args: tuple
+
+
+# ========================
+# TOKENIZER
+# ========================
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>%[^\n]*|/\*.*?\*/)
+  | (?P<number>\d+\.\d+(?:[eE][+-]?\d+)?|\d+)
+  | (?P<var>[A-Z_][A-Za-z0-9_]*)
+  | (?P<atom>[a-z][A-Za-z0-9_]*)
+  | (?P<qatom>'(?:[^'\\\n]|\\.|'')*')
+  | (?P<string>"(?:[^"\\\n]|\\.|"")*")
+  | (?P<punct>[()\[\],|])
+  | (?P<solo>[!;])
+  | (?P<symbol>[+\-*/\\^<>=~:.?@\#&$]+)
+""", re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', "'": "'", '"': '"', '`': '`'}
+
+
+def _unquote(text: str) -> str:
+    """Strip the quotes from a quoted atom or string and resolve escapes."""
+    quote = text[0]
+    body = text[1:-1].replace(quote * 2, quote)
+    return re.sub(r'\\(.)', lambda m: _ESCAPES.get(m.group(1), m.group(1)), body)
+
+
+def tokenize(text: str) -> List[Tuple[str, Any]]:
+    """Split Prolog source into ``(kind, value)`` tokens, ending clauses with ``('end', '.')``.
+
+    Like SWI-Prolog, quoted atoms may not span lines. Characters that cannot
+    start a token (e.g. the stray quote in ``'a pest's life'``) become
+    ``('error', char)`` tokens so the enclosing clause is rejected while the
+    rest of the file still loads.
+    """
+    tokens = []
+    pos = 0
+    length = len(text)
+    while pos < length:
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            tokens.append(('error', text[pos]))
+            pos += 1
+            continue
+        kind = match.lastgroup
+        value = match.group(kind)
+        pos = match.end()
+        if kind in ('ws', 'comment'):
+            continue
+        if kind == 'number':
+            tokens.append(('number', float(value) if '.' in value else int(value)))
+        elif kind == 'qatom':
+            tokens.append(('atom', _unquote(value)))
+        elif kind == 'string':
+            tokens.append(('string', _unquote(value)))
+        elif kind == 'symbol' and value == '.' and (pos >= length or text[pos].isspace() or text[pos] == '%'):
+            tokens.append(('end', '.'))
+        elif kind == 'symbol' and value.endswith('.') and (pos >= length or text[pos].isspace()):
+            # A symbol atom immediately followed by the clause terminator, e.g. "X = -."
+            tokens.append(('atom', value[:-1]))
+            tokens.append(('end', '.'))
+        elif kind in ('symbol', 'solo'):
+            tokens.append(('atom', value))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+# ========================
+# PARSER
+# ========================
+
+# Infix operators that appear inside frame values, with their standard priorities.
+INFIX_OPERATORS = {
+    ':': (200, 'xfy'),
+    '*': (400, 'yfx'),
+    '/': (400, 'yfx'),
+    '+': (500, 'yfx'),
+    '-': (500, 'yfx'),
+}
+
+
+class _Parser:
+    """Recursive-descent parser for the subset of Prolog used by frame facts and goals.
+
+    Supports atoms, numbers, strings, variables, lists, compound terms and the
+    infix operators in ``INFIX_OPERATORS``. Top-level conjunctions are parsed
+    into ``','`` terms.
+    """
+
+    def __init__(self, tokens: List[Tuple[str, Any]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Tuple[str, Any]:
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return ('eof', None)
+
+    def next(self) -> Tuple[str, Any]:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, kind: str, value: Any = None) -> None:
+        token = self.next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise FrameEngineError(f"Expected {value or kind}, got {token[1]!r}")
+
+    def parse_conjunction(self) -> Any:
+        term = self.parse_term()
+        if self.peek() == ('punct', ','):
+            self.next()
+            return Term(',', (term, self.parse_conjunction()))
+        return term
+
+    def parse_term(self, max_priority: int = 999) -> Any:
+        left = self.parse_primary()
+        left_priority = 0
+        while True:
+            kind, value = self.peek()
+            if kind != 'atom' or value not in INFIX_OPERATORS:
+                return left
+            priority, op_type = INFIX_OPERATORS[value]
+            left_max = priority if op_type == 'yfx' else priority - 1
+            if priority > max_priority or left_priority > left_max:
+                return left
+            self.next()
+            right_max = priority if op_type == 'xfy' else priority - 1
+            left = Term(value, (left, self.parse_term(right_max)))
+            left_priority = priority
+
+    def parse_primary(self) -> Any:
+        kind, value = self.next()
+        if kind in ('number', 'string'):
+            return value
+        if kind == 'var':
+            return Var(value)
+        if kind == 'atom':
+            if value == '-' and self.peek()[0] == 'number':
+                return -self.next()[1]
+            if self.peek() == ('punct', '('):
+                self.next()
+                args = [self.parse_term()]
+                while self.peek() == ('punct', ','):
+                    self.next()
+                    args.append(self.parse_term())
+                self.expect('punct', ')')
+                return Term(value, tuple(args))
+            return value
+        if (kind, value) == ('punct', '['):
+            items = []
+            if self.peek() != ('punct', ']'):
+                items.append(self.parse_term())
+                while self.peek() == ('punct', ','):
+                    self.next()
+                    items.append(self.parse_term())
+            self.expect('punct', ']')
+            return items
+        if (kind, value) == ('punct', '('):
+            term = self.parse_conjunction()
+            self.expect('punct', ')')
+            return term
+        raise FrameEngineError(f"Unexpected token {value!r}")
+
+
+def _split_clauses(tokens: List[Tuple[str, Any]]) -> Iterator[List[Tuple[str, Any]]]:
+    """Yield the token list of each clause (without its terminating full stop)."""
+    clause = []
+    for token in tokens:
+        if token[0] == 'end':
+            if clause:
+                yield clause
+            clause = []
+        else:
+            clause.append(token)
+    if clause:
+        yield clause
+
+
+@lru_cache(maxsize=1024)
+def parse_goal(goal: str) -> Any:
+    """Parse a goal string such as ``"pest(name:aphid_general, X)"`` into terms."""
+    tokens = tokenize(goal.strip().rstrip('.'))
+    parser = _Parser(tokens)
+    term = parser.parse_conjunction()
+    if parser.peek()[0] != 'eof':
+        raise FrameEngineError(f"Unsupported goal syntax near {parser.peek()[1]!r} in: {goal}")
+    return term
+
+
+def parse_fact(text: str) -> Term:
+    """Parse a single fact such as ``"frame(practice, [name: x])."`` into a ``Term``."""
+    parser = _Parser(tokenize(text.strip().rstrip('.')))
+    term = parser.parse_term()
+    if parser.peek()[0] != 'eof' or not isinstance(term, Term):
+        raise FrameEngineError(f"Not a single fact: {text[:80]!r}")
+    return term
+
+
+def predicate_signature(goal: str) -> str:
+    """Return ``name/arity`` of the first predicate called by ``goal``, for metrics."""
+    try:
+        term = parse_goal(goal)
+    except FrameEngineError:
+        return goal.split('(', 1)[0].strip() or goal
+    while isinstance(term, Term) and term.functor == ',' and len(term.args) == 2:
+        term = term.args[0]
+    if isinstance(term, Term):
+        return f"{term.functor}/{len(term.args)}"
+    return f"{format_term(term)}/0"
+
+
+# ========================
+# MATCHING
+# ========================
+
+def _resolve(term: Any, bindings: Dict[str, Any]) -> Any:
+    """Substitute bound variables in ``term``."""
+    if isinstance(term, Var):
+        return bindings.get(term.name, term)
+    if isinstance(term, Term):
+        return Term(term.functor, tuple(_resolve(arg, bindings) for arg in term.args))
+    if isinstance(term, list):
+        return [_resolve(item, bindings) for item in term]
+    return term
+
+
+def _match(pattern: Any, value: Any, bindings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Match a goal pattern against a ground KB value, returning extended bindings or None."""
+    if isinstance(pattern, Var):
+        if pattern.name == '_':
+            return bindings
+        if pattern.name in bindings:
+            return bindings if bindings[pattern.name] == value else None
+        extended = dict(bindings)
+        extended[pattern.name] = value
+        return extended
+    if isinstance(pattern, Term):
+        if not isinstance(value, Term) or pattern.functor != value.functor or len(pattern.args) != len(value.args):
+            return None
+        for sub_pattern, sub_value in zip(pattern.args, value.args):
+            bindings = _match(sub_pattern, sub_value, bindings)
+            if bindings is None:
+                return None
+        return bindings
+    if isinstance(pattern, list):
+        if not isinstance(value, list) or len(pattern) != len(value):
+            return None
+        for sub_pattern, sub_value in zip(pattern, value):
+            bindings = _match(sub_pattern, sub_value, bindings)
+            if bindings is None:
+                return None
+        return bindings
+    return bindings if pattern == value and type(pattern) is type(value) else None
+
+
+def format_term(value: Any) -> str:
+    """Render a KB value as Prolog text."""
+    if isinstance(value, Term):
+        if value.functor in INFIX_OPERATORS and len(value.args) == 2:
+            return f"{format_term(value.args[0])}{value.functor}{format_term(value.args[1])}"
+        return f"{value.functor}({', '.join(format_term(arg) for arg in value.args)})"
+    if isinstance(value, list):
+        return '[' + ', '.join(format_term(item) for item in value) + ']'
+    if isinstance(value, Var):
+        return value.name
+    return str(value)
+
+
+def _to_binding(value: Any) -> Any:
+    """Convert a KB value into the shape pyswip returns for a query binding.
+
+    Atoms, strings and numbers come back as Python scalars, lists as lists and
+    compound terms (``key:value`` pairs included) as their Prolog text.
+    """
+    if isinstance(value, list):
+        return [_to_binding(item) for item in value]
+    if isinstance(value, Term):
+        return format_term(value)
+    return value
+
+
+def _slot(slots: List[Any], key: str) -> Iterator[Any]:
+    """Yield every value stored under ``key`` in a frame's slot list."""
+    for slot in slots:
+        if isinstance(slot, Term) and slot.functor == ':' and len(slot.args) == 2 and slot.args[0] == key:
+            yield slot.args[1]
+
+
+# ========================
+# ENGINE
+# ========================
+
+class FrameEngine:
+    """Indexed, read-only store of KB frames with a pyswip-compatible ``query()``."""
+
+    def __init__(self):
+        self.frames: Dict[str, List[List[Any]]] = {}
+        self.name_index: Dict[str, Dict[str, List[int]]] = {}
+        self.source_files: List[str] = []
+        self.file_digests: Dict[str, str] = {}
+        self.skipped_frames = 0
+        self._predicates = {
+            ('frame', 2): self._solve_frame,
+            ('pest', 2): self._solve_adapter,
+            ('practice', 2): self._solve_adapter,
+            ('crop', 2): self._solve_adapter,
+            ('pest_solutions', 3): self._solve_pest_solutions,
+            ('recommend_solution', 2): self._solve_recommend_solution,
+            ('pest_solution_frames', 5): self._solve_pest_solution_frames,
+            ('member', 2): self._solve_member,
+        }
+
+    @classmethod
+    def from_file(cls, path) -> 'FrameEngine':
+        """Build an engine from a Prolog file, following its ``consult/1`` directives."""
+        engine = cls()
+        engine.load_file(path)
+        logger.info(
+            f"FrameEngine loaded {engine.frame_count} frames "
+            f"from {len(engine.source_files)} files"
+        )
+        return engine
+
+    def load_file(self, path) -> None:
+        """Load frame facts from ``path`` and any files it consults (each file once)."""
+        path = Path(path)
+        if path.suffix != '.pl' and not path.exists():
+            path = path.with_name(path.name + '.pl')
+        resolved = str(path.resolve())
+        if resolved in self.source_files:
+            return
+        if not path.exists():
+            logger.warning(f"FrameEngine: consulted file not found: {path}")
+            return
+        self.source_files.append(resolved)
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.file_digests[resolved] = hashlib.sha1(content).hexdigest()
+        tokens = tokenize(content.decode('utf-8'))
+
+        for clause in _split_clauses(tokens):
+            if clause[0] == ('atom', ':-'):
+                self._run_directive(clause[1:], path.parent)
+            elif clause[:2] == [('atom', 'frame'), ('punct', '(')] and ('atom', ':-') not in clause:
+                try:
+                    parser = _Parser(clause)
+                    fact = parser.parse_term()
+                    if parser.peek()[0] != 'eof':
+                        raise FrameEngineError(f"Trailing tokens after frame fact: {parser.peek()[1]!r}")
+                    self.add_frame(fact.args[0], fact.args[1])
+                except (FrameEngineError, IndexError, TypeError) as e:
+                    self.skipped_frames += 1
+                    logger.warning(f"FrameEngine: skipping unparsable frame in {path.name}: {e}")
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of every loaded source file; equal fingerprints mean identical KB content."""
+        digest = hashlib.sha1()
+        for path in self.source_files:
+            digest.update(f"{path}:{self.file_digests[path]}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    @property
+    def frame_count(self) -> int:
+        return sum(len(frames) for frames in self.frames.values())
+
+    def _run_directive(self, tokens: List[Tuple[str, Any]], base_dir: Path) -> None:
+        """Honour ``:- consult(File).`` directives; every other directive is ignored."""
+        try:
+            directive = _Parser(tokens).parse_term()
+        except FrameEngineError:
+            return
+        if isinstance(directive, Term) and directive.functor == 'consult' and len(directive.args) == 1:
+            targets = directive.args[0] if isinstance(directive.args[0], list) else [directive.args[0]]
+            for target in targets:
+                if isinstance(target, str):
+                    self.load_file(base_dir / target)
+
+    def add_frame(self, frame_type: str, slots: List[Any]) -> None:
+        """Add a single frame and index it by name."""
+        if not isinstance(frame_type, str) or not isinstance(slots, list):
+            raise FrameEngineError(f"Malformed frame of type {frame_type!r}")
+        type_frames = self.frames.setdefault(frame_type, [])
+        type_frames.append(slots)
+        for name in _slot(slots, 'name'):
+            self.name_index.setdefault(frame_type, {}).setdefault(name, []).append(len(type_frames) - 1)
+
+    def with_updates(self, removed: Iterable[Term], added: Iterable[Term],
+                     file_digests: Optional[Dict[str, str]] = None) -> 'FrameEngine':
+        """Return a new engine with the ``removed`` frame/2 facts retracted and ``added`` ones added.
+
+        Each removed fact retracts one frame equal to it, as retract/1 would, so
+        other frames sharing its name are kept. The current engine is left
+        untouched, so queries running against it are unaffected; only the frame
+        types that change are copied.
+        """
+        engine = FrameEngine()
+        engine.frames = dict(self.frames)
+        engine.name_index = dict(self.name_index)
+        engine.source_files = list(self.source_files)
+        engine.file_digests = dict(self.file_digests, **(file_digests or {}))
+        engine.skipped_frames = self.skipped_frames
+
+        removed_frames: Dict[str, list] = {}
+        removed = list(removed)
+        added = list(added)
+        for fact in removed + added:
+            if fact.functor != 'frame' or len(fact.args) != 2:
+                raise FrameEngineError(f"Not a frame/2 fact: {format_term(fact)}")
+        for fact in removed:
+            removed_frames.setdefault(fact.args[0], []).append(fact.args[1])
+        for fact in added:
+            removed_frames.setdefault(fact.args[0], [])
+
+        for frame_type, removed_slots in removed_frames.items():
+            kept = list(self.frames.get(frame_type, []))
+            for slots in removed_slots:
+                if slots in kept:
+                    kept.remove(slots)
+            engine.frames[frame_type] = []
+            engine.name_index[frame_type] = {}
+            for slots in kept:
+                engine.add_frame(frame_type, slots)
+        for fact in added:
+            engine.add_frame(fact.args[0], fact.args[1])
+        return engine
+
+    def find_frames(self, frame_type: str, name: Any = None) -> Iterator[List[Any]]:
+        """Yield frames of ``frame_type``, restricted to ``name`` when it is ground."""
+        type_frames = self.frames.get(frame_type, [])
+        if name is None or isinstance(name, Var):
+            yield from type_frames
+            return
+        for position in self.name_index.get(frame_type, {}).get(name, []):
+            yield type_frames[position]
+
+    def get_names(self, frame_type: str) -> List[str]:
+        """Return the distinct frame names of ``frame_type`` in load order."""
+        return list(self.name_index.get(frame_type, {}).keys())
+
+    # ------------------------
+    # Goal solving
+    # ------------------------
+
+    def query(self, goal: str, maxresult: int = -1, normalize: bool = True,
+              budget: Optional[QueryBudget] = None) -> Iterator[Dict[str, Any]]:
+        """Solve ``goal`` and yield one binding dict per solution, like ``pyswip.Prolog.query``.
+
+        With ``normalize=False`` bindings are returned as raw ``Term``/list values.
+        With a ``budget`` the query raises ``QueryLimitExceeded`` once it runs out;
+        solutions yielded before that remain valid.
+        """
+        term = parse_goal(goal)
+        variables = []
+        self._collect_vars(term, variables)
+        convert = _to_binding if normalize else (lambda value: value)
+        count = 0
+        for bindings in self._solve(term, {}, budget):
+            yield {name: convert(bindings[name]) for name in variables if name in bindings}
+            count += 1
+            if maxresult != -1 and count >= maxresult:
+                return
+
+    def _collect_vars(self, term: Any, variables: List[str]) -> None:
+        if isinstance(term, Var):
+            if term.name != '_' and not term.name.startswith('_') and term.name not in variables:
+                variables.append(term.name)
+        elif isinstance(term, Term):
+            for arg in term.args:
+                self._collect_vars(arg, variables)
+        elif isinstance(term, list):
+            for item in term:
+                self._collect_vars(item, variables)
+
+    def _solve(self, goal: Any, bindings: Dict[str, Any],
+               budget: Optional[QueryBudget] = None) -> Iterator[Dict[str, Any]]:
+        if isinstance(goal, Term) and goal.functor == ',' and len(goal.args) == 2:
+            for first in self._solve(goal.args[0], bindings, budget):
+                yield from self._solve(goal.args[1], first, budget)
+            return
+        if budget is not None:
+            budget.tick()
+        if isinstance(goal, str):
+            goal = Term(goal, ())
+        if not isinstance(goal, Term):
+            raise FrameEngineError(f"Goal is not callable: {format_term(goal)}")
+        solver = self._predicates.get((goal.functor, len(goal.args)))
+        if solver is None:
+            raise FrameEngineError(f"Unknown procedure: {goal.functor}/{len(goal.args)}")
+        yield from solver(goal, bindings)
+
+    def _unify_args(self, patterns: tuple, values: tuple, bindings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for pattern, value in zip(patterns, values):
+            bindings = _match(pattern, value, bindings)
+            if bindings is None:
+                return None
+        return bindings
+
+    def _solve_frame(self, goal: Term, bindings: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        frame_type = _resolve(goal.args[0], bindings)
+        types = list(self.frames) if isinstance(frame_type, Var) else [frame_type]
+        for candidate_type in types:
+            for slots in self.frames.get(candidate_type, []):
+                result = self._unify_args(goal.args, (candidate_type, slots), bindings)
+                if result is not None:
+                    yield result
+
+    def _solve_adapter(self, goal: Term, bindings: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """``pest(name:Name, Attributes)`` and friends, as defined in frame_adapters.pl."""
+        key = _resolve(goal.args[0], bindings)
+        name = key.args[1] if isinstance(key, Term) and key.functor == ':' and len(key.args) == 2 else None
+        for slots in self.find_frames(goal.functor, name):
+            for frame_name in _slot(slots, 'name'):
+                result = self._unify_args(goal.args, (Term(':', ('name', frame_name)), slots), bindings)
+                if result is not None:
+                    yield result
+
+    def _pest_solutions(self, pest: Any, region: Any) -> Iterator[Tuple[Any, Any, List[Any]]]:
+        """Yield ``(pest, region, solutions)`` triples with pest_solutions/3 semantics."""
+        for slots in self.find_frames('pest', pest):
+            for frame_name in _slot(slots, 'name'):
+                if not isinstance(pest, Var) and frame_name != pest:
+                    continue
+                for solutions in _slot(slots, 'controls'):
+                    contexts = next(_slot(slots, 'cultural_context'), None)
+                    if not isinstance(contexts, list):
+                        yield frame_name, region, solutions
+                        continue
+                    for context in contexts:
+                        if isinstance(region, Var) or context == region:
+                            yield frame_name, context if isinstance(region, Var) else region, solutions
+                    for context in contexts:
+                        if context == 'global':
+                            yield frame_name, region, solutions
+
+    def _solve_pest_solutions(self, goal: Term, bindings: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        pest = _resolve(goal.args[0], bindings)
+        region = _resolve(goal.args[1], bindings)
+        for values in self._pest_solutions(pest, region):
+            result = self._unify_args(goal.args, values, bindings)
+            if result is not None:
+                yield result
+
+    def _solve_recommend_solution(self, goal: Term, bindings: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        pest = _resolve(goal.args[0], bindings)
+        for frame_name, _, solutions in self._pest_solutions(pest, 'global'):
+            if isinstance(solutions, list) and solutions:
+                result = self._unify_args(goal.args, (frame_name, solutions[0]), bindings)
+                if result is not None:
+                    yield result
+
+    def _solve_pest_solution_frames(self, goal: Term, bindings: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Bulk retrieval of a pest and its solution practice frames (see frame_adapters.pl)."""
+        pest = _resolve(goal.args[0], bindings)
+        region = _resolve(goal.args[1], bindings)
+        for frame_name, matched_region, solutions in self._pest_solutions(pest, region):
+            pest_slots = next(self.find_frames('pest', frame_name), None)
+            if pest_slots is None:
+                return
+            solution_frames = []
+            for solution in solutions if isinstance(solutions, list) else []:
+                practice = next(self.find_frames('practice', solution), None) if isinstance(solution, str) else None
+                solution_frames.append(practice if practice is not None else [])
+            result = self._unify_args(
+                goal.args, (frame_name, matched_region, pest_slots, solutions, solution_frames), bindings
+            )
+            if result is not None:
+                yield result
+            return
+
+    def _solve_member(self, goal: Term, bindings: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        items = _resolve(goal.args[1], bindings)
+        if not isinstance(items, list):
+            raise FrameEngineError("member/2 requires a bound list in the frame engine")
+        for item in items:
+            result = _match(goal.args[0], item, bindings)
+            if result is not None:
+                yield result
+
+
+def default_kb_path() -> Path:
+    """Path of the loader file that pulls in every FarmLore knowledge base."""
+    return Path(os.path.dirname(__file__)) / 'load_all.pl'
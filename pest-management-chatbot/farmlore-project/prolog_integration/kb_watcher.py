@@ -0,0 +1,58 @@
+"""
+Background watcher that hot-reloads the Prolog knowledge base.
+
+Polls the modification times of the ``*.pl`` files next to ``load_all.pl``
+and asks the connector to reload when any of them changes. The reload itself
+builds a fresh engine off to the side and swaps it in atomically, so queries
+keep being answered from the old KB until the new one is ready.
+
+Enabled by setting ``PROLOG_KB_WATCH_INTERVAL`` to a number of seconds.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class KBWatcher(threading.Thread):
+    """Daemon thread that triggers ``connector.reload_kb()`` when KB files change."""
+
+    def __init__(self, connector, interval: float = 5.0, kb_dir: Optional[Path] = None):
+        super().__init__(name='prolog-kb-watcher', daemon=True)
+        self.connector = connector
+        self.interval = interval
+        self.kb_dir = Path(kb_dir) if kb_dir else Path(__file__).resolve().parent
+        self._stop_event = threading.Event()
+        self._mtimes = self.snapshot()
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the current modification time of every KB file."""
+        mtimes = {}
+        for path in self.kb_dir.glob('*.pl'):
+            try:
+                mtimes[str(path)] = path.stat().st_mtime
+            except OSError:
+                continue
+        return mtimes
+
+    def check(self) -> bool:
+        """Reload the KB if any file was added, removed or modified since the last check."""
+        current = self.snapshot()
+        if current == self._mtimes:
+            return False
+        self._mtimes = current
+        logger.info(f"Knowledge base files changed in {self.kb_dir}; reloading")
+        self.connector.reload_kb()
+        return True
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Knowledge base reload failed: {e}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
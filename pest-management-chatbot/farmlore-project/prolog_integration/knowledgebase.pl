@@ -5,6 +5,12 @@
 % All // comments are replaced with % comments
 % All other syntax errors have been fixed
 
+% frame/2 is dynamic so community updates can be retracted/asserted in place
+% (see PrologConnector.apply_frame_updates), and spread over several files
+:- dynamic(frame/2).
+:- multifile(frame/2).
+:- discontiguous(frame/2).
+
 % ========================
 % FRAME STRUCTURE DEFINITION
 % ========================
@@ -3,6 +3,12 @@
 % ========================
 % This file loads all the Prolog knowledge bases for the pest management system
 
+% frame/2 is dynamic so community updates can be retracted/asserted in place,
+% and multifile because every knowledge base below adds frames to it
+:- dynamic(frame/2).
+:- multifile(frame/2).
+:- discontiguous(frame/2).
+
 % Load existing knowledge bases
 :- consult(knowledgebase).
 :- consult(insect_reference).
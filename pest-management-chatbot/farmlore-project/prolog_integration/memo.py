@@ -0,0 +1,114 @@
+"""
+Versioned memoization for knowledge-base lookups.
+
+Results are keyed by (method, args, KB version). When the knowledge base
+version reported by the connector changes, every cached entry is dropped, so
+callers never see answers computed against an older KB.
+"""
+import functools
+import inspect
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class VersionedMemo:
+    """Thread-safe, size-bounded LRU memo that is invalidated on KB version change."""
+
+    def __init__(self, version_source: Callable[[], Hashable], max_size: int = 1024):
+        self.version_source = version_source
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Hashable) -> None:
+        """Drop all entries if the KB version moved on. Caller holds the lock."""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"KB version changed ({self._version} -> {version}); dropping {len(self._entries)} memoized lookups")
+            self._entries.clear()
+            self._version = version
+
+    def get_or_compute(self, method: str, args: tuple, compute: Callable[[], Any]) -> Any:
+        """Return the memoized result for ``method(*args)``, computing it on a miss."""
+        with self._lock:
+            version = self.version_source()
+            key = (method, args, version)
+            self._check_version(version)
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Compute outside the lock so slow queries don't serialize other lookups
+        value = compute()
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Drop every memoized entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics about the memo."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+                "kb_version": self._version,
+            }
+
+
+def memoized_lookup(method: Callable) -> Callable:
+    """Memoize a PrologService lookup method through the instance's ``memo``.
+
+    Memoized results are shared between callers and must be treated as read-only.
+    The key is built from the arguments bound to the method's signature with
+    defaults applied, so ``get_pest_bundle('aphid')``,
+    ``get_pest_bundle('aphid', 'global')`` and ``get_pest_bundle('aphid',
+    region='global')`` share one entry.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            bound = signature.bind(self, *args, **kwargs)
+        except TypeError:
+            # Let the method raise its own error for a bad call
+            return method(self, *args, **kwargs)
+        bound.apply_defaults()
+        key_args = tuple(
+            tuple(sorted(value.items())) if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD else value
+            for name, value in list(bound.arguments.items())[1:]
+        )
+        try:
+            hash(key_args)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return self.memo.get_or_compute(method.__name__, key_args, lambda: method(self, *args, **kwargs))
+    return wrapper
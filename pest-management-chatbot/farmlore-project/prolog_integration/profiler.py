@@ -0,0 +1,81 @@
+"""
+Predicate-level profiling for PrologConnector.
+
+When enabled, every query the connector runs is recorded against the
+signature (``name/arity``) of the predicate it calls, aggregating wall time,
+inference count and result count so the expensive parts of the KB stand out.
+
+A profile lives in the process that ran the queries. ``manage.py
+profile_prolog`` runs its suite in a process of its own, so it saves the
+result as a JSON report (REPORT_FILE, or PROLOG_PROFILE_REPORT) that the
+admin performance dashboard loads next to the live profile.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPORT_FILE = os.environ.get(
+    'PROLOG_PROFILE_REPORT',
+    str(Path(__file__).resolve().parent.parent / 'data' / 'prolog_profile.json'),
+)
+
+
+def save_report(report: Dict[str, Any], path: str = REPORT_FILE) -> None:
+    """Write a profile report, replacing the previous one atomically."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def load_report(path: str = REPORT_FILE) -> Optional[Dict[str, Any]]:
+    """The saved profile report, or None if there is none or it cannot be read."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class PredicateProfiler:
+    """Thread-safe aggregate of query cost by predicate signature."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, signature: str, wall_time: float, inferences: int, results: int,
+               truncated: bool = False) -> None:
+        """Add one executed query to the totals for ``signature``."""
+        with self._lock:
+            stats = self._stats.get(signature)
+            if stats is None:
+                stats = self._stats[signature] = {
+                    'calls': 0, 'total_time': 0.0, 'max_time': 0.0,
+                    'inferences': 0, 'results': 0, 'truncated': 0,
+                }
+            stats['calls'] += 1
+            stats['total_time'] += wall_time
+            stats['max_time'] = max(stats['max_time'], wall_time)
+            stats['inferences'] += inferences
+            stats['results'] += results
+            stats['truncated'] += int(truncated)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-predicate totals and averages, most expensive (total wall time) first."""
+        with self._lock:
+            rows = [dict(stats, predicate=signature) for signature, stats in self._stats.items()]
+        for row in rows:
+            calls = row['calls']
+            row['avg_time'] = row['total_time'] / calls
+            row['avg_inferences'] = row['inferences'] / calls
+            row['avg_results'] = row['results'] / calls
+        return sorted(rows, key=lambda row: row['total_time'], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
@@ -1,4 +1,8 @@
 from .connector import PrologConnector
+from .memo import VersionedMemo, memoized_lookup
+from core.data_structures import AhoCorasickMatcher
+import os
+import threading
 import logging # Add logging
 
 logger = logging.getLogger(__name__)
@@ -6,45 +10,39 @@ logger = logging.getLogger(__name__)
 class PrologService:
     def __init__(self):
         self.connector = PrologConnector()
+        # Lookups are memoized per KB version; size is bounded by PROLOG_MEMO_SIZE
+        self.memo = VersionedMemo(
+            lambda: self.connector.kb_version,
+            max_size=int(os.environ.get('PROLOG_MEMO_SIZE', '1024'))
+        )
+        # Entity matcher over all KB names, rebuilt only when the KB version changes
+        self._entity_matcher = None
+        self._entity_matcher_version = None
+        self._entity_matcher_lock = threading.Lock()
 
-    # Helper function to parse the ['key:value', ...] list from Prolog frame queries
-    def _parse_frame_attributes(self, attributes_list: list) -> dict:
-        attrs_dict = {}
-        if not isinstance(attributes_list, list):
-            logger.warning(f"_parse_frame_attributes received non-list input: {type(attributes_list)}")
-            return attrs_dict
-        for attr_str in attributes_list:
-            if isinstance(attr_str, str) and ':' in attr_str:
-                try:
-                    key, val = attr_str.split(':', 1)
-                    key = key.strip()
-                    val = val.strip()
-                    # Handle list-like values stored as strings '[a,b,c]'
-                    if val.startswith('[') and val.endswith(']') and len(val) > 2:
-                        # Simple split, might need refinement for complex list elements (e.g., containing commas)
-                        parsed_list = [item.strip() for item in val[1:-1].split(',')]
-                        attrs_dict[key] = parsed_list
-                    elif val.lower() in ['true', 'false']:
-                        attrs_dict[key] = val.lower() == 'true'
-                    elif val.isdigit():
-                        attrs_dict[key] = int(val)
-                    # Add more type conversions if needed (floats, etc.)
-                    else:
-                        attrs_dict[key] = val # Store as string
-                except Exception as e:
-                    logger.error(f"Error parsing attribute string '{attr_str}': {e}")
-            else:
-                 logger.warning(f"Skipping unexpected attribute format: {attr_str}")
-        return attrs_dict
+    def get_cache_stats(self):
+        """Get hit/miss statistics for the memoized KB lookups"""
+        return self.memo.get_stats()
+
+    # Helper to turn the attributes of a frame query into a fresh details dict.
+    # The connector already converts Prolog terms natively, so frame attribute
+    # lists arrive as {'key': value} dicts (an empty frame arrives as []).
+    def _parse_frame_attributes(self, attributes) -> dict:
+        if isinstance(attributes, dict):
+            return dict(attributes)
+        if attributes != []:
+            logger.warning(f"_parse_frame_attributes received unexpected input: {type(attributes)}")
+        return {}
 
     # Existing _get_practice_details needs updating to use the parser
     # Make it public as it seems useful directly
+    @memoized_lookup
     def get_practice_details(self, practice_name):
         """Get details for a specific practice (Updated)"""
         practice_name_lower = practice_name.lower()
         query = f"practice(name:{practice_name_lower}, X)"
         results = self.connector.query(query)
-        if results and isinstance(results[0].get('X'), list):
+        if results and isinstance(results[0].get('X'), dict):
             attributes = results[0]['X']
             # Use the parser
             parsed_details = self._parse_frame_attributes(attributes)
@@ -54,12 +52,13 @@ class PrologService:
         return {'name': practice_name, 'error': 'Details not found'} # Return structure indicating failure
 
     # New method for crop details
+    @memoized_lookup
     def get_crop_details(self, crop_name):
         """Get details for a specific crop"""
         crop_name_lower = crop_name.lower()
         query = f"crop(name:{crop_name_lower}, X)"
         results = self.connector.query(query)
-        if results and isinstance(results[0].get('X'), list):
+        if results and isinstance(results[0].get('X'), dict):
             attributes = results[0]['X']
             # Use the parser
             parsed_details = self._parse_frame_attributes(attributes)
@@ -68,35 +67,51 @@ class PrologService:
         logger.warning(f"Details not found for crop: {crop_name}")
         return {'name': crop_name, 'error': 'Details not found'}
 
-    # Existing get_pest_solutions - update to use get_practice_details
+    @memoized_lookup
+    def get_pest_bundle(self, pest, region="global"):
+        """
+        Get a pest's details together with the details of all its solutions
+        using a single pest_solution_frames/5 query instead of one query per solution
+        """
+        bundle = self.connector.get_pest_solution_frames(pest.lower(), region)
+        if not bundle:
+            return None
+        solution_names = bundle['solutions']
+        solution_frames = bundle['solution_frames']
+        if not isinstance(solution_names, list) or not isinstance(solution_frames, list):
+            logger.error(f"Connector returned non-list solutions for {pest}: {type(solution_names)}")
+            return None
+
+        pest_info = self._parse_frame_attributes(bundle['pest'])
+        pest_info['name'] = pest # Ensure original casing
+
+        solutions = []
+        for solution_name, attributes in zip(solution_names, solution_frames):
+            if not isinstance(solution_name, str):
+                logger.warning(f"Skipping non-string solution name: {solution_name}")
+                continue
+            if isinstance(attributes, dict) and attributes:
+                details = self._parse_frame_attributes(attributes)
+                details['name'] = solution_name
+            else:
+                logger.warning(f"Details not found for practice: {solution_name}")
+                details = {'name': solution_name, 'error': 'Details not found'}
+            solutions.append(details)
+        return {'pest_info': pest_info, 'solutions': solutions}
+
+    # Served from the memoized get_pest_bundle, so repeated calls cost a dict access
     def get_pest_solutions(self, pest, region="global"):
         """Get solutions for a pest in a specific region with details (Updated)"""
-        solution_names = self.connector.get_pest_solutions(pest, region) # Connector returns list of solution names
-        formatted = []
-        if not isinstance(solution_names, list):
-             logger.error(f"Connector returned non-list solutions for {pest}: {type(solution_names)}")
-             return formatted
-        for solution_name in solution_names:
-            if isinstance(solution_name, str):
-                 # Get details using the updated get_practice_details
-                 details = self.get_practice_details(solution_name)
-                 formatted.append(details) # Append the whole details dict
-            else:
-                 logger.warning(f"Skipping non-string solution name: {solution_name}")
-        return formatted
+        bundle = self.get_pest_bundle(pest, region)
+        return bundle['solutions'] if bundle else []
 
-    # Existing recommend_solution - update to use get_practice_details
+    # The recommendation is the first global solution, already fetched by get_pest_bundle
     def recommend_solution(self, pest):
         """Get the recommended solution for a pest with details (Updated)"""
-        solution_name = self.connector.recommend_solution(pest) # Returns name
-        if solution_name and isinstance(solution_name, str):
-            # Get details using the updated get_practice_details
-            details = self.get_practice_details(solution_name)
-            return details # Return the whole details dict
-        elif solution_name:
-             logger.warning(f"recommend_solution connector returned non-string name: {solution_name}")
-        return None
+        solutions = self.get_pest_solutions(pest)
+        return solutions[0] if solutions else None
 
+    @memoized_lookup
     def get_pest_info(self, pest_name):
         """Get comprehensive information about a pest"""
         # Query for pest details using the frame structure
@@ -104,7 +119,7 @@ class PrologService:
         query = f"pest(name:{pest_name_lower}, X)"
         results = self.connector.query(query)
         
-        if results and isinstance(results[0].get('X'), list):
+        if results and isinstance(results[0].get('X'), dict):
              attributes = results[0]['X']
              parsed_details = self._parse_frame_attributes(attributes)
              parsed_details['name'] = pest_name # Ensure original casing
@@ -112,65 +127,124 @@ class PrologService:
         logger.warning(f"Details not found for pest: {pest_name}")
         return None # Consistent return type (or dict with error)
 
+    @staticmethod
+    def _name_variants(name):
+        """Surface forms a KB name may take in a query: spaced, without '_general', plural"""
+        bases = {name, name.replace('_', ' ')}
+        if name.endswith('_general'):
+            stem = name[:-len('_general')]
+            bases.update({stem, stem.replace('_', ' ')})
+        variants = set(bases)
+        for base in bases:
+            if base.endswith('y') and base[-2:-1] not in ('a', 'e', 'o', 'u'):
+                variants.add(base[:-1] + 'ies')
+            elif base.endswith(('s', 'x', 'ch', 'sh')):
+                variants.add(base + 'es')
+            else:
+                variants.add(base + 's')
+        return variants
+
+    def _get_entity_matcher(self):
+        """Return the entity matcher for the current KB version, building it if needed"""
+        version = self.connector.kb_version
+        if self._entity_matcher is not None and self._entity_matcher_version == version:
+            return self._entity_matcher
+        with self._entity_matcher_lock:
+            if self._entity_matcher is not None and self._entity_matcher_version == version:
+                return self._entity_matcher
+            matcher = AhoCorasickMatcher()
+            for entity_type, get_names in (('pest', self.connector.get_all_pests),
+                                           ('practice', self.connector.get_all_practices),
+                                           ('crop', self.connector.get_all_crops)):
+                try:
+                    names = get_names()
+                    if not isinstance(names, list):
+                        logger.error(f"Name enumeration for {entity_type} returned non-list: {type(names)}")
+                        names = []
+                except Exception as e:
+                    logger.error(f"Error enumerating {entity_type} names: {e}")
+                    names = []
+                for name in names:
+                    if isinstance(name, str):
+                        for variant in self._name_variants(name.lower()):
+                            matcher.add(variant, entity_type, name)
+            matcher.build()
+            logger.info(f"Built KB entity matcher with {matcher.pattern_count} patterns for KB version {version}")
+            self._entity_matcher = matcher
+            self._entity_matcher_version = version
+            return matcher
+
+    def find_entities(self, query_text):
+        """
+        Find every pest, practice and crop mentioned in the query in one pass.
+        Returns a list of dicts with the KB name, entity type and matched span,
+        in order of appearance (longest match wins where mentions overlap).
+        """
+        entities = []
+        covered_until = 0
+        for name, entity_type, start, end in self._get_entity_matcher().search(query_text):
+            if start < covered_until:
+                continue
+            entities.append({
+                'name': name,
+                'type': entity_type,
+                'text': query_text[start:end],
+                'start': start,
+                'end': end
+            })
+            covered_until = end
+        return entities
+
     def search_prolog_kb(self, query_text):
         """
         Process a natural language query to find related information
         in the Prolog knowledge base
         """
-        # Look for pest names in the query
-        try:
-            all_pests = self.connector.get_all_pests()
-            if not isinstance(all_pests, list):
-                 logger.error(f"get_all_pests returned non-list: {type(all_pests)}")
-                 all_pests = []
-        except Exception as e:
-             logger.error(f"Error calling get_all_pests: {e}")
-             all_pests = []
-
-        found_pest_info = None
-        for pest in all_pests:
-            if isinstance(pest, str) and pest.lower() in query_text.lower():
-                # Found a pest reference, get details
-                pest_info = self.get_pest_info(pest) # Use updated method
-                if pest_info and not pest_info.get('error'):
-                    solutions = self.get_pest_solutions(pest) # Use updated method
-                    recommendation = self.recommend_solution(pest) # Use updated method
-                    found_pest_info = {
-                        'pest_found': pest,
-                        'pest_info': pest_info,
-                        'solutions': solutions,
-                        'recommendation': recommendation
-                    }
-                    break # Stop after first pest match for simplicity
-        
-        if found_pest_info: return found_pest_info
-
-        # Look for practice names in the query
-        try:
-             all_practices = self.connector.get_all_practices()
-             if not isinstance(all_practices, list):
-                  logger.error(f"get_all_practices returned non-list: {type(all_practices)}")
-                  all_practices = []
-        except Exception as e:
-             logger.error(f"Error calling get_all_practices: {e}")
-             all_practices = []
-             
-        found_practice_info = None
-        for practice in all_practices:
-            if isinstance(practice, str) and practice.lower() in query_text.lower():
-                # Get practice details
-                practice_info = self.get_practice_details(practice) # Use updated method
-                if practice_info and not practice_info.get('error'):
-                    found_practice_info = {
-                        'practice_found': practice,
-                        'practice_info': practice_info
-                    }
-                    break # Stop after first practice match
-
-        if found_practice_info: return found_practice_info
+        entities = self.find_entities(query_text)
+
+        def names_of(entity_type):
+            names = []
+            for entity in entities:
+                if entity['type'] == entity_type and entity['name'] not in names:
+                    names.append(entity['name'])
+            return names
+
+        pests = names_of('pest')
+        practices = names_of('practice')
+        all_matches = {
+            'entities': entities,
+            'pests_found': pests,
+            'practices_found': practices,
+            'crops_found': names_of('crop')
+        }
+
+        # Pest mentions take priority; the first one with KB details is the primary result
+        for pest in pests:
+            bundle = self.get_pest_bundle(pest)
+            pest_info = bundle['pest_info'] if bundle else self.get_pest_info(pest)
+            if pest_info and not pest_info.get('error'):
+                solutions = bundle['solutions'] if bundle else []
+                recommendation = solutions[0] if solutions else None
+                return {
+                    'pest_found': pest,
+                    'pest_info': pest_info,
+                    'solutions': solutions,
+                    'recommendation': recommendation,
+                    **all_matches
+                }
+
+        for practice in practices:
+            practice_info = self.get_practice_details(practice) # Use updated method
+            if practice_info and not practice_info.get('error'):
+                return {
+                    'practice_found': practice,
+                    'practice_info': practice_info,
+                    **all_matches
+                }
         
         # No specific entity found
         return {
             'generic_response': True,
-            'message': "I couldn't find specific information about that in my knowledge base."
+            'message': "I couldn't find specific information about that in my knowledge base.",
+            **all_matches
         } 
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Conversion of Prolog query results into plain Python values.
+
+Works on raw (non-normalized) pyswip results and on FrameEngine terms alike,
+in a single recursive pass:
+
+- atoms and strings become ``str`` (``true``/``false`` become ``bool``)
+- numbers stay numbers, unbound variables become ``None``
+- ``Key:Value`` pairs become dicts, so a frame attribute list such as
+  ``[name:aphid, controls:[soap, neem]]`` becomes
+  ``{'name': 'aphid', 'controls': ['soap', 'neem']}``
+- any other compound term (e.g. ``cv('Bell Boy', [...])``) becomes its Prolog text
+
+Quoted values keep their commas and colons intact, unlike parsing the
+``'key:value'`` strings that normalized pyswip results produce.
+"""
+import re
+from typing import Any, Optional, Tuple
+
+from .frame_engine import Term, Var, INFIX_OPERATORS
+
+try:
+    from pyswip.easy import Atom, Functor, Variable
+except ImportError:
+    Atom = Functor = Variable = None
+
+_BOOLEANS = {'true': True, 'false': False}
+
+_PLAIN_ATOM_RE = re.compile(r'[a-z][a-zA-Z0-9_]*\Z')
+
+
+def _compound(value: Any) -> Optional[Tuple[str, Any]]:
+    """Return ``(functor, args)`` if ``value`` is a compound term, else None."""
+    if isinstance(value, Term):
+        return value.functor, value.args
+    if Functor is not None and isinstance(value, Functor):
+        return _atom_text(value.name), value.args
+    return None
+
+
+def _atom_text(value: Any) -> str:
+    if Atom is not None and isinstance(value, Atom):
+        return value.value
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return str(value)
+
+
+def _as_pair(value: Any) -> Optional[Tuple[Any, Any]]:
+    if type(value) is Term:
+        return value.args if value.functor == ':' and len(value.args) == 2 else None
+    compound = _compound(value)
+    if compound and compound[0] == ':' and len(compound[1]) == 2:
+        return compound[1]
+    return None
+
+
+def to_python(value: Any) -> Any:
+    """Convert a Prolog term into Python dicts, lists and scalars."""
+    value_type = type(value)
+    if value_type is str:
+        return _BOOLEANS.get(value, value)
+    if value_type is int or value_type is float:
+        return value
+    if value_type is list:
+        return _list_to_python(value)
+    if value_type is Term and value.functor == ':' and len(value.args) == 2:
+        return {_atom_text(to_python(value.args[0])): to_python(value.args[1])}
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, Var) or (Variable is not None and isinstance(value, Variable)):
+        return None
+    if Atom is not None and isinstance(value, Atom):
+        text = value.value
+        return [] if text == '[]' else _BOOLEANS.get(text, text)
+
+    compound = _compound(value)
+    if compound is None:
+        return value
+    name, args = compound
+    if name == ':' and len(args) == 2:
+        return {_atom_text(to_python(args[0])): to_python(args[1])}
+    if name in INFIX_OPERATORS and len(args) == 2:
+        return f"{to_text(to_python(args[0]))}{name}{to_text(to_python(args[1]))}"
+    return f"{name}({', '.join(to_text(to_python(arg)) for arg in args)})"
+
+
+def _list_to_python(items: list) -> Any:
+    """Convert a list, turning it into a dict when every element is a ``Key:Value`` pair."""
+    if not items:
+        return []
+    converted = {}
+    for item in items:
+        pair = _as_pair(item)
+        if pair is None:
+            return [to_python(element) for element in items]
+        converted[_atom_text(to_python(pair[0]))] = to_python(pair[1])
+    return converted
+
+
+def to_text(value: Any) -> str:
+    """Render a converted value back as compact Prolog-style text."""
+    if isinstance(value, dict):
+        return '[' + ', '.join(f"{key}:{to_text(val)}" for key, val in value.items()) + ']'
+    if isinstance(value, list):
+        return '[' + ', '.join(to_text(item) for item in value) + ']'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def convert_bindings(result: dict) -> dict:
+    """Convert every binding of a single query solution."""
+    return {name: to_python(value) for name, value in result.items()}
+
+
+def bindings_dict(bindings: list) -> dict:
+    """Turn a raw ``['Name'=Value, ...]`` list, as built by variable_names/1, into a solution dict."""
+    solution = {}
+    for binding in bindings:
+        name, value = _compound(binding)[1]
+        solution[_atom_text(name)] = value
+    return solution
+
+
+def quote_string(text: str) -> str:
+    """Render ``text`` as a double-quoted Prolog string."""
+    escaped = (text.replace('\\', '\\\\').replace('"', '\\"')
+               .replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t'))
+    return f'"{escaped}"'
+
+
+def quote_atom(name: str) -> str:
+    """Render ``name`` as a Prolog atom, quoting and escaping it unless it is a plain atom."""
+    if _PLAIN_ATOM_RE.match(name):
+        return name
+    escaped = (name.replace('\\', '\\\\').replace("'", "\\'")
+               .replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t'))
+    return f"'{escaped}'"
@@ -0,0 +1,103 @@
+"""
+Tests for the pure-Python FrameEngine backend.
+"""
+import pytest
+
+from prolog_integration.frame_engine import FrameEngine, FrameEngineError, default_kb_path
+
+SAMPLE_KB = """
+:- discontiguous(frame/2).
+
+frame(pest, [
+    name: aphid,
+    type: insect,
+    scientific_name: 'Aphidoidea spp.',  % comment after a value
+    controls: [insecticidal_soap, neem_extract],
+    cultural_context: [global]
+]).
+
+frame(pest, [
+    name: pea_aphid,
+    controls: [water_spray],
+    cultural_context: [legumes]
+]).
+
+frame(practice, [
+    name: insecticidal_soap,
+    description: 'Soap, water and patience: it\\'s cheap',
+    cost: low
+]).
+
+frame(crop, [
+    name: pepper,
+    resistant_cultivars: [cv('Bell Boy', [resistance_to: bacterial_spot])],
+    notes: [self-regulating]
+]).
+
+frame(pest, [
+    name: broken,
+    description: 'a pest's life'
+]).
+
+is_pest(P) :- frame(pest, [name:P|_]).
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    kb_file = tmp_path / 'sample.pl'
+    kb_file.write_text(SAMPLE_KB, encoding='utf-8')
+    return FrameEngine.from_file(kb_file)
+
+
+def test_loads_frames_and_skips_rules_and_broken_clauses(engine):
+    assert engine.get_names('pest') == ['aphid', 'pea_aphid']
+    assert engine.get_names('practice') == ['insecticidal_soap']
+
+
+def test_adapter_lookup_by_name(engine):
+    results = list(engine.query('pest(name:aphid, X)'))
+    assert len(results) == 1
+    assert 'scientific_name:Aphidoidea spp.' in results[0]['X']
+    assert 'controls:[insecticidal_soap, neem_extract]' in results[0]['X']
+
+
+def test_name_enumeration(engine):
+    assert [r['Name'] for r in engine.query('pest(name:Name, _)')] == ['aphid', 'pea_aphid']
+
+
+def test_pest_solutions_respects_region(engine):
+    assert list(engine.query('pest_solutions(aphid, global, S)'))[0]['S'] == ['insecticidal_soap', 'neem_extract']
+    assert list(engine.query('pest_solutions(pea_aphid, global, S)')) == []
+    assert list(engine.query('pest_solutions(pea_aphid, legumes, S)'))[0]['S'] == ['water_spray']
+
+
+def test_recommend_solution(engine):
+    assert list(engine.query('recommend_solution(aphid, S)'))[0]['S'] == 'insecticidal_soap'
+
+
+def test_pest_solution_frames_returns_everything_in_one_query(engine):
+    results = list(engine.query('pest_solution_frames(aphid, global, P, S, F)'))
+    assert len(results) == 1
+    assert 'name:aphid' in results[0]['P']
+    assert results[0]['S'] == ['insecticidal_soap', 'neem_extract']
+    soap_frame, neem_frame = results[0]['F']
+    assert 'cost:low' in soap_frame
+    assert neem_frame == []
+    assert list(engine.query('pest_solution_frames(pea_aphid, global, P, S, F)')) == []
+
+
+def test_conjunction_with_member(engine):
+    results = list(engine.query('frame(pest, F), member(controls:C, F), member(neem_extract, C), member(name:N, F)'))
+    assert [r['N'] for r in results] == ['aphid']
+
+
+def test_unknown_predicate_raises(engine):
+    with pytest.raises(FrameEngineError):
+        list(engine.query('process_query(aphids, R)'))
+
+
+def test_loads_full_knowledge_base():
+    engine = FrameEngine.from_file(default_kb_path())
+    assert 'aphid_general' in engine.get_names('pest')
+    assert list(engine.query('recommend_solution(aphid_general, S)'))
@@ -0,0 +1,112 @@
+"""
+Tests for per-query time and inference limits and predicate profiling.
+"""
+import pytest
+
+from prolog_integration.frame_engine import (
+    FrameEngine, QueryBudget, QueryLimitExceeded, predicate_signature,
+)
+from prolog_integration.profiler import load_report, save_report
+
+KB = """
+frame(pest, [name: aphid, controls: [neem_extract, insecticidal_soap]]).
+frame(pest, [name: whitefly, controls: [yellow_traps]]).
+frame(pest, [name: thrips, controls: [blue_traps]]).
+"""
+
+
+@pytest.fixture
+def kb_file(tmp_path):
+    path = tmp_path / 'kb.pl'
+    path.write_text(KB, encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def engine(kb_file):
+    return FrameEngine.from_file(kb_file)
+
+
+@pytest.fixture
+def connector(kb_file, make_connector):
+    return make_connector(kb_file)
+
+
+def test_inference_limit_raises_after_partial_solutions(engine):
+    budget = QueryBudget(inference_limit=2)
+    solutions = engine.query('frame(pest, F), member(name:N, F)', budget=budget)
+    assert next(solutions)['N'] == 'aphid'
+    with pytest.raises(QueryLimitExceeded) as excinfo:
+        list(solutions)
+    assert excinfo.value.limit == 'inferences'
+
+
+def test_unbounded_query_is_complete(connector):
+    results = connector.query('frame(pest, F), member(name:N, F)')
+    assert [r['N'] for r in results] == ['aphid', 'whitefly', 'thrips']
+    assert not results.truncated
+
+
+def test_connector_returns_partial_results_and_counts_limit(connector):
+    results = connector.query('frame(pest, F), member(name:N, F)', inference_limit=3)
+    assert [r['N'] for r in results] == ['aphid', 'whitefly']
+    assert results.truncated and results.limit == 'inferences'
+    assert connector.get_limit_stats() == {'frame/2': {'time': 0, 'inferences': 1}}
+
+
+def test_time_limit(connector):
+    results = connector.query('frame(pest, F), member(name:N, F)', time_limit=1e-9)
+    assert results.limit == 'time'
+
+
+def test_time_limit_with_pyswip(kb_file, make_connector):
+    pyswip = pytest.importorskip('pyswip')
+    connector = make_connector(kb_file)
+    connector.backend = 'pyswip'
+    connector.prolog = pyswip.Prolog()
+    list(connector.prolog.query(f"consult('{kb_file.as_posix()}')"))
+
+    results = connector.query('frame(pest, F), member(name:N, F)', time_limit=5)
+    assert [result['N'] for result in results] == ['aphid', 'whitefly', 'thrips']
+    assert not results.truncated
+    # A solution that never returns is cut off by call_with_time_limit/2
+    results = connector.query('repeat, fail', time_limit=0.2, inference_limit=0)
+    assert (list(results), results.limit) == ([], 'time')
+    # Solutions found before the limit are kept
+    results = connector.query('between(1, inf, X)', time_limit=0.2, inference_limit=0)
+    assert results.limit == 'time'
+    assert [result['X'] for result in results[:3]] == [1, 2, 3]
+
+
+def test_predicate_signature():
+    assert predicate_signature('pest_solutions(aphid, global, S)') == 'pest_solutions/3'
+    assert predicate_signature('frame(pest, F), member(name:N, F)') == 'frame/2'
+    assert predicate_signature('make') == 'make/0'
+
+
+def test_profiling_aggregates_by_predicate(connector):
+    connector.enable_profiling()
+    connector.query('frame(pest, F), member(name:N, F)')
+    connector.query('frame(pest, F)')
+    connector.query('member(x, [x])')
+    connector.disable_profiling()
+    connector.query('member(x, [x])')
+
+    profile = {row['predicate']: row for row in connector.get_profile()}
+    assert profile['frame/2']['calls'] == 2
+    assert profile['frame/2']['results'] == 6
+    assert profile['frame/2']['inferences'] == 5
+    assert profile['member/2']['calls'] == 1
+
+
+def test_profile_report_round_trip(connector, tmp_path):
+    connector.enable_profiling()
+    connector.query('frame(pest, F)')
+    connector.disable_profiling()
+
+    path = str(tmp_path / 'reports' / 'prolog_profile.json')
+    assert load_report(path) is None
+    save_report({'backend': connector.backend, 'predicates': connector.get_profile()}, path)
+    report = load_report(path)
+    assert report['backend'] == 'frames'
+    assert [row['predicate'] for row in report['predicates']] == ['frame/2']
@@ -0,0 +1,64 @@
+"""
+Tests for the versioned memoization of PrologService lookups.
+"""
+from prolog_integration.memo import VersionedMemo, memoized_lookup
+
+
+class FakeService:
+    def __init__(self):
+        self.kb_version = 1
+        self.calls = 0
+        self.memo = VersionedMemo(lambda: self.kb_version, max_size=2)
+
+    @memoized_lookup
+    def get_pest_info(self, pest_name):
+        self.calls += 1
+        return {'name': pest_name}
+
+    @memoized_lookup
+    def get_pest_bundle(self, pest, region="global"):
+        self.calls += 1
+        return {'name': pest, 'region': region}
+
+
+def test_repeated_lookup_is_served_from_memo():
+    service = FakeService()
+    assert service.get_pest_info('aphid') == {'name': 'aphid'}
+    assert service.get_pest_info('aphid') == {'name': 'aphid'}
+    assert service.calls == 1
+    stats = service.memo.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+
+def test_version_change_invalidates_entries():
+    service = FakeService()
+    service.get_pest_info('aphid')
+    service.kb_version = 2
+    service.get_pest_info('aphid')
+    assert service.calls == 2
+    assert service.memo.get_stats()['invalidations'] == 1
+    assert service.memo.get_stats()['kb_version'] == 2
+
+
+def test_size_is_bounded_with_lru_eviction():
+    service = FakeService()
+    service.get_pest_info('aphid')
+    service.get_pest_info('cutworm')
+    service.get_pest_info('aphid')
+    service.get_pest_info('thrips')
+    assert service.memo.get_stats()['size'] == 2
+    service.get_pest_info('aphid')
+    assert service.calls == 3
+    service.get_pest_info('cutworm')
+    assert service.calls == 4
+
+
+def test_default_and_explicit_arguments_share_an_entry():
+    service = FakeService()
+    service.get_pest_bundle('aphid')
+    service.get_pest_bundle('aphid', 'global')
+    service.get_pest_bundle('aphid', region='global')
+    service.get_pest_bundle(pest='aphid')
+    assert service.calls == 1
+    assert service.get_pest_bundle('aphid', 'kenya') == {'name': 'aphid', 'region': 'kenya'}
+    assert service.calls == 2
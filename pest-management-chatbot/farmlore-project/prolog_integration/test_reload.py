@@ -0,0 +1,116 @@
+"""
+Tests for hot-reloading the knowledge base behind PrologConnector.
+"""
+import pytest
+
+from prolog_integration.kb_watcher import KBWatcher
+
+KB_TEMPLATE = """
+frame(pest, [name: aphid, controls: [{control}], cultural_context: [global]]).
+frame(practice, [name: {control}, cost: low]).
+frame(crop, [name: pepper]).
+"""
+
+
+@pytest.fixture
+def kb_file(tmp_path):
+    path = tmp_path / 'kb.pl'
+    path.write_text(KB_TEMPLATE.format(control='neem_extract'), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def connector(kb_file, make_connector):
+    return make_connector(kb_file)
+
+
+def test_reload_without_changes_keeps_engine_and_version(connector):
+    engine = connector.prolog
+    assert connector.reload_kb() is False
+    assert connector.prolog is engine
+    assert connector.kb_version == 1
+
+
+def test_reload_swaps_engine_and_bumps_version(connector, kb_file):
+    old_engine = connector.prolog
+    kb_file.write_text(KB_TEMPLATE.format(control='garlic_spray'), encoding='utf-8')
+
+    assert connector.reload_kb() is True
+    assert connector.prolog is not old_engine
+    assert connector.kb_version == 2
+    assert connector.recommend_solution('aphid') == 'garlic_spray'
+    # Queries holding the old engine still see the old KB
+    assert list(old_engine.query('recommend_solution(aphid, S)'))[0]['S'] == 'neem_extract'
+
+
+def test_invalid_kb_is_rejected(connector, kb_file):
+    engine = connector.prolog
+    kb_file.write_text("frame(pest, [name: aphid]).\n", encoding='utf-8')
+
+    assert connector.reload_kb() is False
+    assert connector.prolog is engine
+    assert connector.kb_version == 1
+
+
+def test_watcher_triggers_reload_on_file_change(connector, kb_file):
+    watcher = KBWatcher(connector, kb_dir=kb_file.parent)
+    assert watcher.check() is False
+
+    (kb_file.parent / 'extra.pl').write_text("frame(crop, [name: maize]).\n", encoding='utf-8')
+    kb_file.write_text(KB_TEMPLATE.format(control='garlic_spray'), encoding='utf-8')
+    assert watcher.check() is True
+    assert connector.kb_version == 2
+
+
+def test_apply_frame_updates_swaps_in_updated_engine(connector):
+    old_engine = connector.prolog
+    applied = connector.apply_frame_updates(
+        removed=["frame(practice, [name: neem_extract, cost: low])"],
+        added_facts=["frame(practice, [name: neem_extract, cost: medium])."],
+    )
+
+    assert applied is True
+    assert connector.kb_version == 2
+    assert connector.get_practice_details('neem_extract') == {'name': 'neem_extract', 'cost': 'medium'}
+    assert old_engine.get_names('practice') == ['neem_extract']
+    assert list(old_engine.query('practice(name:neem_extract, X), member(cost:C, X)'))[0]['C'] == 'low'
+    # Frame types that did not change are shared with the old engine
+    assert connector.prolog.frames['pest'] is old_engine.frames['pest']
+
+
+def test_apply_frame_updates_retracts_only_the_given_frame(tmp_path, make_connector):
+    kb_file = tmp_path / 'kb.pl'
+    kb_file.write_text(KB_TEMPLATE.format(control='neem_extract') + ":- consult(community).\n", encoding='utf-8')
+    community_frame = "frame(practice, [name: neem_extract, cost: low, cultural_context: [basotho]])"
+    (tmp_path / 'community.pl').write_text(community_frame + ".\n", encoding='utf-8')
+    connector = make_connector(kb_file)
+
+    applied = connector.apply_frame_updates(
+        removed=[community_frame],
+        added_facts=["frame(practice, [name: neem_extract, cost: medium, cultural_context: [basotho]])"],
+    )
+
+    assert applied is True
+    costs = list(connector.prolog.query('practice(name:neem_extract, X), member(cost:C, X)'))
+    # The core KB frame sharing the community entry's name is kept
+    assert [result['C'] for result in costs] == ['low', 'medium']
+
+
+def test_apply_frame_updates_in_place_with_pyswip(tmp_path, make_connector, monkeypatch):
+    pyswip = pytest.importorskip('pyswip')
+    from community.knowledge_exporter import export_to_prolog, splice_community_frames
+    from community.test_knowledge_export import make_entry
+
+    kb_file = tmp_path / 'community_kb.pl'
+    export_to_prolog([make_entry(1, 'Ash Barrier', ['cutworms'])], str(kb_file))
+    connector = make_connector(kb_file)
+    connector.backend = 'pyswip'
+    connector.prolog = pyswip.Prolog()
+    list(connector.prolog.query(f"consult('{kb_file.as_posix()}')"))
+    monkeypatch.setattr(connector, 'reload_kb', lambda: pytest.fail("fell back to a full reload"))
+
+    retracted, asserted = splice_community_frames(
+        str(kb_file), [make_entry(1, 'Ash Barrier', ['cutworms', 'slugs'])], removed_ids=[])
+    assert connector.apply_frame_updates(retracted, asserted) is True
+    controls = list(connector.prolog.query("frame(practice, [name:ash_barrier, _, controls:C|_])"))
+    assert [result['C'] for result in controls] == [['cutworms', 'slugs']]
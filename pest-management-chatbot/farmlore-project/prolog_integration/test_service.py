@@ -0,0 +1,50 @@
+"""
+Tests for PrologService lookups on both connector backends.
+"""
+import re
+from pathlib import Path
+
+import pytest
+
+from prolog_integration import service as service_module
+from prolog_integration.connector import PYSWIP_KB_FILES
+from prolog_integration.frame_engine import default_kb_path
+
+KB_DIR = Path(service_module.__file__).resolve().parent
+
+# Goals the connector sends for PrologService lookups
+CONNECTOR_PREDICATES = ['pest', 'practice', 'crop', 'pest_solutions', 'recommend_solution', 'pest_solution_frames']
+
+PEST = 'leafhopper_general'
+
+
+def make_service(monkeypatch, connector):
+    monkeypatch.setattr(service_module, 'PrologConnector', lambda: connector)
+    return service_module.PrologService()
+
+
+def test_pyswip_file_set_defines_connector_predicates():
+    # The FrameEngine solves these natively, so only the files can show they reach pyswip
+    source = "\n".join((KB_DIR / kb_file).read_text(encoding='utf-8') for kb_file in PYSWIP_KB_FILES)
+    defined = set(re.findall(r"^([a-z]\w*)\(", source, re.MULTILINE))
+    assert set(CONNECTOR_PREDICATES) <= defined
+
+
+def test_service_answers_from_frames(monkeypatch, make_connector):
+    service = make_service(monkeypatch, make_connector(default_kb_path()))
+    solutions = service.get_pest_solutions(PEST)
+    assert solutions and all('name' in solution for solution in solutions)
+    assert service.recommend_solution(PEST) == solutions[0]
+
+
+def test_service_answers_from_pyswip_file_set(monkeypatch, make_connector):
+    pyswip = pytest.importorskip('pyswip')
+    connector = make_connector(default_kb_path())
+    connector.backend = 'pyswip'
+    connector.prolog = pyswip.Prolog()
+    connector._consult_pyswip_kb()
+
+    service = make_service(monkeypatch, connector)
+    solutions = service.get_pest_solutions(PEST)
+    assert solutions and all('name' in solution for solution in solutions)
+    assert service.recommend_solution(PEST) == solutions[0]
@@ -0,0 +1,48 @@
+"""
+Tests for native conversion of Prolog terms into Python values.
+"""
+from prolog_integration.frame_engine import Term, Var, parse_goal
+from prolog_integration.frame_engine import Term
+from prolog_integration.terms import bindings_dict, convert_bindings, quote_atom, quote_string, to_python
+
+
+def test_frame_attribute_list_becomes_dict():
+    term = parse_goal("[name: aphid, controls: [soap, neem], cost: 3, organic: true]")
+    assert to_python(term) == {'name': 'aphid', 'controls': ['soap', 'neem'], 'cost': 3, 'organic': True}
+
+
+def test_quoted_values_keep_commas_and_colons():
+    term = parse_goal("[description: 'Mix soap, water: then spray', materials: ['Hot chili peppers', 'Water']]")
+    assert to_python(term) == {
+        'description': 'Mix soap, water: then spray',
+        'materials': ['Hot chili peppers', 'Water'],
+    }
+
+
+def test_nested_and_other_compound_terms():
+    term = parse_goal("[resistant_cultivars: [cv('Bell Boy', [resistance_to: spot])], notes: [self-regulating]]")
+    assert to_python(term) == {
+        'resistant_cultivars': ['cv(Bell Boy, [resistance_to:spot])'],
+        'notes': ['self-regulating'],
+    }
+
+
+def test_empty_list_and_unbound_variable():
+    assert to_python([]) == []
+    assert convert_bindings({'X': Var('X'), 'Y': Term(':', ('name', 'aphid'))}) == {'X': None, 'Y': {'name': 'aphid'}}
+
+
+def test_quote_atom():
+    assert quote_atom('aphid_general') == 'aphid_general'
+    assert quote_atom('Bell Boy') == "'Bell Boy'"
+    assert quote_atom("farmer's choice") == "'farmer\\'s choice'"
+
+
+def test_quote_string():
+    assert quote_string('frame(pest, F)') == '"frame(pest, F)"'
+    assert quote_string('X = "a\\b"') == '"X = \\"a\\\\b\\""'
+
+
+def test_bindings_dict():
+    bindings = [Term('=', ('N', 'aphid')), Term('=', ('C', ['neem']))]
+    assert bindings_dict(bindings) == {'N': 'aphid', 'C': ['neem']}
@@ -3,7 +3,7 @@ Test script for performance enhancements in the FarmLore platform.
 
 This script tests the various data structures and algorithms implemented
 to improve performance, including:
-1. Trie for entity extraction
+1. Trie and Aho-Corasick automaton for entity extraction
 2. LRU Cache for Prolog queries
 3. Bloom filter for quick existence checks
 4. Inverted index for symptom-based pest identification
@@ -26,7 +26,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import the data structures and components
 from core.data_structures import (
-    EntityTrie, LRUCache, SimpleBloomFilter, InvertedIndex, 
+    EntityTrie, AhoCorasickMatcher, LRUCache, SimpleBloomFilter, InvertedIndex, 
     PriorityQueue, ConcurrentCache, SimilarQueryDetector
 )
 
@@ -58,6 +58,31 @@ class DataStructureTests(unittest.TestCase):
         self.assertTrue(any(entity[1] == "pest" and entity[0] == "aphid" for entity in results))
         self.assertTrue(any(entity[1] == "crop" and entity[0] == "tomato" for entity in results))
     
+    def test_aho_corasick_matcher(self):
+        """Test the AhoCorasickMatcher for single-pass multi-entity extraction."""
+        logger.info("Testing AhoCorasickMatcher...")
+        
+        matcher = AhoCorasickMatcher()
+        matcher.add("aphid", "pest", "aphid_general")
+        matcher.add("aphids", "pest", "aphid_general")
+        matcher.add("ant", "pest", "ant")
+        matcher.add("spider mites", "pest", "spider_mite")
+        matcher.add("tomato", "crop", "tomato")
+        matcher.build()
+        
+        text = "Aphids and spider mites on my tomato plant"
+        start_time = time.time()
+        results = matcher.search(text)
+        end_time = time.time()
+        
+        logger.info(f"AhoCorasickMatcher search completed in {end_time - start_time:.6f} seconds")
+        logger.info(f"Found entities: {results}")
+        
+        # Every entity is found, and "ant" inside "plant" is rejected as a partial word
+        self.assertEqual([entity[0] for entity in results], ["aphid_general", "spider_mite", "tomato"])
+        self.assertEqual(results[0][2:], (0, 6))
+        self.assertEqual(len(matcher.search(text, whole_words=False)), 5)
+    
     def test_lru_cache(self):
         """Test the LRU Cache for efficient caching."""
         logger.info("Testing LRUCache...")
@@ -3,11 +3,21 @@
 RAG Database Creator
 
 This script creates a vector database for Retrieval-Augmented Generation (RAG)
-with agricultural pest management information.
+with agricultural pest management information, optionally adding reference
+text files given on the command line:
+
+    python rag_database_creator.py [FILE ...]
+
+Documents are chunked and added to the store in batches of INGEST_BATCH_SIZE
+chunks as they are produced; inside the farmlore app, files are streamed with
+corpus_ingestion.iter_file_chunks, so large texts are indexed in constant memory.
 """
+import io
+import itertools
 import os
+import sys
 import logging
-from typing import List, Dict
+from typing import Dict, Iterator, List, Sequence, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +26,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger("rag_database_creator")
 
+# Inside the app container this directory is the farmlore project. In a checkout the
+# project is pest-management-chatbot/farmlore-project: its api package takes precedence
+# over this directory's api/ (a namespace package without the embedding modules) once
+# it is on the path.
+FARMLORE_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pest-management-chatbot', 'farmlore-project')
+if os.path.isdir(FARMLORE_PROJECT) and FARMLORE_PROJECT not in sys.path:
+    sys.path.append(FARMLORE_PROJECT)
+
+# Shared on-disk embedding cache (available when run inside the farmlore app)
+try:
+    from api.inference_engine.embedding_cache import CachedEmbeddings
+    from api.inference_engine.embedding_service import ServiceEmbeddings
+except ImportError:
+    CachedEmbeddings = ServiceEmbeddings = None
+
+# Streaming chunker shared with the corpus ingestion pipeline
+try:
+    from api.inference_engine.corpus_ingestion import iter_file_chunks, iter_text_chunks
+except ImportError:
+    iter_file_chunks = iter_text_chunks = None
+
+DEFAULT_BATCH_SIZE = 64
+
 # Sample pest management data
 PEST_DATA = [
     {
@@ -152,63 +185,85 @@ Controlling young nymphs is much more effective than trying to manage adult popu
     }
 ]
 
-def create_rag_database(data: List[Dict], persist_dir: str = "./data/chromadb"):
-    """Create a RAG vector database from agricultural pest management data"""
+def chunk_text(text, chunk_size=500, overlap=50):
+    """Simple text chunking, used when the farmlore chunker is not available"""
+    if iter_text_chunks is not None:
+        return list(iter_text_chunks(io.StringIO(text), chunk_size, overlap))
+
+    chunks = []
+    start = 0
+    text_length = len(text)
+
+    while start < text_length:
+        end = min(start + chunk_size, text_length)
+        if end < text_length:
+            # Find the last period or newline to break at
+            break_point = max(text.rfind('.', start, end), text.rfind('\n', start, end))
+            if break_point > start + overlap:
+                end = break_point + 1
+
+        chunks.append(text[start:end])
+        if end >= text_length:
+            break
+        start = end - overlap
+
+    return chunks
+
+
+def iter_documents(data: List[Dict], files: Sequence[str] = ()) -> Iterator[Tuple[str, Dict]]:
+    """Yield (chunk, metadata) pairs for the data items, then for each file as it is read"""
+    for item in data:
+        for chunk in chunk_text(item["content"]):
+            yield chunk, {"title": item["title"]}
+
+    for path in files:
+        title = os.path.basename(path)
+        if iter_file_chunks is not None:
+            chunks = iter_file_chunks(path)
+        else:
+            logger.warning(f"Streaming chunker not available, reading {path} into memory")
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                chunks = chunk_text(f.read())
+        for chunk in chunks:
+            yield chunk, {"title": title, "source": title}
+
+
+def create_rag_database(data: List[Dict], persist_dir: str = "./data/chromadb", files: Sequence[str] = ()):
+    """Create a RAG vector database from agricultural pest management data and reference files"""
     try:
         # Import necessary libraries
         from langchain_community.vectorstores import Chroma
-        from langchain_community.embeddings import HuggingFaceEmbeddings
         
         # Create the directory if it doesn't exist
         os.makedirs(persist_dir, exist_ok=True)
         
-        # Initialize embeddings
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        
-        # Manually prepare documents and texts
-        texts = []
-        metadatas = []
-        
-        # Simple text chunking function
-        def chunk_text(text, chunk_size=500, overlap=50):
-            chunks = []
-            start = 0
-            text_length = len(text)
-            
-            while start < text_length:
-                end = min(start + chunk_size, text_length)
-                if end < text_length and end < start + chunk_size:
-                    # Find the last period or newline to break at
-                    last_period = text.rfind('.', start, end)
-                    last_newline = text.rfind('\n', start, end)
-                    break_point = max(last_period, last_newline)
-                    
-                    if break_point > start:
-                        end = break_point + 1
-                
-                chunks.append(text[start:end])
-                start = end - overlap
-            
-            return chunks
+        # Initialize embeddings, through the shared model when run inside the farmlore app
+        if ServiceEmbeddings is not None:
+            embeddings = ServiceEmbeddings("all-MiniLM-L6-v2")
+        else:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        if CachedEmbeddings is not None:
+            embeddings = CachedEmbeddings(embeddings, "all-MiniLM-L6-v2")
+        else:
+            logger.info("Embedding cache not available, embedding all chunks")
         
-        # Process each document
-        for item in data:
-            # Split content into chunks
-            content_chunks = chunk_text(item["content"])
-            
-            for chunk in content_chunks:
-                texts.append(chunk)
-                metadatas.append({"title": item["title"]})
+        vectorstore = Chroma(embedding_function=embeddings, persist_directory=persist_dir)
         
-        logger.info(f"Created {len(texts)} text chunks")
+        # Chunks are embedded and added a batch at a time, so only one batch is held in memory
+        batch_size = int(os.environ.get("INGEST_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        documents = iter_documents(data, files)
+        total = 0
+        while True:
+            batch = list(itertools.islice(documents, batch_size))
+            if not batch:
+                break
+            texts, metadatas = zip(*batch)
+            vectorstore.add_texts(texts=list(texts), metadatas=list(metadatas))
+            total += len(batch)
+            logger.info(f"Added {total} text chunks")
         
-        # Create and persist the vector store
-        vectorstore = Chroma.from_texts(
-            texts=texts,
-            metadatas=metadatas,
-            embedding=embeddings,
-            persist_directory=persist_dir
-        )
+        logger.info(f"Created {total} text chunks")
         
         # Persist the vector store
         vectorstore.persist()
@@ -238,7 +293,7 @@ if __name__ == "__main__":
     persist_dir = os.environ.get("RAG_PERSIST_DIR", "./data/chromadb")
     print(f"Creating vector database at: {persist_dir}")
     
-    success = create_rag_database(PEST_DATA, persist_dir)
+    success = create_rag_database(PEST_DATA, persist_dir, sys.argv[1:])
     
     if success:
         print("✅ Successfully created RAG vector database!")
@@ -6,6 +6,7 @@ Creates a vector database for RAG without relying on LangChain,
 directly using ChromaDB and Sentence Transformers.
 """
 import os
+import sys
 import json
 import logging
 import numpy as np
@@ -19,6 +20,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger("simple_rag_db_creator")
 
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Inside the app container this directory is the farmlore project. In a checkout the
+# project is pest-management-chatbot/farmlore-project: its api package takes precedence
+# over this directory's api/ (a namespace package without the embedding modules) once
+# it is on the path.
+FARMLORE_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pest-management-chatbot', 'farmlore-project')
+if os.path.isdir(FARMLORE_PROJECT) and FARMLORE_PROJECT not in sys.path:
+    sys.path.append(FARMLORE_PROJECT)
+
+# Shared on-disk embedding cache and embedding model (available when run inside the farmlore app)
+try:
+    from api.inference_engine.embedding_cache import get_embedding_cache
+    from api.inference_engine.embedding_service import get_embedding_service
+except ImportError:
+    get_embedding_cache = get_embedding_service = None
+
 # Sample pest management data
 PEST_DATA = [
     {
@@ -95,16 +113,20 @@ def create_simple_rag_database(data: List[Dict], persist_dir: str = "./data/chro
         # Import necessary libraries
         logger.debug("Importing chromadb and sentence_transformers")
         import chromadb
-        from sentence_transformers import SentenceTransformer
         
         # Create the directory if it doesn't exist
         logger.debug(f"Creating directory: {persist_dir}")
         os.makedirs(persist_dir, exist_ok=True)
         
-        # Initialize sentence transformer model
-        logger.debug("Initializing sentence transformer model")
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-        logger.info("Initialized sentence transformer model")
+        # Use the process-wide embedding model when available, so it is loaded once
+        if get_embedding_service is not None:
+            encode = lambda texts: get_embedding_service().encode(texts, MODEL_NAME)
+            logger.info("Using the shared embedding service")
+        else:
+            logger.debug("Initializing sentence transformer model")
+            from sentence_transformers import SentenceTransformer
+            encode = SentenceTransformer(MODEL_NAME).encode
+            logger.info("Initialized sentence transformer model")
         
         # Initialize ChromaDB client
         logger.debug(f"Initializing ChromaDB client with path: {persist_dir}")
@@ -162,7 +184,10 @@ def create_simple_rag_database(data: List[Dict], persist_dir: str = "./data/chro
         
         # Generate embeddings in batch
         logger.debug("Generating embeddings")
-        embeddings = model.encode(all_chunks)
+        if get_embedding_cache is not None:
+            embeddings = np.asarray(get_embedding_cache().embed(MODEL_NAME, all_chunks, encode), dtype=np.float32)
+        else:
+            embeddings = encode(all_chunks)
         logger.debug(f"Generated {len(embeddings)} embeddings")
         
         # Debug information about embeddings
@@ -205,7 +230,7 @@ def create_simple_rag_database(data: List[Dict], persist_dir: str = "./data/chro
         # Test a sample query
         test_query = "How do I control aphids on tomatoes?"
         logger.debug(f"Testing query: {test_query}")
-        query_embedding = model.encode(test_query).tolist()
+        query_embedding = encode([test_query])[0].tolist()
         
         logger.debug("Querying collection")
         results = collection.query(